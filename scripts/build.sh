@@ -3,19 +3,37 @@
 # 构建脚本 - 用于跨平台打包
 
 # 检查参数
-if [ "$#" -ne 1 ]; then
-    echo "用法: $0 [macos|windows]"
+if [ "$#" -lt 1 ] || [ "$#" -gt 2 ]; then
+    echo "用法: $0 [macos|windows] [--onedir]"
     echo "示例: $0 macos"
+    echo "      $0 macos --onedir   # 目录模式，启动时无需解压，启动更快"
     exit 1
 fi
 
 # 获取平台参数
 PLATFORM=$1
 
+# 打包模式：默认单文件（--onefile），--onedir 输出为目录
+BUNDLE_MODE="--onefile"
+case "$2" in
+    "")
+        ;;
+    --onedir)
+        BUNDLE_MODE="--onedir"
+        ;;
+    *)
+        echo "错误: 不支持的参数 '$2'"
+        exit 1
+        ;;
+esac
+
+# 构建前检查启动导入耗时，确保重量级依赖没有在启动时被提前导入
+python scripts/check_import_time.py || exit 1
+
 # 打包 MacOS 平台
 function build_macos() {
     echo "构建 MacOS 版本..."
-    python -m PyInstaller --onefile --name=app_macos \
+    python -m PyInstaller $BUNDLE_MODE --name=app_macos \
         --add-data="src/config.yaml:." \
         --add-data="src/modules:modules" \
         --hidden-import=yaml \
@@ -42,7 +60,7 @@ function build_windows() {
     echo "构建 Windows 版本..."
     if [[ "$OSTYPE" == "darwin"* ]]; then
         # 在 macOS 上构建 Windows 版本
-        python -m PyInstaller --onefile --name=app_windows \
+        python -m PyInstaller $BUNDLE_MODE --name=app_windows \
             --add-data="src/config.yaml:." \
             --add-data="src/modules:modules" \
             --hidden-import=yaml \
@@ -74,10 +92,10 @@ function build_windows() {
         echo "3. 输出文件将保存在 outputs\\ 目录中"
         echo "===================="
         echo "注意：在 Windows 环境中构建时，请使用以下命令："
-        echo "python -m PyInstaller --onefile --name=app_windows --add-data=\"src/config.yaml;.\" --add-data=\"src/modules;modules\" --hidden-import=yaml --collect-all=yaml --exclude-module=tkinter --console src/main.py"
+        echo "python -m PyInstaller $BUNDLE_MODE --name=app_windows --add-data=\"src/config.yaml;.\" --add-data=\"src/modules;modules\" --hidden-import=yaml --collect-all=yaml --exclude-module=tkinter --console src/main.py"
     else
         # 在 Windows 上构建 Windows 版本
-        python -m PyInstaller --onefile --name=app_windows \
+        python -m PyInstaller $BUNDLE_MODE --name=app_windows \
             --add-data="src/config.yaml;." \
             --add-data="src/modules;modules" \
             --exclude-module=tkinter \
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动导入耗时检查（构建前执行）
+
+使用 python -X importtime 统计导入 src/main.py 时加载的模块与耗时，输出累计耗时最高的
+顶层包，并检查启动阶段没有提前导入重量级依赖（pandas、numpy、openpyxl、tkinter 等），
+这些依赖应在确认输入文件或真正需要时才导入。
+
+用法:
+    python scripts/check_import_time.py [--top 15] [--budget-ms 300]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# 启动阶段不应导入的重量级依赖
+DEFERRED_PACKAGES = ("pandas", "numpy", "openpyxl", "tkinter", "xlsxwriter", "pyarrow")
+
+
+def measure_imports(module: str = "main") -> list:
+    """
+    在独立进程中以 -X importtime 导入模块
+
+    Args:
+        module: 需要导入的模块名（相对于 src 目录）
+
+    Returns:
+        list: [(模块名, 自身耗时 us, 累计耗时 us, 嵌套层级), ...]
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    records = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip())) // 2
+        records.append((name.strip(), int(self_us), int(cumulative_us), level))
+    return records
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="启动导入耗时检查")
+    parser.add_argument("--module", default="main", help="需要检查的入口模块")
+    parser.add_argument("--top", type=int, default=15, help="输出累计耗时最高的前 N 个顶层包")
+    parser.add_argument("--budget-ms", type=float, help="总导入耗时上限（毫秒），超出时检查失败")
+    args = parser.parse_args()
+
+    records = measure_imports(args.module)
+    # 嵌套层级最浅的记录即入口直接导入的模块，其累计耗时之和为总导入耗时
+    min_level = min(level for _, _, _, level in records)
+    top_level = [record for record in records if record[3] == min_level]
+    total_ms = sum(cumulative for _, _, cumulative, _ in top_level) / 1000
+
+    print(f"导入 {args.module} 共加载 {len(records)} 个模块，总耗时 {total_ms:.1f} ms")
+    print(f"{'累计(ms)':>10}{'自身(ms)':>10}  模块")
+    for name, self_us, cumulative_us, _ in sorted(top_level, key=lambda r: -r[2])[:args.top]:
+        print(f"{cumulative_us / 1000:>10.1f}{self_us / 1000:>10.1f}  {name}")
+
+    failed = False
+    imported = {name.split(".")[0] for name, _, _, _ in records}
+    eager = [package for package in DEFERRED_PACKAGES if package in imported]
+    if eager:
+        print(f"检查失败: 启动时提前导入了 {', '.join(eager)}")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"检查失败: 总导入耗时 {total_ms:.1f} ms 超过上限 {args.budget_ms} ms")
+        failed = True
+    if not failed:
+        print("检查通过")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量处理入口（无界面）
+
+一次处理多个工作簿：配置只加载一次，工作簿由进程池并发处理，每个工作簿使用独立的
+输出子目录与日志文件，全部完成后输出汇总报告（batch_summary.json）。
+
+用法（在 src 目录下执行）:
+    python batch.py "../data/*.xlsx" ../templates/全维度筛选.xlsx --workers 4
+    python batch.py "../data/**/*.xlsx" --output-root ../batch_outputs
+"""
+
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from modules.config import Config
+from modules.incremental import KEEP_PATTERNS
+from modules.parallel_filter import resolve_worker_count
+from modules.pipeline import process_workbook
+from clean_output import OutputRotation, clean_output_directory
+
+# 项目根目录（数据总表缓存与默认输出目录位于其下）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
+
+SUMMARY_FILE = "batch_summary.json"
+WORKBOOK_LOG_FILE = "run.log"
+
+# 子进程中使用的配置，由进程池初始化函数设置一次
+_WORKER_CONFIG = None
+
+logger = logging.getLogger("batch")
+
+
+def expand_inputs(patterns: list) -> list:
+    """
+    展开输入参数中的通配符，按出现顺序去重
+
+    Args:
+        patterns: 文件路径或通配模式（支持 ** 递归匹配）
+
+    Returns:
+        list: 输入文件路径
+    """
+    input_files, seen = [], set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            real_path = os.path.realpath(path)
+            if real_path not in seen:
+                seen.add(real_path)
+                input_files.append(path)
+    return input_files
+
+
+def assign_output_dirs(input_files: list, output_root: str) -> list:
+    """为每个工作簿分配以文件名命名的输出子目录，重名时追加序号"""
+    output_dirs, used = [], set()
+    for input_file in input_files:
+        stem = os.path.splitext(os.path.basename(input_file))[0]
+        name, suffix = stem, 2
+        while name in used:
+            name, suffix = f"{stem}_{suffix}", suffix + 1
+        used.add(name)
+        output_dirs.append(os.path.join(output_root, name))
+    return output_dirs
+
+
+def _init_worker(config: Config) -> None:
+    """进程池初始化：保存配置，并移除从主进程继承的日志处理器（每个工作簿单独写日志）"""
+    global _WORKER_CONFIG
+    _WORKER_CONFIG = config
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(getattr(logging, config.get('logging', 'level', 'INFO')))
+
+
+def _process_one(input_file: str, output_dir: str) -> dict:
+    """
+    在子进程中处理单个工作簿，日志写入输出子目录
+
+    Returns:
+        dict: 处理摘要，失败时包含错误信息
+    """
+    config = _WORKER_CONFIG
+    keep = KEEP_PATTERNS if config.get('output', 'incremental', False) else None
+    rotation, run_dir = None, output_dir
+    try:
+        if config.get('output', 'rotation', True):
+            # 写入新的运行目录，处理成功后才切换输出子目录
+            rotation = OutputRotation(output_dir, config.get('output', 'keep_runs', 3), keep)
+            run_dir = rotation.stage()
+        else:
+            clean_output_directory(keep=keep, output_dir=output_dir)
+    except Exception as e:
+        logger.error(f"准备 {input_file} 的输出目录时发生错误: {str(e)}", exc_info=True)
+        return {"input_file": input_file, "output_dir": output_dir, "status": "failed",
+                "error": str(e), "seconds": 0.0}
+
+    handler = logging.FileHandler(os.path.join(run_dir, WORKBOOK_LOG_FILE), encoding="utf-8")
+    handler.setFormatter(logging.Formatter(config.get('logging', 'format')))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    started = time.perf_counter()
+    try:
+        result = process_workbook(input_file, config, PROJECT_ROOT, run_dir, verbose=False)
+        result["status"] = "success"
+    except Exception as e:
+        logger.error(f"处理 {input_file} 时发生错误: {str(e)}", exc_info=True)
+        # 失败的运行不发布，日志保留在运行目录中
+        result = {"input_file": input_file, "output_dir": run_dir, "status": "failed",
+                  "error": str(e), "seconds": round(time.perf_counter() - started, 3)}
+    finally:
+        root.removeHandler(handler)
+        handler.close()
+    if rotation and result["status"] == "success":
+        rotation.publish()
+        result["output_dir"] = output_dir
+        result["output_path"] = rotation.published_path(result["output_path"])
+    elif rotation:
+        rotation.release()
+    if rotation:
+        # 旧的运行目录在处理完成后删除：处理期间并行筛选会 fork 子进程，此时不能有其他线程运行
+        rotation.collect(background=False)
+    return result
+
+
+def run_batch(input_files: list, config: Config, output_root: str, workers: int) -> dict:
+    """
+    使用进程池并发处理多个工作簿
+
+    Args:
+        input_files: 输入文件路径
+        config: 配置（只加载一次，传递给所有工作进程）
+        output_root: 输出根目录，每个工作簿在其下使用独立的子目录
+        workers: 并发处理的工作簿数
+
+    Returns:
+        dict: 汇总报告
+    """
+    started = time.perf_counter()
+    output_dirs = assign_output_dirs(input_files, output_root)
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context("spawn")
+
+    results = [None] * len(input_files)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(config,)) as executor:
+        futures = {executor.submit(_process_one, input_file, output_dir): position
+                   for position, (input_file, output_dir) in enumerate(zip(input_files, output_dirs))}
+        for done, future in enumerate(as_completed(futures), start=1):
+            position = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # 工作进程异常退出（如 BrokenProcessPool）时记为失败，不中断其余文件与汇总报告
+                result = {"input_file": input_files[position], "output_dir": output_dirs[position],
+                          "status": "failed", "error": str(e) or type(e).__name__,
+                          "seconds": round(time.perf_counter() - started, 3)}
+            results[position] = result
+            if result["status"] == "success":
+                logger.info(f"[{done}/{len(input_files)}] {result['input_file']} 完成："
+                            f"{result['records']} 条记录，{result['conditions']} 个条件，"
+                            f"耗时 {result['seconds']}s")
+            else:
+                logger.error(f"[{done}/{len(input_files)}] {result['input_file']} 失败：{result['error']}")
+
+    for result in results:
+        if result["status"] == "success" and result["seconds"] > 0:
+            result["records_per_second"] = round(result["records"] / result["seconds"], 1)
+
+    total_seconds = round(time.perf_counter() - started, 3)
+    succeeded = [result for result in results if result["status"] == "success"]
+    total_records = sum(result["records"] for result in succeeded)
+    return {
+        "workers": workers,
+        "total_seconds": total_seconds,
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "total_records": total_records,
+        "records_per_second": round(total_records / total_seconds, 1) if total_seconds else None,
+        "files": results,
+    }
+
+
+def _print_summary(summary: dict) -> None:
+    print(f"{'状态':<6}{'记录数':>10}{'条件数':>8}{'耗时(s)':>10}{'记录/秒':>12}  文件")
+    for result in summary["files"]:
+        status = "成功" if result["status"] == "success" else "失败"
+        print(f"{status:<6}{result.get('records', '-'):>10}{result.get('conditions', '-'):>8}"
+              f"{result['seconds']:>10}{result.get('records_per_second', '-'):>12}  {result['input_file']}")
+    print(f"共 {summary['succeeded'] + summary['failed']} 个文件，成功 {summary['succeeded']} 个，"
+          f"失败 {summary['failed']} 个，总耗时 {summary['total_seconds']}s，"
+          f"整体吞吐 {summary['records_per_second']} 条/秒")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="批量处理多个工作簿")
+    parser.add_argument("inputs", nargs="+", help="输入文件或通配模式（如 \"data/*.xlsx\"）")
+    parser.add_argument("--workers", type=int, help="并发处理的工作簿数，小于等于 0 表示使用全部 CPU 核心")
+    parser.add_argument("--output-root", help="输出根目录，每个工作簿使用其下的独立子目录")
+    parser.add_argument("--config", default=CONFIG_PATH, help="配置文件路径")
+    args = parser.parse_args()
+
+    config = Config(args.config)
+    output_root = os.path.abspath(args.output_root or os.path.join(
+        PROJECT_ROOT, config.get('batch', 'output_root', 'batch_outputs')))
+    os.makedirs(output_root, exist_ok=True)
+
+    logging.basicConfig(
+        level=getattr(logging, config.get('logging', 'level', 'INFO')),
+        format=config.get('logging', 'format'),
+        handlers=[logging.FileHandler(os.path.join(output_root, "batch.log"), encoding="utf-8"),
+                  logging.StreamHandler()],
+    )
+
+    input_files = expand_inputs(args.inputs)
+    missing = [path for path in input_files if not os.path.isfile(path)]
+    for path in missing:
+        logger.error(f"输入文件不存在: {path}")
+    input_files = [path for path in input_files if path not in missing]
+    if not input_files:
+        logger.error("没有可处理的输入文件")
+        return 1
+
+    workers = args.workers if args.workers is not None else config.get('batch', 'workers', 0)
+    workers = min(resolve_worker_count(workers), len(input_files))
+    if workers > 1 and resolve_worker_count(config.get('parallel', 'workers', 1)) > 1:
+        # 多个工作簿已并发处理，单个工作簿内不再启动筛选进程池，避免 CPU 超额占用
+        logger.info("批量并发处理时关闭单个工作簿内的并行筛选")
+        config.set('parallel', 'workers', 1)
+
+    logger.info(f"开始批量处理 {len(input_files)} 个文件，并发数 {workers}，输出目录 {output_root}")
+    summary = run_batch(input_files, config, output_root, workers)
+
+    summary_path = os.path.join(output_root, SUMMARY_FILE)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    _print_summary(summary)
+    logger.info(f"汇总报告已保存到 {summary_path}")
+    return 0 if not summary["failed"] and not missing else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
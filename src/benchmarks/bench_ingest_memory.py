@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+数据总表读取内存基准
+
+对比 pandas 整表读取与 openpyxl 流式读取在提取数据总表时的峰值 RSS。
+每种读取方式在独立子进程中执行，互不影响峰值统计。
+
+用法（在 src 目录下执行）:
+    python -m benchmarks.bench_ingest_memory --records 5000 --fields 100
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# 允许以脚本方式直接运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.metrics import peak_rss_mb
+
+READERS = ("pandas", "streaming")
+
+
+def _run_child(reader: str, input_file: str, engine: str) -> dict:
+    """子进程：使用指定读取方式执行 extract_data 并报告内存与耗时"""
+    import logging
+    import warnings
+    from modules.config import Config
+    from modules.data_manager import DataManager
+    from modules.data_extractor import extract_data
+
+    logging.disable(logging.INFO)
+    warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+
+    config = Config()
+    config.set("input", "reader", reader)
+    config.set("filter", "engine", engine)
+    data_mgr = DataManager(config)
+
+    with tempfile.TemporaryDirectory() as output_base:
+        data_mgr.set_output_dir(output_base)
+        baseline = peak_rss_mb()
+        started = time.perf_counter()
+        extract_data(input_file, data_mgr)
+        elapsed = time.perf_counter() - started
+        peak = peak_rss_mb()
+
+    return {
+        "reader": reader,
+        "engine": engine,
+        "records": data_mgr.record_count(),
+        "seconds": round(elapsed, 3),
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak,
+        "extract_rss_mb": round(peak - baseline, 1) if peak is not None else None,
+    }
+
+
+def run_benchmark(input_file: str, engine: str = "index") -> list:
+    """
+    在独立子进程中依次运行各读取方式
+
+    Args:
+        input_file (str): 输入工作簿
+        engine (str): 筛选引擎（决定数据以字典列表还是 DataFrame 形式保存）
+
+    Returns:
+        list: 各读取方式的测量结果
+    """
+    results = []
+    for reader in READERS:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_ingest_memory",
+             "--child", reader, "--engine", engine, input_file],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="数据总表读取内存基准")
+    parser.add_argument("input_file", nargs="?", help="输入工作簿，不指定时生成合成数据")
+    parser.add_argument("--records", type=int, default=5000, help="合成数据的记录数")
+    parser.add_argument("--fields", type=int, default=100, help="合成数据的字段数")
+    parser.add_argument("--engine", default="index", help="筛选引擎: index, scan, vectorized")
+    parser.add_argument("--child", choices=READERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_run_child(args.child, args.input_file, args.engine)))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = args.input_file
+        if not input_file:
+            from benchmarks.synthetic import generate_workbook
+            input_file = generate_workbook(
+                os.path.join(temp_dir, "bench.xlsx"), args.records, args.fields)
+        results = run_benchmark(input_file, args.engine)
+
+    print(f"{'读取方式':<10}{'记录数':>10}{'耗时(s)':>10}{'提取增量RSS(MB)':>18}")
+    for result in results:
+        print(f"{result['reader']:<10}{result['records']:>10}{result['seconds']:>10}"
+              f"{str(result['extract_rss_mb']):>18}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
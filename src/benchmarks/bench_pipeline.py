@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+完整处理流程基准
+
+按预设规模（记录数 × 字段数 × 筛选条件数 × 通配符比例）生成合成工作簿，
+通过 pipeline.process_workbook 执行完整流程，取其运行指标中各阶段（extract_schema、
+extract_data、extract_filters、apply_filters、export_to_xlsx）的耗时、CPU 时间与峰值 RSS，
+结果以 JSON 输出并与保存的基线比较。每个规模在独立子进程中执行，峰值内存互不影响
+（并行筛选的工作进程不计入）；默认重复 3 次取中位数，降低测量噪声。
+
+用法（在 src 目录下执行）:
+    python -m benchmarks.bench_pipeline --scales small,medium --output result.json
+    python -m benchmarks.bench_pipeline --set filter.engine=vectorized
+    python -m benchmarks.bench_pipeline --set logging.level=DEBUG --set diagnostics.enabled=true
+    python -m benchmarks.bench_pipeline --repeat 5 --save-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# 允许以脚本方式直接运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 预设规模
+SCALES = {
+    "small": {"records": 500, "fields": 20, "conditions": 50, "wildcard_ratio": 0.3},
+    "medium": {"records": 2000, "fields": 50, "conditions": 100, "wildcard_ratio": 0.3},
+    # 大规模耗时较长，需显式指定
+    "large": {"records": 16000, "fields": 100, "conditions": 200, "wildcard_ratio": 0.1},
+}
+
+# process_workbook 的各阶段（分块模式的阶段不同，按指标中实际记录的阶段输出）
+STAGES = ("extract_schema", "extract_data", "extract_filters", "apply_filters", "export_to_xlsx")
+
+# 基准报告格式版本，与基线版本不同时不比较
+REPORT_VERSION = 2
+
+# 默认基线文件
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# 耗时增量低于该值（秒）时视为测量噪声，不判定为退化
+MIN_REGRESSION_SECONDS = 0.1
+
+
+def parse_overrides(items: list) -> dict:
+    """
+    解析 --set 参数
+
+    Args:
+        items: ["section.key=value", ...]，value 按 YAML 解析（如 true、4）
+
+    Returns:
+        dict: {"section.key": value}
+    """
+    import yaml
+
+    overrides = {}
+    for item in items or []:
+        name, separator, value = item.partition("=")
+        if not separator or "." not in name:
+            raise ValueError(f"配置覆盖格式应为 section.key=value: {item}")
+        overrides[name] = yaml.safe_load(value)
+    return overrides
+
+
+def run_pipeline(input_file: str, overrides: dict = None) -> dict:
+    """
+    在当前进程中通过 pipeline.process_workbook 执行完整流程，返回各阶段的运行指标
+
+    基准默认关闭数据总表缓存，保证每次都测量真实的解析耗时。覆盖 logging.level 时
+    日志按该级别写入临时文件，计入格式化与写日志的开销；否则不输出日志。
+
+    Args:
+        input_file (str): 输入工作簿
+        overrides (dict): 配置覆盖 {"section.key": value}
+
+    Returns:
+        dict: 记录数、条件数与各阶段的耗时、CPU 时间与峰值 RSS
+    """
+    import warnings
+    from modules.config import Config
+    from modules.pipeline import process_workbook
+
+    warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+
+    config = Config()
+    config.set("cache", "enabled", False)
+    for name, value in (overrides or {}).items():
+        section, key = name.split(".", 1)
+        config.set(section, key, value)
+    # 阶段耗时取自运行指标文件
+    config.set("metrics", "enabled", True)
+
+    with tempfile.TemporaryDirectory() as output_base:
+        log_handler = None
+        if "logging.level" in (overrides or {}):
+            log_handler = logging.FileHandler(os.path.join(output_base, "bench.log"), encoding="utf-8")
+            log_handler.setFormatter(logging.Formatter(config.get('logging', 'format')))
+            logging.getLogger().addHandler(log_handler)
+            logging.getLogger().setLevel(overrides["logging.level"])
+        try:
+            result = process_workbook(input_file, config, output_base, output_base, verbose=False)
+        finally:
+            if log_handler:
+                logging.getLogger().removeHandler(log_handler)
+                log_handler.close()
+        with open(os.path.join(output_base, config.get('metrics', 'file', 'metrics.json')),
+                  "r", encoding="utf-8") as f:
+            metrics = json.load(f)
+
+    stages = {
+        stage["name"]: {
+            "seconds": stage["wall_seconds"],
+            "cpu_seconds": stage["cpu_seconds"],
+            # 进程启动以来的峰值，阶段结束时记录
+            "peak_rss_mb": stage["peak_rss_mb"],
+        }
+        for stage in metrics["stages"]
+    }
+    return {
+        "records": result["records"],
+        "conditions": result["conditions"],
+        "stages": stages,
+        "total_seconds": round(sum(stage["seconds"] for stage in stages.values()), 4),
+    }
+
+
+def _run_scale(scale: str, overrides: dict, temp_dir: str) -> dict:
+    """生成指定规模的工作簿，并在子进程中执行完整流程"""
+    from benchmarks.synthetic import generate_workbook
+
+    params = SCALES[scale]
+    input_file = generate_workbook(
+        os.path.join(temp_dir, f"{scale}.xlsx"), params["records"], params["fields"],
+        params["conditions"], params["wildcard_ratio"])
+
+    command = [sys.executable, "-m", "benchmarks.bench_pipeline", "--child", input_file]
+    for name, value in overrides.items():
+        command += ["--set", f"{name}={json.dumps(value)}"]
+    completed = subprocess.run(
+        command, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True, text=True, check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["params"] = params
+    return result
+
+
+def run_benchmark(scales: list, overrides: dict = None, repeat: int = 3) -> dict:
+    """
+    依次运行各规模的基准
+
+    重复运行时每个阶段取耗时的中位数（同时记录最短耗时）与最大峰值内存，降低偶然波动的影响。
+
+    Args:
+        scales (list): 规模名称列表
+        overrides (dict): 配置覆盖
+        repeat (int): 每个规模的重复次数
+
+    Returns:
+        dict: 可直接序列化为 JSON 的基准报告
+    """
+    overrides = overrides or {}
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for scale in scales:
+            runs = [_run_scale(scale, overrides, temp_dir) for _ in range(max(repeat, 1))]
+            result = runs[0]
+            for stage in list(result["stages"]):
+                seconds = [run["stages"][stage]["seconds"] for run in runs]
+                result["stages"][stage] = {
+                    "seconds": round(statistics.median(seconds), 4),
+                    "min_seconds": min(seconds),
+                    "cpu_seconds": round(statistics.median(
+                        run["stages"][stage]["cpu_seconds"] for run in runs), 4),
+                    "peak_rss_mb": max((run["stages"][stage]["peak_rss_mb"] or 0) for run in runs),
+                }
+            result["total_seconds"] = round(
+                sum(stage["seconds"] for stage in result["stages"].values()), 4)
+            results[scale] = result
+
+    return {
+        "version": REPORT_VERSION,
+        "repeat": max(repeat, 1),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "overrides": overrides,
+        "results": results,
+    }
+
+
+def compare_with_baseline(report: dict, baseline: dict, tolerance: float = 0.25) -> list:
+    """
+    与基线比较，找出耗时或峰值内存超过容差的阶段
+
+    只比较报告版本、规模参数与配置覆盖都相同的结果；耗时按重复运行的中位数比较，
+    且增量需同时超过相对容差与 MIN_REGRESSION_SECONDS。
+
+    Args:
+        report (dict): 本次基准报告
+        baseline (dict): 基线报告
+        tolerance (float): 允许的相对增幅
+
+    Returns:
+        list: 退化说明列表，为空表示没有退化
+    """
+    regressions = []
+    if (report.get("version") != baseline.get("version")
+            or report.get("overrides") != baseline.get("overrides")):
+        return regressions
+
+    for scale, result in report["results"].items():
+        expected = baseline.get("results", {}).get(scale)
+        if not expected or expected.get("params") != result.get("params"):
+            continue
+        for stage, current in result["stages"].items():
+            previous = expected["stages"].get(stage)
+            if not previous:
+                continue
+            seconds, base_seconds = current["seconds"], previous["seconds"]
+            if (seconds > base_seconds * (1 + tolerance)
+                    and seconds - base_seconds > MIN_REGRESSION_SECONDS):
+                regressions.append(f"{scale}/{stage}: 耗时 {base_seconds}s -> {seconds}s")
+            rss, base_rss = current.get("peak_rss_mb"), previous.get("peak_rss_mb")
+            if rss and base_rss and rss > base_rss * (1 + tolerance):
+                regressions.append(f"{scale}/{stage}: 峰值内存 {base_rss}MB -> {rss}MB")
+    return regressions
+
+
+def _print_report(report: dict) -> None:
+    print(f"{'规模':<8}{'阶段':<18}{'耗时(s)':>10}{'CPU(s)':>10}{'峰值RSS(MB)':>14}")
+    for scale, result in report["results"].items():
+        for stage, metrics in result["stages"].items():
+            print(f"{scale:<8}{stage:<18}{metrics['seconds']:>10}{metrics['cpu_seconds']:>10}"
+                  f"{str(metrics['peak_rss_mb']):>14}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="完整处理流程基准")
+    parser.add_argument("--scales", default="small,medium",
+                        help=f"逗号分隔的规模: {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="每个规模的重复次数，耗时取中位数")
+    parser.add_argument("--set", action="append", default=[], metavar="SECTION.KEY=VALUE",
+                        help="覆盖配置项，可重复指定，如 filter.engine=vectorized")
+    parser.add_argument("--output", help="将 JSON 报告写入该文件")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线 JSON 文件")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="判定退化的相对增幅")
+    parser.add_argument("--child", metavar="INPUT_FILE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    overrides = parse_overrides(args.set)
+    if args.child:
+        if "logging.level" not in overrides:
+            logging.disable(logging.INFO)
+        print(json.dumps(run_pipeline(args.child, overrides)))
+        return 0
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"未知的规模: {', '.join(unknown)}")
+
+    report = run_benchmark(scales, overrides, args.repeat)
+    _print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"已保存基线: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("未找到基线文件，跳过比较")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        regressions = compare_with_baseline(report, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"性能退化: {regression}")
+    if not regressions:
+        print("与基线相比没有性能退化")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
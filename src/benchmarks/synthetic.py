@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import openpyxl
+
+# XLSX 单个 Sheet 最多 16384 列，首列为字段名
+MAX_RECORDS = 16383
+
+# 合成数据中的分类字段及其取值
+CATEGORY_FIELDS = {
+    "年份": list(range(2020, 2029)),
+    "品类": ["A", "B", "C", "D", "E"],
+}
+
+
+def generate_workbook(path: str, records: int, fields: int, conditions: int = 0,
+                      wildcard_ratio: float = 0.3, seed: int = 0) -> str:
+    """
+    生成与模板结构相同的合成工作簿
+
+    总表每行是一个字段、每列是一条记录：前几个字段为分类字段（年份、品类），
+    其余为 Value1..ValueN 数值字段。总表筛选的每行是一组分类字段条件，
+    每个单元格按 wildcard_ratio 的概率留空作为通配符。
+
+    Args:
+        path (str): 输出文件路径
+        records (int): 记录数（总表的列数）
+        fields (int): 字段总数（包含分类字段）
+        conditions (int): 筛选条件行数
+        wildcard_ratio (float): 筛选条件单元格留空的概率
+        seed (int): 随机种子，保证生成结果可复现
+
+    Returns:
+        str: 输出文件路径
+
+    Raises:
+        ValueError: 如果记录数超过 XLSX 的列数上限
+    """
+    if records > MAX_RECORDS:
+        raise ValueError(f"记录数不能超过 {MAX_RECORDS}（XLSX 列数上限）")
+
+    rng = random.Random(seed)
+    category_names = list(CATEGORY_FIELDS)[:fields]
+    value_count = max(fields - len(category_names), 0)
+
+    # 使用只写模式逐行写入，避免生成大规模数据时占用过多内存
+    workbook = openpyxl.Workbook(write_only=True)
+    data_sheet = workbook.create_sheet("总表")
+    data_sheet.append(["序号"] + list(range(1, records + 1)))
+    for name in category_names:
+        choices = CATEGORY_FIELDS[name]
+        data_sheet.append([name] + [rng.choice(choices) for _ in range(records)])
+    for value_id in range(1, value_count + 1):
+        data_sheet.append([f"Value{value_id}"] + [rng.randint(1, 1000) for _ in range(records)])
+
+    filter_sheet = workbook.create_sheet("总表筛选")
+    filter_sheet.append(category_names)
+    for _ in range(conditions):
+        filter_sheet.append([
+            None if rng.random() < wildcard_ratio else rng.choice(CATEGORY_FIELDS[name])
+            for name in category_names
+        ])
+
+    workbook.save(path)
+    return path
\ No newline at end of file
@@ -1,24 +1,38 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import fnmatch
 import os
 import shutil
 import logging
+import threading
+from datetime import datetime
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 # 获取日志记录器但不配置 basicConfig，避免覆盖主程序的日志配置
 logger = logging.getLogger('clean_output')
 # 添加 NullHandler 防止未配置日志时的警告
 logger.addHandler(logging.NullHandler())
 
-def clean_output_directory():
+def clean_output_directory(keep=None, output_dir=None):
     """
     清理 output 目录中的所有文件
     如果目录不存在则创建它
     同时清理项目根目录下的 app.log 文件
+    
+    Args:
+        keep: 需要保留的文件名通配模式列表（增量模式下保留上次的结果与清单）
+        output_dir: 需要清理的目录，默认为项目根目录下的 outputs 目录
     """
     # 获取 output 目录的路径（相对于脚本所在目录的上一级）
-    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs")
+    if output_dir is None:
+        output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs")
     
     # 确保路径是绝对路径
     output_dir = os.path.abspath(output_dir)
@@ -29,6 +43,9 @@ def clean_output_directory():
     if os.path.exists(output_dir):
         # 如果存在，删除目录中的所有文件和子目录
         for item in os.listdir(output_dir):
+            if keep and any(fnmatch.fnmatch(item, pattern) for pattern in keep):
+                logger.debug(f"保留文件: {item}")
+                continue
             item_path = os.path.join(output_dir, item)
             try:
                 if os.path.isfile(item_path):
@@ -49,5 +66,178 @@ def clean_output_directory():
     # 如果需要清理旧日志，应该在日志系统初始化前进行，或者使用日志轮转机制
     logger.info("日志文件保留，不进行清理")
 
+def _try_lock(handle) -> bool:
+    """以非阻塞方式对已打开的文件加排他锁，进程退出（含异常退出）时锁自动释放"""
+    try:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def _run_locked(run_dir: str) -> bool:
+    """运行目录是否仍被某个进程持有（正在写入或等待发布）"""
+    lock_path = f"{run_dir}.lock"
+    if not os.path.exists(lock_path):
+        return False
+    try:
+        with open(lock_path, "a") as handle:
+            return not _try_lock(handle)
+    except OSError:
+        return True
+
+def _default_output_dir() -> str:
+    """项目根目录下的 outputs 目录"""
+    return os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs"))
+
+class OutputRotation:
+    """
+    输出目录轮换：每次运行写入新的运行目录，完成后原子地发布为输出目录
+
+    运行目录位于输出目录旁的 <输出目录>.runs/ 下，以启动时间与进程号命名。处理完成后
+    输出目录（符号链接）原子地切换到新的运行目录，读取方始终看到上一次或本次的完整结果，
+    运行中途失败时输出目录保持不变。启动时无需逐个删除上次的文件，旧的运行目录由后台线程
+    按保留数量（output.keep_runs）删除。不支持符号链接的平台（如未开启开发者模式的 Windows）
+    改为将输出目录移入运行目录后再重命名，两次重命名之间输出目录短暂不存在。
+
+    多个进程可以同时向同一输出目录运行：每个运行在发布前持有 <运行目录>.lock 上的文件锁，
+    删除旧目录时跳过仍被持有的运行以及晚于当前发布的运行，不会删除其他进程正在写入的目录。
+    """
+
+    def __init__(self, output_dir: str = None, keep_runs: int = 3, keep=None):
+        """
+        初始化输出目录轮换
+
+        Args:
+            output_dir: 发布的输出目录，默认为项目根目录下的 outputs 目录
+            keep_runs: 保留的运行目录数（含正在写入与当前发布的运行），至少为 1
+            keep: 需要从当前发布的结果带入新运行目录的文件名通配模式（增量模式下的结果与清单）
+        """
+        self.output_dir = os.path.abspath(output_dir or _default_output_dir())
+        self.runs_dir = f"{self.output_dir}.runs"
+        self.keep_runs = max(int(keep_runs), 1)
+        self.keep = keep
+        self.staging_dir = None
+        self._lock = None
+
+    def stage(self) -> str:
+        """
+        创建本次运行的目录，并带入需要保留的文件（优先使用硬链接，不复制文件内容）
+
+        Returns:
+            str: 运行目录，本次运行的全部输出写入其中
+        """
+        os.makedirs(self.runs_dir, exist_ok=True)
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}"
+        self.staging_dir = os.path.join(self.runs_dir, run_id)
+        # 先持有锁再创建目录，其他进程删除旧目录时不会看到未加锁的本次运行
+        self._lock = open(f"{self.staging_dir}.lock", "a")
+        _try_lock(self._lock)
+        os.makedirs(self.staging_dir)
+
+        current = os.path.realpath(self.output_dir)
+        if self.keep and os.path.isdir(current):
+            for item in os.listdir(current):
+                source = os.path.join(current, item)
+                if not os.path.isfile(source) or not any(fnmatch.fnmatch(item, pattern) for pattern in self.keep):
+                    continue
+                try:
+                    os.link(source, os.path.join(self.staging_dir, item))
+                except OSError:
+                    shutil.copy2(source, os.path.join(self.staging_dir, item))
+                logger.debug(f"保留文件: {item}")
+        logger.info(f"本次运行目录: {self.staging_dir}")
+        return self.staging_dir
+
+    def published_path(self, path: str) -> str:
+        """运行目录中的路径发布后在输出目录中的对应路径"""
+        return os.path.normpath(os.path.join(self.output_dir, os.path.relpath(path, self.staging_dir)))
+
+    def publish(self) -> str:
+        """
+        将本次运行目录发布为输出目录
+
+        Returns:
+            str: 输出目录
+        """
+        if os.path.isdir(self.output_dir) and not os.path.islink(self.output_dir):
+            # 普通目录（旧版本的输出目录，或以重命名方式发布的上次运行）移入运行目录，由后台删除
+            previous = f"{self.staging_dir}_previous"
+            os.replace(self.output_dir, previous)
+            logger.info(f"原输出目录已移入运行目录: {previous}")
+
+        temp_link = f"{self.output_dir}.{os.getpid()}.tmp"
+        target = os.path.relpath(self.staging_dir, os.path.dirname(self.output_dir))
+        try:
+            os.symlink(target, temp_link, target_is_directory=True)
+            # 替换符号链接是原子操作，读取方不会看到不存在或不完整的输出目录
+            os.replace(temp_link, self.output_dir)
+        except (OSError, NotImplementedError):
+            # 不支持符号链接：直接将运行目录重命名为输出目录
+            for path in (temp_link, self.output_dir):
+                if os.path.islink(path):
+                    os.remove(path)
+            os.replace(self.staging_dir, self.output_dir)
+        logger.info(f"输出目录已切换到本次运行的结果: {self.output_dir}")
+        self.release()
+        return self.output_dir
+
+    def release(self) -> None:
+        """释放本次运行的锁：发布后或运行失败时调用，之后该运行目录可被删除"""
+        if self._lock is None:
+            return
+        self._lock.close()
+        self._lock = None
+        try:
+            os.remove(f"{self.staging_dir}.lock")
+        except OSError:
+            pass
+
+    def collect(self, background: bool = True):
+        """
+        删除超出保留数量的旧运行目录（含中途失败的运行）
+
+        当前发布的运行、晚于当前发布的运行（其他进程的运行可能尚未发布）以及仍持有锁的运行
+        不会被删除。
+
+        Args:
+            background: 是否在后台线程中删除
+
+        Returns:
+            threading.Thread | None: 后台删除线程，需要等待完成时调用 join
+        """
+        if not os.path.isdir(self.runs_dir):
+            return None
+        published = os.path.realpath(self.output_dir)
+        protected = {published, os.path.realpath(self.staging_dir or self.output_dir)}
+        # 运行目录以启动时间命名，按名称排序即按启动先后排序
+        runs = sorted(run for run in os.listdir(self.runs_dir) if os.path.isdir(os.path.join(self.runs_dir, run)))
+        newest = None
+        if os.path.dirname(published) == os.path.realpath(self.runs_dir):
+            newest = os.path.basename(published)
+        stale = [os.path.join(self.runs_dir, run) for run in runs[:-self.keep_runs]
+                 if (newest is None or run < newest)
+                 and os.path.realpath(os.path.join(self.runs_dir, run)) not in protected
+                 and not _run_locked(os.path.join(self.runs_dir, run))]
+        if not stale:
+            return None
+
+        def remove():
+            for path in stale:
+                shutil.rmtree(path, ignore_errors=True)
+                if os.path.exists(f"{path}.lock"):
+                    os.remove(f"{path}.lock")
+                logger.debug(f"已删除旧的运行目录: {path}")
+            logger.info(f"已删除 {len(stale)} 个旧的运行目录")
+
+        if not background:
+            remove()
+            return None
+        thread = threading.Thread(target=remove, name="output-gc")
+        thread.start()
+        return thread
+
 if __name__ == "__main__":
     clean_output_directory()
\ No newline at end of file
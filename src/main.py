@@ -6,23 +6,10 @@ import os
 import sys
 from pathlib import Path
 
-# 尝试导入 tkinter，如果失败则设置标志
-try:
-    import tkinter as tk
-    from tkinter import filedialog
-    GUI_AVAILABLE = True
-except ImportError:
-    GUI_AVAILABLE = False
-    tk = None
-    filedialog = None
-
-# 导入自定义模块
-from modules.data_manager import DataManager
-from modules.data_extractor import extract_schema, extract_data, extract_filters
-from modules.filter_processor import apply_filters
-from modules.output_generator import export_to_xlsx
+# 只在启动时导入轻量模块；tkinter 仅在未指定输入文件时导入，
+# pandas/openpyxl 等处理模块在确认输入文件后才导入，缩短启动时间
 from modules.config import Config
-from clean_output import clean_output_directory
+from clean_output import OutputRotation, clean_output_directory
 
 def setup_logging(config):
     """
@@ -54,7 +41,11 @@ def select_excel_file() -> str:
     Returns:
         str: 选择的文件路径
     """
-    if not GUI_AVAILABLE:
+    # 尝试导入 tkinter，不可用时使用默认测试文件
+    try:
+        import tkinter as tk
+        from tkinter import filedialog
+    except ImportError:
         print("错误: GUI 模式不可用")
         print("使用默认测试文件: templates/全维度筛选.xlsx")
         return "templates/全维度筛选.xlsx"
@@ -98,14 +89,19 @@ def main() -> None:
         return
     
     try:
-        # 清理上次运行的结果
-        logger.info("清理上次运行的结果...")
-        clean_output_directory()
+        # 增量模式下保留上次运行中各条件的结果与清单
+        keep = None
+        if config.get('output', 'incremental', False):
+            from modules.incremental import KEEP_PATTERNS
+            keep = KEEP_PATTERNS
         
-        # 初始化数据管理器
-        data_manager = DataManager()
-        # 设置输出目录为项目根目录下的outputs目录，而不是src目录
-        data_manager.set_output_dir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        rotation = None
+        if config.get('output', 'rotation', True):
+            # 结果写入新的运行目录，完成后再切换输出目录，无需清理上次运行的结果
+            rotation = OutputRotation(keep_runs=config.get('output', 'keep_runs', 3), keep=keep)
+        else:
+            logger.info("清理上次运行的结果...")
+            clean_output_directory(keep=keep)
         
         # 获取命令行参数
         if len(sys.argv) > 1:
@@ -122,21 +118,21 @@ def main() -> None:
             logger.error(f"输入文件不存在: {input_xlsx}")
             return
         
-        # 执行流程
-        print("1. 提取表结构...")
-        extract_schema(input_xlsx, data_manager)
-        
-        print("2. 提取数据总表...")
-        extract_data(input_xlsx, data_manager)
-        
-        print("3. 提取筛选条件...")
-        extract_filters(input_xlsx, data_manager)
-        
-        print("4. 应用筛选条件...")
-        apply_filters(data_manager)
+        # 确认输入文件后再导入数据处理模块（pandas、numpy 等）
+        from modules.pipeline import process_workbook
         
-        print("5. 导出结果到 XLSX...")
-        output_path = export_to_xlsx(input_xlsx, data_manager)
+        # 输出目录为项目根目录下的outputs目录，而不是src目录
+        output_dir = None
+        if rotation:
+            output_dir = rotation.stage()
+        result = process_workbook(input_xlsx, config, os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  output_dir)
+        output_path = result["output_path"]
+        if rotation:
+            rotation.publish()
+            output_path = rotation.published_path(output_path)
+            # 旧的运行目录在发布后由后台线程删除；不能在处理前启动，并行筛选 fork 子进程时不能有其他线程
+            rotation.collect()
         
         print(f"=== 处理完成，结果保存在: {output_path} ===")
         logger.info(f"=== 处理完成，结果保存在: {output_path} ===")
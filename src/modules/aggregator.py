@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import math
+import os
+import numpy as np
+import pandas as pd
+
+# 支持的汇总函数
+AGGREGATE_FUNCTIONS = ("count", "sum", "min", "max", "mean", "distinct")
+
+
+def full_rows_enabled(config) -> bool:
+    """是否输出各条件的完整记录（未启用汇总时总是输出）"""
+    return not config.get('aggregate', 'enabled', False) or config.get('aggregate', 'full_rows', True)
+
+
+def _number(value):
+    """汇总值写出前的格式：整数值去掉小数部分，缺失值为空"""
+    if value is None or math.isnan(value):
+        return None
+    if float(value).is_integer():
+        return int(value)
+    return round(float(value), 6)
+
+
+class ConditionAggregator:
+    """
+    按条件汇总筛选结果（结果流的消费者，见 result_stream）
+
+    打开时将汇总字段转换为数值数组（非数值与空值为 NaN）并按匹配键编码一次，每收到一个
+    条件的匹配记录序号即在数组上切片计算记录数、求和、最小值、最大值、平均值与不同值个数，
+    不从数据总表中取出记录。未配置 aggregate.fields 时汇总全部数值字段（序号除外）。
+    全部条件汇总后写出一个汇总 CSV（aggregate.file），汇总表同时保存在
+    DataManager.condition_summary 中，由 XLSX 写出为“条件汇总”工作表。分块模式不支持汇总。
+    """
+
+    # 汇总行按条件序号保存，计算量小，一个写出线程即可
+    threads = 1
+
+    def __init__(self, data_mgr):
+        """
+        初始化汇总
+
+        Args:
+            data_mgr: 数据管理器（需要已加载数据总表与筛选条件）
+
+        Raises:
+            ValueError: 如果配置了不支持的汇总函数或不存在的字段
+        """
+        self.data_mgr = data_mgr
+        config = data_mgr.config
+        self.functions = list(config.get('aggregate', 'functions', list(AGGREGATE_FUNCTIONS)))
+        unsupported = [function for function in self.functions if function not in AGGREGATE_FUNCTIONS]
+        if unsupported:
+            raise ValueError(f"不支持的汇总函数: {', '.join(unsupported)}")
+
+        fields = list(config.get('aggregate', 'fields', []) or [])
+        missing = [field for field in fields if field not in data_mgr.data_fields()]
+        if missing:
+            raise ValueError(f"汇总字段不存在: {', '.join(missing)}")
+        self.fields = fields
+        self.output_path = os.path.join(data_mgr.output_dir, config.get('aggregate', 'file', '条件汇总.csv'))
+        self._values = {}
+        self._codes = {}
+        self._rows = {}
+
+    def open(self) -> None:
+        configured = bool(self.fields)
+        for position, field in enumerate(self.data_mgr.data_fields()):
+            if (field not in self.fields) if configured else field == '序号':
+                continue
+            raw = pd.Series(self.data_mgr.field_values(position), dtype=object)
+            values = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64)
+            # 未配置汇总字段时只汇总数值字段：存在非空但无法转换为数值的单元格即跳过
+            present = (raw.notna() & (raw != "")).to_numpy()
+            if not configured and (not present.any() or (np.isnan(values) & present).any()):
+                continue
+            self._values[field] = values
+        if not configured:
+            self.fields = list(self._values)
+        if "distinct" in self.functions:
+            for field in self.fields:
+                self._codes[field] = pd.factorize(pd.Series(self.data_mgr.key_column(field), dtype=object))[0]
+
+    def aggregate(self, record_ids) -> dict:
+        """
+        计算一组匹配记录的汇总值
+
+        Args:
+            record_ids: 匹配记录序号
+
+        Returns:
+            dict: 记录数与 <字段>_<汇总函数> -> 汇总值（没有可汇总的值时为 None）
+        """
+        record_ids = np.asarray(record_ids, dtype=np.intp)
+        row = {"记录数": len(record_ids)}
+        for field in self.fields:
+            values = self._values[field][record_ids]
+            values = values[~np.isnan(values)]
+            for function in self.functions:
+                if function == "count":
+                    value = len(values)
+                elif function == "sum":
+                    value = values.sum()
+                elif function == "distinct":
+                    codes = self._codes[field][record_ids]
+                    value = len(np.unique(codes[codes >= 0]))
+                elif not len(values):
+                    value = None
+                else:
+                    value = getattr(values, function)()
+                row[f"{field}_{function}"] = _number(value)
+        return row
+
+    def write(self, idx: int, record_ids, unchanged: bool = False) -> None:
+        condition_name = f"条件_{idx + 1}"
+        with self.data_mgr.metrics.measure(condition_name, "aggregate_seconds"):
+            filter_item = self.data_mgr.filter_store[idx]
+            self._rows[idx] = {
+                "条件": condition_name,
+                "筛选条件": ' '.join(f'{k}={v}' for k, v in filter_item.items()),
+                **self.aggregate(record_ids),
+            }
+
+    def close(self) -> None:
+        """
+        写出汇总 CSV，并将汇总表保存到数据管理器
+
+        Raises:
+            ValueError: 如果部分条件的结果没有汇总
+        """
+        if len(self._rows) < len(self.data_mgr.filter_store):
+            missing = min(set(range(len(self.data_mgr.filter_store))) - set(self._rows))
+            raise ValueError(f"汇总时缺少条件_{missing + 1} 的筛选结果")
+        rows = [self._rows[idx] for idx in sorted(self._rows)]
+        with open(self.output_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        self.data_mgr.condition_summary = rows
+        self.data_mgr.logger.info(f"条件汇总：{len(self.fields)} 个字段，已保存到 {self.output_path}")
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+import pandas as pd
+from .data_manager import DataManager
+from .filter_processor import _create_planner, _write_csv_preamble
+from .result_writer import open_csv, result_suffix
+from .streaming_reader import iter_sheet_rows
+
+
+class _BlockSpill:
+    """
+    按记录分块的数据总表临时文件
+
+    总表每行一个字段、每列一条记录，取出一个记录块之前必须读完所有行。读取时每一行按
+    记录块切分为片段，依次追加到同一个临时文件并记录偏移量；之后每次只读出一个块的
+    片段。读取过程中内存只保留当前一行，处理时只保留当前一个块。
+
+    临时文件只在本进程内写入和读取，处理结束后即删除，因此片段直接以 pickle 序列化。
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self.fields = []
+        self.record_count = 0
+        # 块序号 -> [(字段位置, 文件偏移), ...]
+        self.segments = {}
+        self._file = tempfile.TemporaryFile()
+
+    def append_row(self, field, values: list) -> None:
+        """追加一个字段在全部记录上的值"""
+        position = len(self.fields)
+        self.fields.append(field)
+        self.record_count = max(self.record_count, len(values))
+        for start in range(0, len(values), self.block_size):
+            segment = values[start:start + self.block_size]
+            if not any(value is not None for value in segment):
+                continue  # 全部为空的片段无需写入，读取时默认为空值
+            self.segments.setdefault(start // self.block_size, []).append((position, self._file.tell()))
+            pickle.dump(segment, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def block_count(self) -> int:
+        return -(-self.record_count // self.block_size)
+
+    def load_block(self, block: int) -> list:
+        """
+        读出一个记录块
+
+        Returns:
+            list: 记录字典列表，字段顺序与数据总表一致
+        """
+        size = min(self.block_size, self.record_count - block * self.block_size)
+        records = [dict.fromkeys(self.fields) for _ in range(size)]
+        for position, offset in self.segments.get(block, []):
+            self._file.seek(offset)
+            field = self.fields[position]
+            for record, value in zip(records, pickle.load(self._file)):
+                record[field] = value
+        return records
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _spill_data_sheet(input_file: str, sheet_name: str, block_size: int, csv_path: str):
+    """
+    流式读取数据总表并按记录块写入临时文件，同时写出 总表.csv
+
+    Returns:
+        tuple: (原始第一列, _BlockSpill)
+    """
+    spill = _BlockSpill(block_size)
+    header_column = []
+    with open(csv_path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        rows = iter_sheet_rows(input_file, sheet_name)
+        title_row = next(rows, None)
+        if title_row is None:
+            return header_column, spill
+        writer.writerow(title_row)
+        header_column.append(title_row[0])
+        # 首行首列为序号列标题，其余每个单元格对应一条记录
+        spill.record_count = len(title_row) - 1
+        for row in rows:
+            writer.writerow(row)
+            header_column.append(row[0] if row else None)
+            spill.append_row(row[0] if row else None, row[1:])
+    return header_column, spill
+
+
+def _csv_value(value):
+    """CSV 单元格：空值（None、NaN）写为空字符串"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return value
+
+
+class _ProgressBar:
+    """在终端中显示已处理记录数与吞吐（条/秒），非终端环境下按块写入日志"""
+
+    WIDTH = 30
+
+    def __init__(self, total: int, logger, enabled: bool = True):
+        self.total = total
+        self.logger = logger
+        self.interactive = enabled and sys.stderr.isatty()
+        self.started = time.perf_counter()
+
+    def update(self, done: int) -> None:
+        rate = done / max(time.perf_counter() - self.started, 1e-9)
+        if self.interactive:
+            filled = self.WIDTH * done // self.total if self.total else self.WIDTH
+            sys.stderr.write(f"\r分块筛选 [{'#' * filled}{'-' * (self.WIDTH - filled)}] "
+                             f"{done}/{self.total} 条记录，{rate:.0f} 条/秒")
+            if done >= self.total:
+                sys.stderr.write("\n")
+            sys.stderr.flush()
+        else:
+            self.logger.info(f"分块筛选进度：{done}/{self.total} 条记录，{rate:.0f} 条/秒")
+
+
+def apply_filters_chunked(input_file: str, data_mgr: DataManager) -> dict:
+    """
+    分块筛选：数据总表按固定大小的记录块处理，内存占用与总表规模无关
+
+    数据总表先流式读取并按记录块写入临时文件；随后逐块读出，在每个块上一次性计算
+    全部筛选条件（沿用配置的筛选引擎与规划器），匹配的记录追加写入各条件的 CSV。
+    整个过程不在内存中保留完整的总表与筛选结果，因此不生成 XLSX，也不支持增量模式与条件汇总（启用时记录警告）。
+
+    条件结果文件只在追加一个块的匹配记录时打开，同时打开的文件数与条件数无关。压缩格式
+    （csv.gz、csv.zst）先追加到未压缩的临时文件，全部块处理完成后逐个压缩写出，每个条件
+    只有一个完整的压缩流。
+
+    需要先调用 extract_filters 提取筛选条件。
+
+    Args:
+        input_file (str): 输入文件路径
+        data_mgr (DataManager): 数据管理器实例
+
+    Returns:
+        dict: 记录数、块数与每个条件的匹配行数
+
+    Raises:
+        ValueError: 如果筛选条件未加载、数据总表不存在或输出格式不支持分块写出
+    """
+    if not data_mgr.filter_store:
+        raise ValueError("筛选条件未加载，请先提取筛选条件")
+    suffix = result_suffix(data_mgr.config.get('output', 'format', 'csv'))
+    if suffix is None:
+        raise ValueError("分块模式只支持 CSV 格式的输出（output.format: csv、csv.gz 或 csv.zst）")
+    if data_mgr.config.get('output', 'incremental', False):
+        data_mgr.logger.warning("分块模式不支持增量运行，将重新计算全部条件")
+    if data_mgr.config.get('aggregate', 'enabled', False):
+        data_mgr.logger.warning("分块模式不支持条件汇总，不生成汇总文件，仍输出各条件的完整记录")
+
+    config = data_mgr.config
+    block_size = max(int(config.get('chunked', 'block_size', 10000)), 1)
+    sheet_name = config.get('sheets', 'data_sheet', '总表')
+    if not os.path.exists(input_file):
+        raise FileNotFoundError(f"输入文件不存在: {input_file}")
+
+    csv_path = os.path.join(data_mgr.output_dir, "总表.csv")
+    data_mgr.header_column, spill = _spill_data_sheet(input_file, sheet_name, block_size, csv_path)
+    data_mgr.logger.info(f"已将总表保存到 {csv_path}")
+    fields = list(dict.fromkeys(spill.fields))
+    condition_names = [f"条件_{idx + 1}" for idx in range(len(data_mgr.filter_store))]
+    matched = dict.fromkeys(condition_names, 0)
+
+    compressed = suffix != ".csv"
+    output_paths = [os.path.join(data_mgr.output_dir, f"{name}{suffix}") for name in condition_names]
+    spool_dir = tempfile.TemporaryDirectory() if compressed else None
+    # 追加匹配记录的文件：CSV 直接追加到结果文件，压缩格式追加到临时文件
+    append_paths = ([os.path.join(spool_dir.name, f"{name}.csv") for name in condition_names]
+                    if compressed else output_paths)
+    try:
+        data_mgr.logger.info(f"分块筛选：共 {spill.record_count} 条记录，{len(fields)} 个字段，"
+                             f"每块 {block_size} 条，共 {spill.block_count()} 块")
+        for output_path, append_path, filter_item in zip(output_paths, append_paths, data_mgr.filter_store):
+            # 写入文件头后关闭，各块的匹配记录依次追加（压缩格式在处理完成后重新写出完整文件，
+            # 此处同时检查压缩依赖是否可用）
+            with open_csv(output_path) as stream:
+                _write_csv_preamble(stream, filter_item)
+            if compressed:
+                open(append_path, "w", encoding="utf-8").close()
+
+        progress = _ProgressBar(spill.record_count, data_mgr.logger, config.get('chunked', 'progress', True))
+        vectorized = config.get('filter', 'engine', 'index') == 'vectorized'
+        for block in range(spill.block_count()):
+            records = spill.load_block(block)
+            # 每个块使用独立的数据管理器与规划器，块处理完成后即释放
+            block_mgr = DataManager(config)
+            block_mgr.filter_store = data_mgr.filter_store
+            if vectorized:
+                block_mgr.data_frame = pd.DataFrame(records, columns=fields, dtype=object)
+            else:
+                block_mgr.data_store = records
+            planner = _create_planner(block_mgr)
+
+            for idx, condition_name in enumerate(condition_names):
+                with data_mgr.metrics.measure(condition_name, "filter_seconds"):
+                    record_ids = planner.select(idx)
+                if not len(record_ids):
+                    continue
+                with data_mgr.metrics.measure(condition_name, "write_seconds"), \
+                        open(append_paths[idx], "a", newline="", encoding="utf-8") as stream:
+                    # 与按条件一次写出（pandas.to_csv）的换行符保持一致；表头在首次有匹配记录时写入
+                    writer = csv.writer(stream, lineterminator="\n")
+                    if not matched[condition_name]:
+                        writer.writerow(fields)
+                    writer.writerows([_csv_value(records[record_id].get(field)) for field in fields]
+                                     for record_id in record_ids)
+                matched[condition_name] += len(record_ids)
+            progress.update(block * block_size + len(records))
+
+        for idx, condition_name in enumerate(condition_names):
+            if not matched[condition_name]:
+                # 没有匹配记录的条件只写表头，与按条件一次写出时的空结果文件一致
+                with open(append_paths[idx], "a", newline="", encoding="utf-8") as stream:
+                    csv.DictWriter(stream, fieldnames=[field for field in fields if field != '序号']).writeheader()
+            if compressed:
+                with data_mgr.metrics.measure(condition_name, "write_seconds"), \
+                        open_csv(output_paths[idx]) as stream, \
+                        open(append_paths[idx], "r", newline="", encoding="utf-8") as spooled:
+                    _write_csv_preamble(stream, data_mgr.filter_store[idx])
+                    shutil.copyfileobj(spooled, stream)
+                os.remove(append_paths[idx])
+    finally:
+        if spool_dir:
+            spool_dir.cleanup()
+        spill.close()
+
+    for condition_name, rows in matched.items():
+        data_mgr.metrics.count(condition_name, rows=rows)
+        data_mgr.logger.info(f"{condition_name} 筛选完成，共 {rows} 条记录，已保存到 "
+                             f"{os.path.join(data_mgr.output_dir, condition_name + suffix)}")
+    return {"records": spill.record_count, "blocks": spill.block_count(), "matched": matched}
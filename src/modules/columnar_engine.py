@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from .match_keys import data_match_key
+from .predicates import PredicateCache, compile_predicate
+
+
+# infer_dtype 判定为以下类型时，非空值类型一致（或只在数值上相等时匹配键也相同），无需按类型区分原始值
+_SINGLE_TYPE_DTYPES = {"empty", "string", "integer", "boolean"}
+
+
+def encoded_value_counts(codes: np.ndarray, code_of: dict) -> dict:
+    """
+    由字段的整数编码统计各匹配键的出现次数（np.bincount，不再逐个单元格计数）
+
+    Args:
+        codes: 每条记录的编码（空值为 -1）
+        code_of: 匹配键 -> 编码
+
+    Returns:
+        dict: 匹配键 -> 记录数，空值的键为 None（与 DataManager.value_counts 一致）
+    """
+    counts = np.bincount(codes[codes >= 0], minlength=len(code_of))
+    result = {key: int(counts[code]) for key, code in code_of.items()}
+    nulls = int((codes < 0).sum())
+    if nulls:
+        result[None] = nulls
+    return result
+
+
+class ColumnarMatcher:
+    """
+    列式向量化筛选引擎
+
+    将转置后的总表按列编码为整数代码（相同匹配键共享同一代码，空值为 -1），
+    每个筛选条件在整列上计算一次布尔掩码，不再逐条构造字典、逐个单元格比较。
+
+    列编码按字段惰性构建，每个字段只编码一次；集合、范围等谓词在字段的不同匹配键上
+    判断一次，得到满足条件的代码集合后用 np.isin 在整列上计算掩码（代码集合的缓存项数有上限，
+    见 predicates.PredicateCache）。
+    """
+
+    def __init__(self, data_frame: pd.DataFrame):
+        """
+        初始化引擎
+
+        Args:
+            data_frame: 转置后的总表，每行一条记录，每列一个字段
+        """
+        self.data_frame = data_frame
+        self.record_count = len(data_frame)
+        self._columns = {}
+        self._predicate_codes = PredicateCache()
+
+    def _encode_column(self, field) -> tuple:
+        """
+        将单个字段编码为整数代码
+
+        Args:
+            field: 字段名
+
+        Returns:
+            tuple: (代码数组, 匹配键 -> 代码 的映射)
+        """
+        # 先按原始值编码，只对不同的原始值计算匹配键；空值也按原始值参与规范化
+        values = self.data_frame[field].tolist()
+        pair_codes, pairs = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+        if pd.api.types.infer_dtype(values, skipna=True) not in _SINGLE_TYPE_DTYPES:
+            # 相等但类型不同的值（如 1 与 True）在 pandas 中会合并为同一代码，按（原始值, 类型）区分
+            kind_codes, kinds = pd.factorize(pd.Series(list(map(type, values)), dtype=object))
+            pair_codes, pairs = pd.factorize(pair_codes.astype(np.int64) * len(kinds) + kind_codes)
+        # 每个（原始值, 类型）组合首次出现的位置
+        first = np.empty(len(pairs), dtype=np.intp)
+        first[pair_codes[::-1]] = np.arange(len(values) - 1, -1, -1)
+        keys = [data_match_key(values[position]) for position in first.tolist()]
+        # 按规范化后的匹配键合并代码：空值（匹配键为 None）的代码为 -1，不参与匹配（pandas 各版本的默认行为）
+        key_codes, uniques = pd.factorize(pd.Series(keys, dtype=object))
+        return key_codes[pair_codes], {key: code for code, key in enumerate(uniques)}
+
+    def column(self, field) -> tuple:
+        """获取字段的编码列，首次访问时构建；字段不存在时返回 None"""
+        if field not in self._columns:
+            if field not in self.data_frame.columns:
+                self._columns[field] = None
+            else:
+                self._columns[field] = self._encode_column(field)
+        return self._columns[field]
+
+    def value_counts(self, field) -> dict:
+        """字段各匹配键的出现次数，由已有的列编码统计（字段不存在时全部为空值）"""
+        column = self.column(field)
+        if column is None:
+            return {None: self.record_count} if self.record_count else {}
+        return encoded_value_counts(*column)
+
+    def codes(self, field, predicate) -> np.ndarray:
+        """
+        获取满足谓词的代码
+
+        Args:
+            field: 字段名
+            predicate: 已编译的谓词
+
+        Returns:
+            np.ndarray | None: 满足谓词的代码数组，没有满足的值（或字段不存在）时返回 None
+        """
+        cache_key = (field, predicate)
+        if cache_key not in self._predicate_codes:
+            column = self.column(field)
+            if column is None:
+                codes = []
+            elif predicate.exact is not None:
+                codes = [column[1][predicate.exact]] if predicate.exact in column[1] else []
+            else:
+                codes = [code for key, code in column[1].items() if predicate.accepts(key)]
+            self._predicate_codes[cache_key] = np.asarray(codes, dtype=np.intp) if codes else None
+        return self._predicate_codes[cache_key]
+
+    def _field_mask(self, field, codes: np.ndarray, record_ids=None) -> np.ndarray:
+        """字段代码（可只取候选记录）是否属于满足谓词的代码"""
+        column = self.column(field)[0]
+        if record_ids is not None:
+            column = column[record_ids]
+        if len(codes) == 1:
+            return column == codes[0]
+        return np.isin(column, codes)
+
+    def mask(self, filter_item: dict) -> np.ndarray:
+        """
+        计算筛选条件的布尔掩码
+
+        Args:
+            filter_item: 筛选条件（单元格值或已编译的谓词），空字符串视为通配符
+
+        Returns:
+            np.ndarray: 长度为记录数的布尔数组
+        """
+        mask = np.ones(self.record_count, dtype=bool)
+        for field, value in filter_item.items():
+            predicate = compile_predicate(value)
+            if predicate is None:
+                continue  # 通配符，跳过该字段
+
+            codes = self.codes(field, predicate)
+            if codes is None:
+                return np.zeros(self.record_count, dtype=bool)
+            mask &= self._field_mask(field, codes)
+        return mask
+
+    def prepare(self, filter_store: list) -> None:
+        """
+        预先为筛选条件中出现过非空值的字段完成列编码
+
+        并行筛选时在主进程中调用，子进程通过 fork 直接共享已编码的列。
+
+        Args:
+            filter_store: 筛选条件列表
+        """
+        for filter_item in filter_store:
+            for field, value in filter_item.items():
+                predicate = compile_predicate(value)
+                if predicate is not None:
+                    self.codes(field, predicate)
+
+    def match(self, filter_item: dict, candidates: np.ndarray = None) -> np.ndarray:
+        """
+        查询满足筛选条件的记录
+
+        Args:
+            filter_item: 筛选条件
+            candidates: 候选记录序号（升序），指定时只在候选记录上比较
+
+        Returns:
+            np.ndarray: 按数据总表顺序排列的匹配记录序号（np.uint32，与其他引擎一致）
+        """
+        if candidates is None:
+            return np.flatnonzero(self.mask(filter_item)).astype(np.uint32)
+
+        result = candidates
+        for field, value in filter_item.items():
+            predicate = compile_predicate(value)
+            if predicate is None:
+                continue  # 通配符，跳过该字段
+
+            codes = self.codes(field, predicate)
+            if codes is None:
+                return result[:0]
+            result = result[self._field_mask(field, codes, result)]
+        return result
\ No newline at end of file
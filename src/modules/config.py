@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import copy
 import os
 import yaml
 import logging
@@ -15,9 +16,68 @@ class Config:
             "data_sheet": "总表",
             "filter_sheet": "总表筛选"
         },
+        "input": {
+            "reader": "pandas"
+        },
         "output": {
             "directory": "outputs",
-            "condition_prefix": "条件_"
+            "condition_prefix": "条件_",
+            "xlsx_engine": "openpyxl",
+            "format": "csv",
+            "xlsx_sheets": True,
+            "incremental": False,
+            "async_writes": True,
+            "queue_size": 8,
+            "rotation": True,
+            "keep_runs": 3
+        },
+        "filter": {
+            "engine": "index",
+            "reuse_results": True,
+            "order_by_selectivity": True,
+            "predicates": False
+        },
+        "cache": {
+            "enabled": True,
+            "directory": "cache",
+            "max_size_mb": 1024,
+            "max_entries": 16
+        },
+        "chunked": {
+            "enabled": False,
+            "block_size": 10000,
+            "progress": True
+        },
+        "parallel": {
+            "workers": 1,
+            "writer_threads": 4
+        },
+        "batch": {
+            "workers": 0,
+            "output_root": "batch_outputs"
+        },
+        "service": {
+            "host": "127.0.0.1",
+            "port": 8765,
+            "poll_seconds": 2,
+            "max_records": 100,
+            "output_root": "service_outputs"
+        },
+        "metrics": {
+            "enabled": True,
+            "file": "metrics.json",
+            "profile": "none"
+        },
+        "aggregate": {
+            "enabled": False,
+            "fields": [],
+            "functions": ["count", "sum", "min", "max", "mean", "distinct"],
+            "full_rows": True,
+            "file": "条件汇总.csv"
+        },
+        "diagnostics": {
+            "enabled": False,
+            "samples": 5
         },
         "logging": {
             "level": "INFO",
@@ -33,7 +93,8 @@ class Config:
         Args:
             config_file: 配置文件路径，如果为None则使用默认配置
         """
-        self.config = self.DEFAULT_CONFIG.copy()
+        # 深拷贝，避免合并用户配置时修改类级别的默认配置
+        self.config = copy.deepcopy(self.DEFAULT_CONFIG)
         self.config_file = config_file
         
         if config_file and os.path.exists(config_file):
@@ -4,6 +4,9 @@
 import os
 import pandas as pd
 from .data_manager import DataManager
+from .predicates import enable_predicates
+from .streaming_reader import read_data_sheet
+from .table_cache import TableCache, sheet_digest
 
 def extract_schema(input_file: str, data_mgr: DataManager) -> None:
     """
@@ -16,6 +19,133 @@ def extract_schema(input_file: str, data_mgr: DataManager) -> None:
     data_mgr.logger.info(f"表结构提取功能预留: {input_file}")
 
 
+def load_workbook(input_file: str, data_mgr: DataManager) -> None:
+    """
+    一次性解析输入文件中需要的 Sheet（数据总表与筛选条件），并缓存到数据管理器中
+    
+    工作簿只打开一次，每个 Sheet 只解析一次，后续的提取与导出步骤共享解析结果，
+    避免对同一文件重复执行 openpyxl 解析。
+    
+    Args:
+        input_file (str): 输入文件路径，应为 XLSX 格式
+        data_mgr (DataManager): 数据管理器实例
+    """
+    data_sheet = data_mgr.config.get('sheets', 'data_sheet', '总表')
+    filter_sheet = data_mgr.config.get('sheets', 'filter_sheet', '总表筛选')
+    
+    with pd.ExcelFile(input_file) as excel_file:
+        data_mgr.sheet_names = excel_file.sheet_names
+        data_mgr.sheets = {}
+        # 流式读取模式下数据总表由 read_data_sheet 单独处理，分块模式下由 chunked_filter 逐块读取；
+        # 数据总表已从缓存加载时也无需再解析，这些情况下只解析筛选条件
+        streaming = (data_mgr.config.get('input', 'reader', 'pandas') == 'streaming'
+                     or data_mgr.config.get('chunked', 'enabled', False))
+        if data_sheet in excel_file.sheet_names and not streaming and not data_mgr.has_data():
+            data_mgr.sheets[data_sheet] = excel_file.parse(data_sheet)
+        if filter_sheet in excel_file.sheet_names:
+            # 注意：dtype=str 确保所有值被读取为字符串，但不会处理空值
+            data_mgr.sheets[filter_sheet] = excel_file.parse(filter_sheet, dtype=str)
+    
+    data_mgr.source_file = input_file
+    data_mgr.logger.info(f"已解析工作簿 {input_file}，共 {len(data_mgr.sheets)} 个 Sheet")
+
+
+def _take_sheet(input_file: str, data_mgr: DataManager, sheet_name: str) -> pd.DataFrame:
+    """
+    从数据管理器中取出已解析的 Sheet，尚未解析时先加载工作簿
+    
+    取出后缓存即被释放，避免原始 Sheet 在整个运行期间常驻内存。
+    
+    Args:
+        input_file (str): 输入文件路径
+        data_mgr (DataManager): 数据管理器实例
+        sheet_name (str): Sheet 名称
+        
+    Returns:
+        pd.DataFrame: 解析后的 Sheet
+        
+    Raises:
+        ValueError: 如果 XLSX 文件中不存在该 Sheet
+    """
+    if data_mgr.source_file != input_file or sheet_name not in data_mgr.sheets:
+        load_workbook(input_file, data_mgr)
+    
+    if sheet_name not in data_mgr.sheets:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+    return data_mgr.sheets.pop(sheet_name)
+
+
+def _extract_data_streaming(input_file: str, data_mgr: DataManager, sheet_name: str) -> None:
+    """
+    以流式只读模式提取数据总表，读取过程中直接构建逐条记录的结构
+    
+    Args:
+        input_file (str): 输入文件路径
+        data_mgr (DataManager): 数据管理器实例
+        sheet_name (str): 数据总表 Sheet 名称
+    """
+    output_path = os.path.join(data_mgr.output_dir, "总表.csv")
+    as_frame = data_mgr.config.get('filter', 'engine') == 'vectorized'
+    header_column, records = read_data_sheet(input_file, sheet_name, output_path, as_frame)
+    data_mgr.logger.info(f"已将总表保存到 {output_path}")
+    
+    data_mgr.header_column = header_column
+    if as_frame:
+        data_mgr.data_frame = records
+    else:
+        data_mgr.data_store = records
+
+
+def _open_table_cache(data_mgr: DataManager):
+    """按配置创建数据总表缓存，未启用或未设置输出目录时返回 None"""
+    if not data_mgr.config.get('cache', 'enabled', True) or data_mgr.cache_dir is None:
+        return None
+    max_size_mb = data_mgr.config.get('cache', 'max_size_mb', 1024)
+    max_entries = data_mgr.config.get('cache', 'max_entries', 16)
+    return TableCache(data_mgr.cache_dir, max_size_mb, data_mgr.logger, max_entries)
+
+
+def _store_columns(data_mgr: DataManager, fields: list, columns: list) -> None:
+    """将按字段组织的列数据存入数据管理器（列式模式为 DataFrame，否则为记录字典列表）"""
+    if data_mgr.config.get('filter', 'engine') == 'vectorized':
+        frame = pd.DataFrame(dict(enumerate(columns)), columns=range(len(fields)), dtype=object)
+        frame.columns = fields
+        data_mgr.data_frame = frame
+    else:
+        data_mgr.data_store = [dict(zip(fields, values)) for values in zip(*columns)]
+
+
+def _load_from_cache(cache: TableCache, key: str, data_mgr: DataManager) -> bool:
+    """
+    从缓存加载数据总表，并将缓存的原始总表复制为 总表.csv
+    
+    Returns:
+        bool: 是否命中缓存
+    """
+    cached = cache.load(key)
+    if cached is None:
+        return False
+    
+    output_path = os.path.join(data_mgr.output_dir, "总表.csv")
+    if not cache.restore_csv(key, output_path):
+        return False
+    
+    header_column, fields, columns = cached
+    data_mgr.header_column = header_column
+    _store_columns(data_mgr, fields, columns)
+    data_mgr.logger.info(f"已从缓存加载数据总表，并将总表保存到 {output_path}")
+    return True
+
+
+def _save_to_cache(cache: TableCache, key: str, input_file: str, data_mgr: DataManager) -> None:
+    """将刚解析的数据总表写入缓存"""
+    fields = data_mgr.data_fields()
+    columns = [data_mgr.field_values(position) for position in range(len(fields))]
+    output_path = os.path.join(data_mgr.output_dir, "总表.csv")
+    if cache.store(key, data_mgr.header_column, fields, columns, output_path, input_file):
+        data_mgr.logger.info(f"已缓存数据总表: {key}")
+
+
 def extract_data(input_file: str, data_mgr: DataManager) -> None:
     """
     从输入文件中提取数据总表
@@ -34,17 +164,42 @@ def extract_data(input_file: str, data_mgr: DataManager) -> None:
     if not os.path.exists(input_file):
         raise FileNotFoundError(f"输入文件不存在: {input_file}")
     
+    sheet_name = data_mgr.config.get('sheets', 'data_sheet', '总表')
+    reader = data_mgr.config.get('input', 'reader', 'pandas')
     try:
-        # 检查Sheet是否存在
-        excel_file = pd.ExcelFile(input_file)
-        if "总表" not in excel_file.sheet_names:
-            data_mgr.logger.error(f"输入文件缺少 '总表' Sheet，现有Sheet: {excel_file.sheet_names}")
+        # 数据总表版本：缓存键与增量模式的条件指纹都以此为依据
+        cache = _open_table_cache(data_mgr)
+        if cache:
+            data_mgr.data_version = cache.key_for(input_file, sheet_name, reader)
+        elif data_mgr.config.get('output', 'incremental', False):
+            data_mgr.data_version = f"{sheet_digest(input_file, sheet_name)}:{reader}"
+        
+        # 源文件内容未变化时直接使用缓存的解析结果，跳过 XLSX 解析
+        if cache and _load_from_cache(cache, data_mgr.data_version, data_mgr):
+            data_mgr.logger.info(f"成功提取数据总表，共 {data_mgr.record_count()} 条记录")
+            return
+        
+        # 检查Sheet是否存在（工作簿只在首次访问时解析一次）
+        if data_mgr.source_file != input_file:
+            load_workbook(input_file, data_mgr)
+        if sheet_name not in data_mgr.sheet_names:
+            data_mgr.logger.error(f"输入文件缺少 '{sheet_name}' Sheet，现有Sheet: {data_mgr.sheet_names}")
+            return
+        
+        if reader == 'streaming':
+            _extract_data_streaming(input_file, data_mgr, sheet_name)
+            data_mgr.logger.info(f"成功提取数据总表，共 {data_mgr.record_count()} 条记录")
+            if cache:
+                _save_to_cache(cache, data_mgr.data_version, input_file, data_mgr)
             return
         
         # 读取数据并打印原始样例
-        df = pd.read_excel(input_file, sheet_name="总表")
+        df = _take_sheet(input_file, data_mgr, sheet_name)
         data_mgr.logger.debug(f"原始数据前3行:\n{df.head(3).to_string()}")
         
+        # 保留原始第一列，供导出总表时作为表头使用，无需重新读取文件
+        data_mgr.header_column = df.iloc[:, 0].tolist()
+        
         # 保存总表到 CSV 文件
         output_path = os.path.join(data_mgr.output_dir, "总表.csv")
         df.to_csv(output_path, index=False)
@@ -55,13 +210,20 @@ def extract_data(input_file: str, data_mgr: DataManager) -> None:
         df.columns = df.iloc[0]
         df = df[1:]
         
-        # 提取数据并转换为字典列表
-        data_mgr.data_store = df.to_dict(orient="records")
+        if data_mgr.config.get('filter', 'engine') == 'vectorized':
+            # 列式模式：直接保留转置后的 DataFrame，不再为每条记录构造字典
+            data_mgr.data_frame = df.reset_index(drop=True)
+        else:
+            # 提取数据并转换为字典列表
+            data_mgr.data_store = df.to_dict(orient="records")
         
-        data_mgr.logger.info(f"成功加载 {len(data_mgr.data_store)} 条数据，首条样例: {data_mgr.data_store[0] if data_mgr.data_store else {}}")
-        data_mgr.logger.info(f"成功提取数据总表，共 {len(data_mgr.data_store)} 条记录")
+        sample = data_mgr.get_records([0])[0] if data_mgr.has_data() else {}
+        data_mgr.logger.info(f"成功加载 {data_mgr.record_count()} 条数据，首条样例: {sample}")
+        data_mgr.logger.info(f"成功提取数据总表，共 {data_mgr.record_count()} 条记录")
+        if cache:
+            _save_to_cache(cache, data_mgr.data_version, input_file, data_mgr)
     except ValueError as e:
-        raise ValueError(f"XLSX 文件中不存在名为 '总表' 的 Sheet: {input_file}") from e
+        raise ValueError(f"XLSX 文件中不存在名为 '{sheet_name}' 的 Sheet: {input_file}") from e
     except Exception as e:
         data_mgr.logger.error(f"提取数据时发生错误: {str(e)}")
         raise
@@ -85,15 +247,16 @@ def extract_filters(input_file: str, data_mgr: DataManager) -> None:
     if not os.path.exists(input_file):
         raise FileNotFoundError(f"输入文件不存在: {input_file}")
     
+    sheet_name = data_mgr.config.get('sheets', 'filter_sheet', '总表筛选')
     try:
-        # 读取筛选标签表，将所有列作为字符串处理
-        # 注意：dtype=str 确保所有值被读取为字符串，但不会处理空值
-        df = pd.read_excel(input_file, sheet_name="总表筛选", dtype=str)
+        # 读取筛选标签表（load_workbook 已将所有列作为字符串解析）
+        df = _take_sheet(input_file, data_mgr, sheet_name)
         
         # 处理空值：将 NaN 转换为空字符串
         # 即使指定了 dtype=str，空单元格仍会被读取为 NaN
         df = df.fillna('')
-        data_mgr.filter_store = df.to_dict(orient="records")
+        data_mgr.filter_store = enable_predicates(df.to_dict(orient="records"),
+                                                  data_mgr.config.get('filter', 'predicates', False))
         data_mgr.logger.info(f"成功提取筛选标签，共 {len(data_mgr.filter_store)} 条记录")
         
         # 添加 condition_group 列
@@ -104,7 +267,7 @@ def extract_filters(input_file: str, data_mgr: DataManager) -> None:
         filter_df.to_csv(filter_output_path, index=False, encoding='utf-8-sig')
         data_mgr.logger.info(f"已将筛选条件保存到 {filter_output_path}")
     except ValueError as e:
-        raise ValueError(f"XLSX 文件中不存在名为 '总表筛选' 的 Sheet: {input_file}") from e
+        raise ValueError(f"XLSX 文件中不存在名为 '{sheet_name}' 的 Sheet: {input_file}") from e
     except Exception as e:
         data_mgr.logger.error(f"提取筛选条件时发生错误: {str(e)}")
         raise
\ No newline at end of file
@@ -3,24 +3,171 @@
 
 import logging
 import os
+from collections import Counter
+import pandas as pd
+from .config import Config
+from .match_keys import data_match_key
+from .metrics import MetricsRecorder
 
 class DataManager:
     """数据管理类，用于管理数据状态和配置"""
     
-    def __init__(self):
+    def __init__(self, config: Config = None):
         self.data_store = []
+        # 列式模式下保存转置后的总表，此时不再构建 data_store 字典列表
+        self.data_frame = None
         self.filter_store = []
+        # 筛选结果：条件名称 -> 记录序号数组，记录本身只在数据总表中保存一份
         self.filtered_data = {}
+        # 条件汇总表：每个条件一行（见 aggregator），未启用汇总时为 None
+        self.condition_summary = None
+        # 工作簿解析缓存：每个 Sheet 只解析一次，由各提取步骤共享
+        self.source_file = None
+        self.sheet_names = []
+        self.sheets = {}
+        # 总表原始第一列，导出时作为表头
+        self.header_column = None
+        # 字段 -> 每条记录的匹配键列表，每个字段只规范化一次
+        self._key_columns = {}
+        # 字段 -> 各匹配键的出现次数，用于估计筛选谓词的选择度
+        self._value_counts = {}
+        # 数据总表版本（内容哈希），用于缓存与增量运行
+        self.data_version = None
         self.output_dir = None
+        # 数据总表解析缓存目录，位于输出目录之外，清理输出目录时不会被删除
+        self.cache_dir = None
+        # 未传入配置时使用默认配置，保证各模块都能读取到配置项
+        self.config = config or Config()
         self.logger = logging.getLogger(__name__)
+        # 运行指标：各阶段与各筛选条件的耗时、行数与内存
+        self.metrics = MetricsRecorder(self.config.get('metrics', 'enabled', True), self.logger)
     
-    def set_output_dir(self, base_path: str):
-        """设置输出目录"""
-        self.output_dir = os.path.join(base_path, "outputs")
+    def set_output_dir(self, base_path: str, output_dir: str = None):
+        """
+        设置输出目录
+        
+        Args:
+            base_path: 项目根目录，缓存目录位于其下
+            output_dir: 输出目录，为 None 时使用 base_path 下的 outputs 目录
+        """
+        self.output_dir = output_dir or os.path.join(base_path, "outputs")
         os.makedirs(self.output_dir, exist_ok=True)
+        self.cache_dir = os.path.join(base_path, self.config.get('cache', 'directory', 'cache'))
+    
+    def has_data(self) -> bool:
+        """数据总表是否已加载（兼容字典列表与列式两种存储）"""
+        return self.record_count() > 0
+    
+    def record_count(self) -> int:
+        """数据总表的记录数"""
+        if self.data_frame is not None:
+            return len(self.data_frame)
+        return len(self.data_store)
+    
+    def data_fields(self) -> list:
+        """数据总表的字段名列表"""
+        if self.data_frame is not None:
+            return list(self.data_frame.columns)
+        return list(self.data_store[0].keys()) if self.data_store else []
+    
+    def get_records(self, record_ids) -> list:
+        """
+        按记录序号获取数据项
+        
+        Args:
+            record_ids: 记录序号序列
+            
+        Returns:
+            list: 数据项字典列表
+        """
+        if self.data_frame is not None:
+            return self.data_frame.iloc[list(record_ids)].to_dict(orient="records")
+        return [self.data_store[record_id] for record_id in record_ids]
+    
+    def select_frame(self, record_ids) -> pd.DataFrame:
+        """
+        按记录序号从数据总表中切片，得到只包含这些记录的 DataFrame
+        
+        列类型与直接由记录字典构建 DataFrame 时一致，索引从 0 开始重新编号。
+        
+        Args:
+            record_ids: 记录序号序列
+            
+        Returns:
+            pd.DataFrame: 每行一条记录
+        """
+        if self.data_frame is not None:
+            return self.data_frame.iloc[record_ids].reset_index(drop=True).infer_objects()
+        return pd.DataFrame([self.data_store[record_id] for record_id in record_ids])
+    
+    def field_values(self, position: int, record_ids=None) -> list:
+        """
+        按字段位置获取一列的值
+        
+        Args:
+            position: 字段在 data_fields() 中的位置
+            record_ids: 记录序号序列，为 None 时返回全部记录
+            
+        Returns:
+            list: 字段值列表
+        """
+        if self.data_frame is not None:
+            column = self.data_frame.iloc[:, position]
+            return (column if record_ids is None else column.iloc[record_ids]).tolist()
+        
+        field = self.data_fields()[position]
+        records = self.data_store if record_ids is None else (self.data_store[i] for i in record_ids)
+        return [item.get(field) for item in records]
+    
+    def key_column(self, field) -> list:
+        """
+        获取字段在每条记录上的匹配键（见 match_keys.normalize_key），首次访问时计算
+        
+        Args:
+            field: 字段名，不存在的字段视为全部为空
+            
+        Returns:
+            list: 按记录顺序排列的匹配键，空值为 None
+        """
+        if field not in self._key_columns:
+            if self.data_frame is not None:
+                values = self.data_frame[field].tolist() if field in self.data_frame.columns else []
+            else:
+                values = [item.get(field) for item in self.data_store]
+            keys = [data_match_key(value) for value in values]
+            self._key_columns[field] = keys or [None] * self.record_count()
+        return self._key_columns[field]
+    
+    def value_counts(self, field) -> dict:
+        """
+        获取字段各匹配键的出现次数，首次访问时统计
+
+        Args:
+            field: 字段名
+
+        Returns:
+            dict: 匹配键 -> 记录数，空值的键为 None
+        """
+        if field not in self._value_counts:
+            self._value_counts[field] = Counter(self.key_column(field))
+        return self._value_counts[field]
+    
+    def to_frame(self) -> pd.DataFrame:
+        """以 DataFrame 形式返回数据总表（每行一条记录）"""
+        if self.data_frame is not None:
+            return self.data_frame
+        return pd.DataFrame(self.data_store)
     
     def clear_data(self):
         """清理所有数据"""
         self.data_store.clear()
+        self.data_frame = None
         self.filter_store.clear()
-        self.filtered_data.clear()
\ No newline at end of file
+        self.filtered_data.clear()
+        self.condition_summary = None
+        self._key_columns.clear()
+        self._value_counts.clear()
+        self.sheets.clear()
+        self.source_file = None
+        self.header_column = None
+        self.data_version = None
\ No newline at end of file
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from .columnar_engine import encoded_value_counts
+from .filter_planner import canonical_key
+
+# 空结果，避免每次未命中时重复创建数组
+_EMPTY = np.empty(0, dtype=np.uint32)
+
+
+class _Node:
+    """决策树节点：按当前层字段的匹配键分支，conditions 为在此节点满足全部谓词的条件"""
+
+    __slots__ = ("conditions", "exact", "others", "wildcard")
+
+    def __init__(self):
+        self.conditions = []
+        # 精确匹配：匹配键 -> 子节点
+        self.exact = {}
+        # 集合、范围等其他谓词：谓词 -> 子节点
+        self.others = {}
+        # 通配符（该字段为空单元格）的子节点
+        self.wildcard = None
+
+
+class DecisionTrie:
+    """
+    决策树筛选引擎：一次遍历数据总表得到全部筛选条件的结果
+
+    全部筛选条件编译为一棵决策树，每一层对应一个字段，节点按该字段的谓词分支，空单元格
+    （通配符）走通配分支；条件在其最后一个非空字段之后的节点结束。谓词相同的前缀只建立
+    一个分支，在该分支上只判断一次。
+
+    求值时记录序号从根节点出发，每个节点按字段的整数编码将到达的记录一次性划分到各分支
+    （精确匹配按编码排序后切片，其他谓词用满足条件的编码集合计算掩码），到达条件结束节点
+    的记录即为该条件的结果。每条记录在每个分支上只比较一次，条件越多、共享前缀越多，
+    相对逐个条件查询的优势越明显。
+    """
+
+    def __init__(self, data_mgr):
+        """
+        初始化决策树
+
+        Args:
+            data_mgr: 数据管理器，使用其预先计算的匹配键列（见 DataManager.key_column）
+        """
+        self.data_mgr = data_mgr
+        self.record_count = data_mgr.record_count()
+        self._encodings = {}
+        self._results = {}
+        self.stats = {"conditions": 0, "nodes": 0}
+
+    def _encoding(self, field) -> tuple:
+        """
+        字段的整数编码
+
+        Returns:
+            tuple: (每条记录的编码数组（空值为 -1）, 匹配键 -> 编码)
+        """
+        if field not in self._encodings:
+            codes, uniques = pd.factorize(pd.Series(self.data_mgr.key_column(field), dtype=object))
+            self._encodings[field] = (codes, {key: code for code, key in enumerate(uniques)})
+        return self._encodings[field]
+
+    def value_counts(self, field) -> dict:
+        """字段各匹配键的出现次数，由已有的字段编码统计"""
+        return encoded_value_counts(*self._encoding(field))
+
+    def build(self, keys: list):
+        """
+        将规范化条件键编译为决策树
+
+        字段按出现非空值的条件数从多到少排列，共享的谓词尽量靠近根节点。
+
+        Args:
+            keys: 规范化条件键列表（见 filter_planner.canonical_key）
+
+        Returns:
+            tuple: (根节点, 按层排列的字段)
+        """
+        usage = {}
+        for key in keys:
+            for field, _ in key:
+                usage[field] = usage.get(field, 0) + 1
+        fields = sorted(usage, key=lambda field: -usage[field])
+
+        root = _Node()
+        nodes = 1
+        for key in dict.fromkeys(keys):
+            predicates = dict(key)
+            node = root
+            for field in fields:
+                if not predicates:
+                    break
+                predicate = predicates.pop(field, None)
+                if predicate is None:
+                    if node.wildcard is None:
+                        node.wildcard, nodes = _Node(), nodes + 1
+                    node = node.wildcard
+                    continue
+                if predicate.exact is not None:
+                    branch, label = node.exact, predicate.exact
+                else:
+                    branch, label = node.others, predicate
+                if label not in branch:
+                    branch[label], nodes = _Node(), nodes + 1
+                node = branch[label]
+            node.conditions.append(key)
+        self.stats["nodes"] += nodes
+        return root, fields
+
+    def evaluate(self, keys: list, candidates: np.ndarray = None) -> dict:
+        """
+        一次遍历求出全部条件的匹配记录
+
+        Args:
+            keys: 规范化条件键列表
+            candidates: 候选记录序号（升序），指定时只在其中查找
+
+        Returns:
+            dict: 条件键 -> 按数据总表顺序排列的匹配记录序号
+        """
+        root, fields = self.build(keys)
+        results = dict.fromkeys(keys, _EMPTY)
+        records = (np.arange(self.record_count, dtype=np.uint32) if candidates is None
+                   else np.asarray(candidates, dtype=np.uint32))
+
+        stack = [(root, 0, records)]
+        while stack:
+            node, level, record_ids = stack.pop()
+            for key in node.conditions:
+                results[key] = record_ids
+            if level >= len(fields):
+                continue
+            if node.wildcard is not None:
+                stack.append((node.wildcard, level + 1, record_ids))
+            if not node.exact and not node.others:
+                continue
+
+            codes, code_of = self._encoding(fields[level])
+            record_codes = codes[record_ids]
+            if node.exact:
+                # 按编码稳定排序后切片，各分支内的记录序号仍为升序
+                order = np.argsort(record_codes, kind="stable")
+                sorted_codes = record_codes[order]
+                for value, child in node.exact.items():
+                    code = code_of.get(value)
+                    if code is None:
+                        continue
+                    start, stop = np.searchsorted(sorted_codes, [code, code + 1])
+                    if stop > start:
+                        stack.append((child, level + 1, record_ids[order[start:stop]]))
+            for predicate, child in node.others.items():
+                accepted = [code for value, code in code_of.items() if predicate.accepts(value)]
+                selected = record_ids[np.isin(record_codes, accepted)]
+                if len(selected):
+                    stack.append((child, level + 1, selected))
+        return results
+
+    def prepare(self, filter_store: list) -> None:
+        """
+        编译全部筛选条件并求出结果，之后 match 只需查表
+
+        Args:
+            filter_store: 筛选条件列表
+        """
+        keys = [canonical_key(filter_item) for filter_item in filter_store]
+        self._results.update(self.evaluate(keys))
+        self.stats["conditions"] += len(keys)
+
+    def match(self, filter_item: dict, candidates: np.ndarray = None) -> np.ndarray:
+        """
+        查询满足筛选条件的记录
+
+        Args:
+            filter_item: 筛选条件（单元格值或已编译的谓词），空字符串视为通配符
+            candidates: 候选记录序号（升序），指定时只在其中查找
+
+        Returns:
+            np.ndarray: 按数据总表顺序排列的匹配记录序号
+        """
+        key = canonical_key(filter_item)
+        result = self._results.get(key)
+        if result is None:
+            # 未预先编译的条件单独求值
+            return self.evaluate([key], candidates)[key]
+        if candidates is not None:
+            return np.intersect1d(result, candidates, assume_unique=True).astype(np.uint32)
+        return result
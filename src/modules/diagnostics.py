@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from .predicates import compile_predicate
+
+
+class FilterDiagnostics:
+    """
+    筛选诊断：说明记录为什么没有匹配筛选条件
+
+    筛选引擎只负责找出匹配的记录，不在热循环中逐条记录不匹配的原因。诊断模式下，每个
+    条件筛选完成后按字段统计不匹配的记录数（每条记录计入第一个不满足的字段，与逐条比较时
+    的判断顺序一致），并从不匹配的记录中等间隔抽取少量样例说明期望值与实际值。
+
+    统计结果写入运行指标（条件指标 mismatches 与 diagnostics_seconds），每个条件只输出
+    一条汇总日志，样例另起一行。满足全部谓词却未被筛选引擎匹配的记录说明引擎结果不一致，
+    单独计数并输出警告。增量模式下沿用上次结果的条件不做诊断。
+    """
+
+    def __init__(self, data_mgr):
+        """
+        初始化诊断
+
+        Args:
+            data_mgr: 数据管理器（需要已加载数据总表与筛选条件）
+        """
+        self.data_mgr = data_mgr
+        self.samples = max(int(data_mgr.config.get('diagnostics', 'samples', 5)), 0)
+        self.reports = {}
+
+    def explain(self, idx: int, record_ids) -> dict:
+        """
+        统计第 idx 个筛选条件的不匹配原因，并记录到指标与日志
+
+        Args:
+            idx: 条件序号（从 0 开始）
+            record_ids: 该条件匹配的记录序号
+
+        Returns:
+            dict: matched（匹配数）、mismatched（不匹配数）、
+                  mismatches（字段 -> 不匹配数）、inconsistent（满足全部谓词但未匹配的记录数）
+                  与 samples（不匹配样例说明）
+        """
+        data_mgr = self.data_mgr
+        condition_name = f"条件_{idx + 1}"
+        with data_mgr.metrics.measure(condition_name, "diagnostics_seconds"):
+            report = self._explain(data_mgr.filter_store[idx], record_ids)
+        self.reports[condition_name] = report
+
+        data_mgr.metrics.count(condition_name, mismatches=report["mismatches"])
+        fields = "，".join(f"{field} {count}" for field, count in report["mismatches"].items() if count)
+        data_mgr.logger.info(f"{condition_name} 诊断：匹配 {report['matched']} 条，"
+                             f"不匹配 {report['mismatched']} 条" + (f"（{fields}）" if fields else ""))
+        if report["samples"]:
+            data_mgr.logger.info(f"{condition_name} 不匹配样例：{'；'.join(report['samples'])}")
+        if report["inconsistent"]:
+            data_mgr.logger.warning(f"{condition_name} 有 {report['inconsistent']} 条记录满足全部谓词"
+                                    f"但未被筛选引擎匹配，筛选引擎结果不一致")
+        return report
+
+    def _explain(self, filter_item: dict, record_ids) -> dict:
+        data_mgr = self.data_mgr
+        total = data_mgr.record_count()
+        # 尚未确定不匹配原因的记录，初始为全部不匹配的记录
+        remaining = np.ones(total, dtype=bool)
+        remaining[np.asarray(record_ids, dtype=np.intp)] = False
+        mismatched_ids = np.flatnonzero(remaining)
+        # 每条不匹配记录第一个不满足的谓词位置
+        first_failure = np.full(total, -1, dtype=np.intp)
+
+        predicates = [(field, value) for field, value in filter_item.items()
+                      if compile_predicate(value) is not None]
+        mismatches = {}
+        for position, (field, value) in enumerate(predicates):
+            predicate = compile_predicate(value)
+            keys = data_mgr.key_column(field)
+            accepted = {key for key in set(keys) if predicate.accepts(key)}
+            failed = np.fromiter((key not in accepted for key in keys), dtype=bool, count=total)
+            first = remaining & failed
+            mismatches[field] = int(first.sum())
+            first_failure[first] = position
+            remaining &= ~failed
+
+        return {
+            "matched": len(record_ids),
+            "mismatched": len(mismatched_ids),
+            "mismatches": mismatches,
+            "inconsistent": int(remaining.sum()),
+            "samples": [self._describe(record_id, predicates, first_failure[record_id])
+                        for record_id in self._sample(mismatched_ids)],
+        }
+
+    def _sample(self, record_ids: np.ndarray) -> list:
+        """从不匹配的记录中等间隔抽取样例"""
+        if not self.samples or not len(record_ids):
+            return []
+        positions = np.linspace(0, len(record_ids) - 1, num=min(self.samples, len(record_ids)))
+        return [int(record_ids[position]) for position in positions.astype(np.intp)]
+
+    def _describe(self, record_id: int, predicates: list, position: int) -> str:
+        """单条不匹配记录的说明：第一个不满足的字段、期望值与实际值"""
+        if position < 0:
+            return f"第 {record_id + 1} 条记录 满足全部谓词但未被筛选引擎匹配（筛选引擎结果不一致）"
+        field, value = predicates[position]
+        actual = self.data_mgr.get_records([record_id])[0].get(field)
+        if self.data_mgr.key_column(field)[record_id] is None:
+            actual = "空值"
+        return f"第 {record_id + 1} 条记录 {field}(期望:{value},实际:{actual})"
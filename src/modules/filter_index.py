@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from .match_keys import data_match_key
+from .predicates import PredicateCache, compile_predicate
+
+# 空结果，避免每次未命中时重复创建数组
+_EMPTY = np.empty(0, dtype=np.uint32)
+
+
+class FilterIndex:
+    """
+    倒排索引筛选引擎
+
+    为每个字段建立 匹配键 -> 记录序号数组 的倒排表，单个筛选条件通过
+    求各非空字段倒排表的交集得到结果，无需逐条扫描数据总表。
+
+    倒排表按字段惰性构建：只有在筛选条件中出现过非空值的字段才会建立索引，
+    每个字段只构建一次，避免为高基数的数值字段建立无用的倒排表。
+
+    集合、范围等谓词在字段的不同匹配键上判断一次，满足条件的倒排表合并后缓存（缓存项数有上限，
+    见 predicates.PredicateCache）。
+    """
+
+    def __init__(self, data_store: list):
+        """
+        初始化索引
+
+        Args:
+            data_store: 数据总表记录列表
+        """
+        self.data_store = data_store
+        self.record_count = len(data_store)
+        self._postings = {}
+        self._predicate_postings = PredicateCache()
+
+    def _build_postings(self, field) -> dict:
+        """
+        为单个字段构建倒排表
+
+        Args:
+            field: 字段名
+
+        Returns:
+            dict: 匹配键 -> 升序排列的记录序号数组
+        """
+        buckets = {}
+        for record_id, data_item in enumerate(self.data_store):
+            key = data_match_key(data_item.get(field))
+            # 空值不会匹配任何非空筛选值，无需进入倒排表
+            if key is None:
+                continue
+            buckets.setdefault(key, []).append(record_id)
+
+        return {key: np.asarray(ids, dtype=np.uint32) for key, ids in buckets.items()}
+
+    def postings(self, field) -> dict:
+        """获取字段的倒排表，首次访问时构建"""
+        if field not in self._postings:
+            self._postings[field] = self._build_postings(field)
+        return self._postings[field]
+
+    def value_counts(self, field) -> dict:
+        """
+        字段各匹配键的出现次数，由倒排表大小得到，不再逐个单元格计数
+
+        Returns:
+            dict: 匹配键 -> 记录数，空值的键为 None（与 DataManager.value_counts 一致）
+        """
+        counts = {key: len(ids) for key, ids in self.postings(field).items()}
+        nulls = self.record_count - sum(counts.values())
+        if nulls:
+            counts[None] = nulls
+        return counts
+
+    def posting(self, field, predicate) -> np.ndarray:
+        """
+        获取满足谓词的记录序号
+
+        Args:
+            field: 字段名
+            predicate: 已编译的谓词
+
+        Returns:
+            np.ndarray | None: 升序排列的记录序号，没有满足的记录时返回 None
+        """
+        if predicate.exact is not None:
+            return self.postings(field).get(predicate.exact)
+
+        cache_key = (field, predicate)
+        if cache_key not in self._predicate_postings:
+            matched = [ids for key, ids in self.postings(field).items() if predicate.accepts(key)]
+            # 各匹配键的倒排表互不相交，合并后排序即可
+            self._predicate_postings[cache_key] = np.sort(np.concatenate(matched)) if matched else None
+        return self._predicate_postings[cache_key]
+
+    def prepare(self, filter_store: list) -> None:
+        """
+        预先为筛选条件中出现过非空值的字段建立索引
+
+        并行筛选时在主进程中调用，子进程通过 fork 直接共享已建好的索引。
+
+        Args:
+            filter_store: 筛选条件列表
+        """
+        for filter_item in filter_store:
+            for field, value in filter_item.items():
+                predicate = compile_predicate(value)
+                if predicate is not None:
+                    self.posting(field, predicate)
+
+    def match(self, filter_item: dict, candidates: np.ndarray = None) -> np.ndarray:
+        """
+        查询满足筛选条件的记录
+
+        Args:
+            filter_item: 筛选条件（单元格值或已编译的谓词），空字符串视为通配符
+            candidates: 候选记录序号（升序），指定时只在其中查找
+
+        Returns:
+            np.ndarray: 按数据总表顺序排列的匹配记录序号
+        """
+        posting_lists = [] if candidates is None else [candidates]
+        for field, value in filter_item.items():
+            predicate = compile_predicate(value)
+            if predicate is None:
+                continue  # 通配符，跳过该字段
+
+            posting = self.posting(field, predicate)
+            if posting is None:
+                return _EMPTY
+            posting_lists.append(posting)
+
+        # 全部为通配符时匹配所有记录
+        if not posting_lists:
+            return np.arange(self.record_count, dtype=np.uint32)
+
+        # 从最短的倒排表开始求交集，尽早缩小结果集
+        posting_lists.sort(key=len)
+        result = posting_lists[0]
+        for posting in posting_lists[1:]:
+            result = np.intersect1d(result, posting, assume_unique=True)
+            if not len(result):
+                break
+        return result
\ No newline at end of file
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from itertools import combinations
+from .predicates import compile_predicate
+
+# 查找父条件时最多尝试的子集数量，避免字段很多的条件枚举子集开销过大
+MAX_SUBSET_PROBES = 4096
+
+
+def canonical_key(filter_item: dict) -> tuple:
+    """
+    将筛选条件规范化为与字段顺序无关的键
+
+    通配符（空值）字段被忽略，其余字段编译为谓词（见 predicates），按 (字段名, 谓词) 排序。
+    语义相同的筛选条件得到相同的键，dict(键) 可直接作为筛选条件使用。
+
+    Args:
+        filter_item: 筛选条件
+
+    Returns:
+        tuple: 规范化后的条件键
+    """
+    predicates = []
+    for field, value in filter_item.items():
+        predicate = compile_predicate(value)
+        if predicate is not None:
+            predicates.append((field, predicate))
+    predicates.sort(key=lambda predicate: (str(predicate[0]), predicate[1]))
+    return tuple(predicates)
+
+
+def _find_parent(key: tuple, known_keys: dict):
+    """
+    在已出现的条件中查找 key 的最大真子集作为父条件
+
+    Args:
+        key: 规范化条件键
+        known_keys: 已出现的规范化条件键
+
+    Returns:
+        tuple | None: 父条件键，没有可复用的父条件时返回 None
+    """
+    probes = 0
+    # 从最大的真子集开始尝试，父条件越具体，需要再比较的记录越少
+    for size in range(len(key) - 1, 0, -1):
+        for subset in combinations(key, size):
+            probes += 1
+            if probes > MAX_SUBSET_PROBES:
+                return None
+            if subset in known_keys:
+                return subset
+    return None
+
+
+class FilterPlanner:
+    """
+    筛选条件规划器
+
+    - 去重：语义相同的筛选条件只计算一次，结果在各条件之间共享；
+    - 包含复用：若条件 B 的谓词集合包含条件 A 的全部谓词（如 {年份=2024} 与
+      {年份=2024, 品类=A}），则 B 只需在 A 的结果中继续筛选，而不必扫描整个数据总表。
+
+    结果按需计算并缓存，按条件顺序请求时仍可逐个产出结果。
+    """
+
+    def __init__(self, filter_store: list, selector, reuse_results: bool = True):
+        """
+        初始化规划器
+
+        Args:
+            filter_store: 筛选条件列表
+            selector: 选择函数 (筛选条件, 候选记录序号) -> 记录序号数组
+            reuse_results: 是否启用去重与包含复用
+        """
+        self.filter_store = filter_store
+        self.selector = selector
+        self.reuse_results = reuse_results
+        self.keys = [canonical_key(filter_item) for filter_item in filter_store]
+        self.parents = {}
+        self._results = {}
+        self.stats = {"conditions": len(filter_store), "evaluated": 0, "shared": 0, "refined": 0}
+
+        if reuse_results:
+            known_keys = dict.fromkeys(self.keys)
+            for key in known_keys:
+                self.parents[key] = _find_parent(key, known_keys)
+
+    def describe(self) -> str:
+        """规划摘要：不同条件数与可在父条件结果上继续筛选的条件数"""
+        distinct = len(set(self.keys))
+        refinable = sum(1 for parent in self.parents.values() if parent is not None)
+        return (f"共 {len(self.keys)} 个筛选条件，去重后 {distinct} 个，"
+                f"其中 {refinable} 个可复用父条件结果")
+
+    def select(self, idx: int):
+        """
+        获取第 idx 个筛选条件的匹配记录序号
+
+        Args:
+            idx: 条件序号（从 0 开始）
+
+        Returns:
+            np.ndarray: 匹配记录序号数组
+        """
+        if not self.reuse_results:
+            self.stats["evaluated"] += 1
+            return self.selector(self.filter_store[idx], None)
+
+        key = self.keys[idx]
+        if key in self._results:
+            self.stats["shared"] += 1
+            return self._results[key]
+        return self._resolve(key)
+
+    def _resolve(self, key: tuple):
+        """计算规范化条件的结果，存在父条件时先计算父条件，再只比较多出的谓词"""
+        if key in self._results:
+            return self._results[key]
+
+        parent = self.parents.get(key)
+        if parent is None:
+            result = self.selector(dict(key), None)
+        else:
+            candidates = self._resolve(parent)
+            parent_predicates = set(parent)
+            extra = dict(predicate for predicate in key if predicate not in parent_predicates)
+            result = self.selector(extra, candidates)
+            self.stats["refined"] += 1
+
+        self.stats["evaluated"] += 1
+        self._results[key] = result
+        return result
\ No newline at end of file
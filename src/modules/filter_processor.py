@@ -2,85 +2,322 @@
 # -*- coding: utf-8 -*-
 
 import csv
-import pandas as pd
+import logging
+import numpy as np
 import os
+import time
+from .aggregator import ConditionAggregator, full_rows_enabled
 from .data_manager import DataManager
+from .decision_trie import DecisionTrie
+from .diagnostics import FilterDiagnostics
+from .filter_index import FilterIndex
+from .columnar_engine import ColumnarMatcher
+from .filter_planner import FilterPlanner
+from .incremental import IncrementalState
+from .predicates import compile_predicate
+from .parallel_filter import iter_parallel_selections, resolve_worker_count
+from .result_stream import ResultStream
+from .result_writer import DatasetWriter, open_csv, result_suffix
 
-def _match_data_item(data_item: dict, filter_item: dict) -> tuple[bool, list]:
-    """
-    检查数据项是否匹配筛选条件
-    
-    Args:
-        data_item: 单个数据项
-        filter_item: 筛选条件
-        
-    Returns:
-        tuple: (是否匹配, 不匹配字段列表)
-    """
-    match = True
-    mismatch_fields = []
-    
-    for field, value in filter_item.items():
-        # 获取数据项中的字段值
-        data_value = data_item.get(field)
-        
-        # 如果筛选条件值为空，视为通配符（匹配任何值）
-        if value == '':
-            continue  # 跳过这个条件，匹配任何值
-        
-        # 如果数据项中的字段值为空，但筛选条件值不为空，则不匹配
-        if pd.isna(data_value) or data_value == '':
-            match = False
-            mismatch_fields.append(f"{field}(期望:{value},实际:空值)")
-            break
-        
-        # 比较值（字符串比较）
-        if str(data_value) != str(value):
-            match = False
-            mismatch_fields.append(f"{field}(期望:{value},实际:{data_value})")
-            break
-            
-    return match, mismatch_fields
+def _write_csv_preamble(f, filter_item: dict) -> None:
+    """写入结果 CSV 的文件头：UTF-8 BOM 与筛选条件注释行"""
+    # 写入UTF-8 BOM头确保Excel兼容
+    f.write("\ufeff")
+    # 写入筛选条件作为注释（确保不换行）
+    f.write(f"# 筛选条件: {' '.join(f'{k}={v}' for k, v in filter_item.items())}\n")
 
 
-def _save_filtered_data_to_csv(filtered_items: list, filter_item: dict, 
+def _save_filtered_data_to_csv(record_ids, filter_item: dict, 
                               condition_name: str, output_path: str, 
                               data_mgr: DataManager) -> None:
     """
     将筛选结果保存到CSV文件
     
     Args:
-        filtered_items: 筛选后的数据项列表
+        record_ids: 筛选结果的记录序号数组，写入时才从数据总表中取出对应记录
         filter_item: 筛选条件
         condition_name: 条件名称
-        output_path: 输出文件路径
+        output_path: 输出文件路径，以 .gz/.zst 结尾时压缩写出
         data_mgr: 数据管理器
     """
-    with open(output_path, "w", newline="", encoding="utf-8-sig") as f:
-        # 写入UTF-8 BOM头确保Excel兼容
-        f.write("\ufeff")
-        # 写入筛选条件作为注释（确保不换行）
-        f.write(f"# 筛选条件: {' '.join(f'{k}={v}' for k, v in filter_item.items())}\n")
+    with data_mgr.metrics.measure(condition_name, "write_seconds"), \
+            open_csv(output_path) as f:
+        _write_csv_preamble(f, filter_item)
         
-        if filtered_items:
-            # 创建 DataFrame 并直接写入
-            df = pd.DataFrame(filtered_items)
+        if len(record_ids):
+            # 从共享的数据总表中切片并直接写入
+            df = data_mgr.select_frame(record_ids)
             df.to_csv(f, index=False, encoding="utf-8-sig")
         else:
             # 即使没有数据也创建带表头的空文件
-            if data_mgr.data_store:
-                fieldnames = [f for f in data_mgr.data_store[0].keys() if f != '序号']
+            if data_mgr.has_data():
+                fieldnames = [f for f in data_mgr.data_fields() if f != '序号']
                 writer = csv.DictWriter(f, fieldnames=fieldnames)
                 writer.writeheader()
 
 
-def apply_filters(data_mgr: DataManager) -> None:
+class _CsvSink:
+    """按条件写出结果 CSV 的写出器（结果流的消费者，见 result_stream），多个线程并发写出不同的文件"""
+    
+    def __init__(self, data_mgr: DataManager, suffix: str):
+        self.data_mgr = data_mgr
+        self.suffix = suffix
+        self.threads = data_mgr.config.get('parallel', 'writer_threads', 4)
+    
+    def open(self) -> None:
+        pass
+    
+    def write(self, idx: int, record_ids, unchanged: bool = False) -> None:
+        # 增量模式下结果文件与上次运行一致的条件无需重写
+        if unchanged:
+            return
+        condition_name = f"条件_{idx + 1}"
+        output_path = os.path.join(self.data_mgr.output_dir, f"{condition_name}{self.suffix}")
+        _save_filtered_data_to_csv(record_ids, self.data_mgr.filter_store[idx], condition_name,
+                                   output_path, self.data_mgr)
+    
+    def close(self) -> None:
+        pass
+
+
+def _ordered_predicates(data_mgr: DataManager, filter_item: dict) -> list:
+    """
+    编译筛选条件的谓词，并按估计的选择度从低到高排列
+    
+    集合、范围等谓词先在该字段的不同匹配键上求出满足条件的键集合；选择度为满足条件的记录数
+    占总记录数的比例，由字段的取值频率统计（DataManager.value_counts）估计。最可能排除记录的
+    谓词最先判断，逐条比较时大多数记录在第一个谓词处即可排除。配置 filter.order_by_selectivity
+    为 false 时保持筛选条件中的字段顺序。
+    
+    Args:
+        data_mgr: 数据管理器
+        filter_item: 筛选条件
+        
+    Returns:
+        list: (字段, 估计的选择度, 满足条件的匹配键集合, 字段的匹配键列)
+    """
+    total = data_mgr.record_count() or 1
+    predicates = []
+    for field, value in filter_item.items():
+        predicate = compile_predicate(value)
+        if predicate is None:
+            continue
+        counts = data_mgr.value_counts(field)
+        accepted = ({predicate.exact} if predicate.exact is not None
+                    else {key for key in counts if predicate.accepts(key)})
+        selectivity = sum(counts.get(key, 0) for key in accepted) / total
+        predicates.append((field, selectivity, accepted, data_mgr.key_column(field)))
+    if data_mgr.config.get('filter', 'order_by_selectivity', True):
+        predicates.sort(key=lambda item: item[1])
+    return predicates
+
+
+def _engine_value_counts(data_mgr: DataManager, selector):
+    """
+    获取筛选引擎的字段取值频率统计函数
+    
+    倒排索引、列式与决策树引擎已为筛选字段建立倒排表或整数编码，直接由倒排表大小或
+    编码计数得到取值频率，不再额外计算匹配键列；逐条扫描引擎使用 DataManager.value_counts。
+    
+    Args:
+        data_mgr: 数据管理器
+        selector: 选择函数（见 _create_selector）
+        
+    Returns:
+        callable: 字段 -> {匹配键: 记录数}，空值的键为 None
+    """
+    engine = getattr(selector, "__self__", None)
+    return getattr(engine, "value_counts", data_mgr.value_counts)
+
+
+def _record_field_statistics(data_mgr: DataManager, value_counts) -> None:
+    """
+    将筛选条件涉及的各字段的取值频率统计写入运行指标（字段指标）与日志（与筛选引擎无关）
+    
+    Args:
+        data_mgr: 数据管理器
+        value_counts: 字段 -> {匹配键: 记录数} 的统计函数（见 _engine_value_counts）
+    """
+    total = data_mgr.record_count() or 1
+    fields = dict.fromkeys(field for filter_item in data_mgr.filter_store
+                           for field, value in filter_item.items() if compile_predicate(value) is not None)
+    for field in fields:
+        counts = value_counts(field)
+        values = [(count, key) for key, count in counts.items() if key is not None]
+        top_count, top_key = max(values, key=lambda item: item[0], default=(0, None))
+        data_mgr.metrics.field(field, distinct=len(values), nulls=counts.get(None, 0),
+                               top_value=top_key, top_share=round(top_count / total, 4))
+        data_mgr.logger.info(f"字段 {field}：{len(values)} 个不同值，空值 {counts.get(None, 0)} 条，"
+                             f"最常见的值 {top_key} 占 {top_count / total:.1%}")
+
+
+def _record_predicate_order(data_mgr: DataManager) -> None:
+    """
+    为每个条件记录逐条扫描时的谓词判断顺序与估计的选择度（条件指标 predicate_order、selectivity）
+    
+    Args:
+        data_mgr: 数据管理器
+    """
+    for idx, filter_item in enumerate(data_mgr.filter_store):
+        order = [(field, round(selectivity, 4))
+                 for field, selectivity, _, _ in _ordered_predicates(data_mgr, filter_item)]
+        data_mgr.metrics.count(f"条件_{idx + 1}", predicate_order=[field for field, _ in order],
+                               selectivity=dict(order))
+
+
+def _scan_record_ids(data_mgr: DataManager, filter_item: dict, candidates=None) -> list:
+    """
+    逐条扫描数据总表，返回匹配筛选条件的记录序号
+    
+    每个字段的匹配键由数据管理器预先计算一次，扫描时只比较匹配键，不再对每个单元格
+    重复进行类型转换；谓词按估计的选择度排序（见 _ordered_predicates），扫描时只判断
+    集合成员。不匹配的原因不在扫描中记录，需要时由诊断模式单独统计（见 diagnostics）。
+    
+    Args:
+        data_mgr: 数据管理器
+        filter_item: 筛选条件
+        candidates: 候选记录序号，指定时只扫描这些记录
+        
+    Returns:
+        list: 匹配的记录序号列表
+    """
+    predicates = [(accepted, keys) for _, _, accepted, keys in _ordered_predicates(data_mgr, filter_item)]
+    record_ids = range(data_mgr.record_count()) if candidates is None else candidates
+    
+    matched_ids = []
+    for record_id in record_ids:
+        for accepted, keys in predicates:
+            if keys[record_id] not in accepted:
+                break
+        else:
+            matched_ids.append(record_id)
+    return matched_ids
+
+
+def _create_selector(data_mgr: DataManager):
+    """
+    根据配置的筛选引擎创建选择函数
+    
+    Args:
+        data_mgr: 数据管理器
+        
+    Returns:
+        callable: (filter_item, candidates) -> 匹配的记录序号数组（np.uint32）
+        
+    Raises:
+        ValueError: 如果配置了不支持的筛选引擎
+    """
+    engine = data_mgr.config.get('filter', 'engine', 'index')
+    
+    if engine == 'scan':
+        return lambda filter_item, candidates=None: np.asarray(
+            _scan_record_ids(data_mgr, filter_item, candidates), dtype=np.uint32)
+    
+    if engine == 'index':
+        # 倒排索引只构建一次，所有筛选条件共享
+        index = FilterIndex(data_mgr.data_store)
+        index.prepare(data_mgr.filter_store)
+        return index.match
+    
+    if engine == 'vectorized':
+        # 列式引擎直接作用于转置后的 DataFrame
+        if data_mgr.data_frame is None:
+            raise ValueError("列式筛选引擎需要在提取数据时使用相同的引擎配置")
+        matcher = ColumnarMatcher(data_mgr.data_frame)
+        matcher.prepare(data_mgr.filter_store)
+        return matcher.match
+    
+    if engine == 'trie':
+        # 全部条件编译为一棵决策树，一次遍历求出所有结果，之后按条件查表
+        trie = DecisionTrie(data_mgr)
+        trie.prepare(data_mgr.filter_store)
+        data_mgr.logger.info(f"决策树：{trie.stats['conditions']} 个筛选条件，{trie.stats['nodes']} 个节点")
+        return trie.match
+    
+    raise ValueError(f"不支持的筛选引擎: {engine}")
+
+
+def _create_planner(data_mgr: DataManager, filter_store: list = None, selector=None) -> FilterPlanner:
+    """
+    创建筛选条件规划器：合并重复条件，并在父条件结果上筛选更具体的条件
+    
+    Args:
+        data_mgr: 数据管理器
+        filter_store: 筛选条件列表，为 None 时使用数据管理器中的筛选条件
+        selector: 已创建的选择函数（常驻服务在多次请求之间复用），为 None 时按配置创建
+        
+    Returns:
+        FilterPlanner: 规划器
+    """
+    # 决策树引擎在编译时已合并相同的谓词前缀，不再需要在父条件结果上继续筛选
+    reuse_results = (data_mgr.config.get('filter', 'reuse_results', True)
+                     and data_mgr.config.get('filter', 'engine', 'index') != 'trie')
+    return FilterPlanner(data_mgr.filter_store if filter_store is None else filter_store,
+                         selector or _create_selector(data_mgr), reuse_results)
+
+
+def _create_condition_selector(data_mgr: DataManager):
+    """创建按条件序号选择的函数（供不支持 fork 的平台在子进程中调用）"""
+    return _create_planner(data_mgr).select
+
+
+def _iter_selections(data_mgr: DataManager, select_condition, indices: list):
+    """
+    在当前进程中依次执行筛选
+    
+    Args:
+        data_mgr: 数据管理器
+        select_condition: 选择函数：条件序号 -> 匹配记录序号数组
+        indices: 需要筛选的条件序号
+        
+    Yields:
+        tuple: (条件序号, 匹配记录序号数组, 筛选耗时（秒）)，与并行模式的返回形式一致
+    """
+    debug = data_mgr.logger.isEnabledFor(logging.DEBUG)
+    for idx in indices:
+        if debug:
+            data_mgr.logger.debug(f"开始应用筛选条件 条件_{idx + 1}: {data_mgr.filter_store[idx]}")
+        started = time.perf_counter()
+        record_ids = select_condition(idx)
+        yield idx, record_ids, time.perf_counter() - started
+
+
+def _create_incremental_state(data_mgr: DataManager, suffix: str):
+    """
+    增量模式下读取上次运行的清单
+    
+    Args:
+        data_mgr: 数据管理器
+        suffix: 结果文件后缀，写出数据集或不输出完整记录时为 None
+        
+    Returns:
+        IncrementalState | None: 未启用增量模式或数据版本未知时返回 None
+    """
+    if not data_mgr.config.get('output', 'incremental', False):
+        return None
+    if data_mgr.data_version is None:
+        data_mgr.logger.warning("数据总表版本未知，本次运行不使用增量模式")
+        return None
+    return IncrementalState(data_mgr.output_dir, data_mgr.data_version,
+                            data_mgr.filter_store, data_mgr.logger, suffix)
+
+
+def apply_filters(data_mgr: DataManager, sinks=()) -> None:
     """
     应用筛选任务，根据筛选条件对数据进行筛选。
-    每个筛选条件生成独立的筛选结果并输出到CSV文件。
+    每个筛选条件生成独立的筛选结果并输出到CSV文件（可按 output.format 压缩），
+    或全部写入同一个 Parquet/Arrow 数据集。
+    筛选结果经结果流（见 result_stream）交给后台线程写出，筛选与磁盘写入重叠进行；
+    sinks 中的其他写出器（如 output_generator.create_xlsx_sink）消费同一个结果流。
+    配置 parallel.workers 大于 1 时使用进程池并行筛选，结果与文件名与顺序执行一致。
+    配置 output.incremental 时只重新筛选并写出与上次运行相比发生变化的条件。
+    配置 diagnostics.enabled 时额外统计每个条件的不匹配原因（不影响筛选结果）。
+    配置 aggregate.enabled 时按条件汇总匹配记录并写出汇总 CSV（见 aggregator），
+    aggregate.full_rows 为 false 时不再写出各条件的完整记录。
 
     Args:
         data_mgr: 数据管理器实例
+        sinks: 额外的结果写出器，按条件接收全部结果（包括增量模式下沿用的结果）
 
     Returns:
         None: 无返回值，但会将筛选结果存储在数据管理器中并输出到文件。
@@ -90,48 +327,105 @@ def apply_filters(data_mgr: DataManager) -> None:
     """
     try:
         # 检查数据是否已加载
-        if not data_mgr.data_store or not data_mgr.filter_store:
+        if not data_mgr.has_data() or not data_mgr.filter_store:
             raise ValueError("数据未加载，请先提取数据和筛选条件")
         
-        # 初始化筛选结果字典
+        # 初始化筛选结果字典：条件名称 -> 匹配记录序号数组
         data_mgr.filtered_data = {}
         
-        # 为每个筛选条件生成独立的筛选结果和CSV文件
-        for idx, filter_item in enumerate(data_mgr.filter_store):
-            condition_name = f"条件_{idx + 1}"
-            data_mgr.filtered_data[condition_name] = []
-            
-            # 执行筛选
-            data_mgr.logger.debug(f"开始应用筛选条件 {condition_name}: {filter_item}")
-            if not data_mgr.data_store:
-                data_mgr.logger.warning("数据总表为空，请检查输入文件格式和Sheet名称")
-                continue
-                
-            data_mgr.logger.info(f"成功加载 {len(data_mgr.data_store)} 条数据，首条样例: {data_mgr.data_store[0]}")
-            
-            # 筛选数据
-            for data_item in data_mgr.data_store:
-                match, mismatch_fields = _match_data_item(data_item, filter_item)
+        # 输出格式：按条件写出 CSV（可压缩），或全部条件写入同一个数据集
+        output_format = data_mgr.config.get('output', 'format', 'csv')
+        suffix = result_suffix(output_format)
+        # 只需要汇总结果时不写出各条件的完整记录
+        full_rows = full_rows_enabled(data_mgr.config)
+        write_csv = full_rows and suffix is not None
+        dataset = DatasetWriter(data_mgr, output_format) if full_rows and suffix is None else None
+        
+        # 增量模式：沿用上次运行的结果，只有输出发生变化的条件才重写 CSV
+        incremental = _create_incremental_state(data_mgr, suffix if write_csv else None)
+        # 诊断模式：统计每个条件在各字段上的不匹配数，并抽样说明不匹配的原因
+        diagnostics = FilterDiagnostics(data_mgr) if data_mgr.config.get('diagnostics', 'enabled', False) else None
+        
+        # 汇总模式：在结果流中按条件计算汇总值，先于其他写出器关闭，XLSX 可写出汇总表
+        aggregator = ConditionAggregator(data_mgr) if data_mgr.config.get('aggregate', 'enabled', False) else None
+        
+        # CSV、汇总与其他写出器消费同一个结果流
+        consumers = (([_CsvSink(data_mgr, suffix)] if write_csv else [])
+                     + ([aggregator] if aggregator else []) + list(sinks))
+        with ResultStream(consumers, data_mgr.logger,
+                          queue_size=data_mgr.config.get('output', 'queue_size', 8),
+                          asynchronous=data_mgr.config.get('output', 'async_writes', True)) as stream:
+            pending = []
+            for idx, filter_item in enumerate(data_mgr.filter_store):
+                record_ids = incremental.cached_result(idx) if incremental else None
+                if record_ids is None:
+                    pending.append(idx)
+                    continue
                 
-                if match:
-                    data_mgr.filtered_data[condition_name].append(data_item)
-                elif idx == 0:  # 只记录第一个条件的详细不匹配信息
-                    data_mgr.logger.debug(f"数据不匹配: {condition_name} - {', '.join(mismatch_fields)}")
+                condition_name = f"条件_{idx + 1}"
+                data_mgr.filtered_data[condition_name] = record_ids
+                data_mgr.metrics.count(condition_name, rows=len(record_ids), reused=True)
+                unchanged = incremental.is_unchanged(idx)
+                if dataset:
+                    dataset.add(idx, filter_item, record_ids)
+                elif unchanged:
+                    data_mgr.logger.debug(f"{condition_name} 未变化，沿用上次的输出")
+                elif write_csv:
+                    output_path = os.path.join(data_mgr.output_dir, f"{condition_name}{suffix}")
+                    data_mgr.logger.info(f"{condition_name} 复用上次的筛选结果，共 {len(record_ids)} 条记录，已保存到 {output_path}")
+                stream.publish(idx, record_ids, unchanged)
+            if incremental:
+                data_mgr.logger.info(f"增量模式：{len(data_mgr.filter_store) - len(pending)} 个条件复用上次结果，"
+                                     f"{len(pending)} 个条件需要重新筛选")
             
-            data_mgr.logger.debug(f"筛选完成 {condition_name}: 匹配 {len(data_mgr.filtered_data[condition_name])} 条记录")
+            planner = _create_planner(data_mgr)
+            data_mgr.logger.info(planner.describe())
+            # 字段取值频率统计写入指标与日志；逐条扫描引擎按其安排谓词顺序
+            _record_field_statistics(data_mgr, _engine_value_counts(data_mgr, planner.selector))
+            if data_mgr.config.get('filter', 'engine', 'index') == 'scan':
+                _record_predicate_order(data_mgr)
             
-            # 输出到CSV
-            output_path = os.path.join(data_mgr.output_dir, f"{condition_name}.csv")
-            _save_filtered_data_to_csv(
-                data_mgr.filtered_data[condition_name], 
-                filter_item, 
-                condition_name, 
-                output_path, 
-                data_mgr
-            )
+            workers = resolve_worker_count(data_mgr.config.get('parallel', 'workers', 1))
+            if workers > 1 and len(pending) > 1:
+                # 并行模式：进程池执行筛选，写出线程在进程池创建（fork）之后才启动
+                data_mgr.logger.info(f"并行筛选：{workers} 个工作进程")
+                selections = iter_parallel_selections(
+                    planner.select, _create_condition_selector, data_mgr, workers, pending)
+            else:
+                selections = _iter_selections(data_mgr, planner.select, pending)
+                stream.start()
             
-            data_mgr.logger.info(f"{condition_name} 筛选完成，共 {len(data_mgr.filtered_data[condition_name])} 条记录，已保存到 {output_path}")
+            # 为每个筛选条件生成独立的筛选结果和CSV文件（结果按条件顺序返回）
+            for idx, record_ids, seconds in selections:
+                stream.start()
+                filter_item = data_mgr.filter_store[idx]
+                condition_name = f"条件_{idx + 1}"
+                data_mgr.filtered_data[condition_name] = record_ids
+                # 并行模式下耗时在工作进程中测得，统一在主进程记录
+                data_mgr.metrics.add(condition_name, "filter_seconds", seconds)
+                data_mgr.metrics.count(condition_name, rows=len(record_ids))
+                if incremental:
+                    incremental.record(idx, record_ids)
+                
+                if diagnostics:
+                    diagnostics.explain(idx, record_ids)
+                
+                # 交给写出线程，筛选继续处理下一个条件
+                stream.publish(idx, record_ids)
+                if dataset:
+                    dataset.add(idx, filter_item, record_ids)
+                if write_csv:
+                    output_path = os.path.join(data_mgr.output_dir, f"{condition_name}{suffix}")
+                    data_mgr.logger.info(f"{condition_name} 筛选完成，共 {len(record_ids)} 条记录，已保存到 {output_path}")
+                else:
+                    data_mgr.logger.info(f"{condition_name} 筛选完成，共 {len(record_ids)} 条记录")
+        
+        if dataset:
+            dataset.write()
+        
+        if incremental:
+            incremental.save()
     
     except Exception as e:
         data_mgr.logger.error(f"应用筛选条件时发生错误: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import hashlib
+import json
+import os
+import re
+import numpy as np
+from .filter_planner import canonical_key
+
+# 清单格式版本，格式变化时递增以使旧清单失效
+MANIFEST_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+RESULTS_FILE = "manifest_results.npz"
+# 增量模式下清理输出目录时需要保留的文件
+KEEP_PATTERNS = ("条件_*.csv*", MANIFEST_FILE, RESULTS_FILE)
+
+# 条件结果文件（含压缩的 CSV）：条件名称 + 后缀
+_CONDITION_FILE = re.compile(r"^(条件_\d+)(\.csv(?:\.gz|\.zst)?)$")
+
+
+def _fingerprint(*parts) -> str:
+    """对任意可 JSON 序列化的内容求哈希"""
+    payload = json.dumps(parts, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class IncrementalState:
+    """
+    增量运行状态
+
+    清单（outputs/manifest.json）记录上次运行时每个条件的指纹与结果键，匹配结果
+    （记录序号数组）保存在同目录的 .npz 文件中：
+
+    - 文件指纹：数据版本 + 条件名称 + 筛选条件行 + 规范化条件（筛选值的解析方式变化时
+      同一行的含义也会变化），未变化且 CSV 仍在时无需重写；
+    - 结果键：数据版本 + 规范化条件，行内容变化但语义不变（或行位置移动）时
+      直接复用上次的记录序号，无需重新筛选。
+    """
+
+    def __init__(self, output_dir: str, data_version: str, filter_store: list, logger,
+                 suffix: str = ".csv"):
+        """
+        初始化并读取上次运行的清单
+
+        Args:
+            output_dir: 输出目录
+            data_version: 数据总表版本（内容哈希）
+            filter_store: 筛选条件列表
+            logger: 日志记录器
+            suffix: 条件结果文件后缀，结果写入数据集（不按条件写出文件）时为 None
+        """
+        self.output_dir = output_dir
+        self.logger = logger
+        self.suffix = suffix
+        keys = [canonical_key(filter_item) for filter_item in filter_store]
+        self.file_fingerprints = [
+            _fingerprint(data_version, f"条件_{idx + 1}", list(filter_item.items()), key)
+            for idx, (filter_item, key) in enumerate(zip(filter_store, keys))]
+        self.result_keys = [_fingerprint(data_version, key) for key in keys]
+        self._previous, self._results = self._load()
+        self._current = {}
+
+    def _load(self) -> tuple:
+        """读取清单与结果，不存在或版本不符时视为首次运行"""
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != MANIFEST_VERSION:
+                return {}, {}
+            with np.load(os.path.join(self.output_dir, RESULTS_FILE), allow_pickle=False) as arrays:
+                results = {key: arrays[key] for key in arrays.files}
+            return manifest.get("conditions", {}), results
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(os.path.join(self.output_dir, MANIFEST_FILE)):
+                self.logger.warning(f"增量清单无法读取，将重新计算全部条件: {e}")
+            return {}, {}
+
+    def cached_result(self, idx: int):
+        """
+        获取第 idx 个条件可复用的匹配结果
+
+        Returns:
+            np.ndarray | None: 记录序号数组，无可复用结果时返回 None
+        """
+        result = self._results.get(self.result_keys[idx])
+        if result is not None:
+            self.record(idx, result)
+        return result
+
+    def is_unchanged(self, idx: int) -> bool:
+        """第 idx 个条件的输出文件与上次运行一致，无需重写"""
+        if self.suffix is None:
+            return False
+        condition_name = f"条件_{idx + 1}"
+        entry = self._previous.get(condition_name)
+        return (entry is not None
+                and entry.get("fingerprint") == self.file_fingerprints[idx]
+                and os.path.exists(os.path.join(self.output_dir, f"{condition_name}{self.suffix}")))
+
+    def record(self, idx: int, record_ids) -> None:
+        """记录第 idx 个条件本次的匹配结果"""
+        self._current[f"条件_{idx + 1}"] = (idx, np.asarray(record_ids, dtype=np.uint32))
+
+    def save(self) -> None:
+        """写入本次运行的清单与结果，并删除已不存在的条件的输出文件"""
+        conditions, results = {}, {}
+        for condition_name, (idx, record_ids) in self._current.items():
+            result_key = self.result_keys[idx]
+            conditions[condition_name] = {"fingerprint": self.file_fingerprints[idx],
+                                          "result": result_key}
+            results[result_key] = record_ids
+
+        # 先写结果再写清单，清单始终指向完整的结果文件
+        results_path = os.path.join(self.output_dir, RESULTS_FILE)
+        temp_path = f"{results_path}.{os.getpid()}.tmp.npz"
+        np.savez(temp_path, **results)
+        os.replace(temp_path, results_path)
+
+        manifest_path = os.path.join(self.output_dir, MANIFEST_FILE)
+        temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "conditions": conditions}, f,
+                      ensure_ascii=False, indent=2)
+        os.replace(temp_path, manifest_path)
+
+        self._remove_stale_outputs(conditions)
+
+    def _remove_stale_outputs(self, conditions: dict) -> None:
+        """删除本次运行中已不存在的条件的 CSV 文件，以及与当前输出格式不符的结果文件"""
+        for path in glob.glob(os.path.join(self.output_dir, "条件_*.csv*")):
+            match = _CONDITION_FILE.match(os.path.basename(path))
+            if match and (match.group(1) not in conditions or match.group(2) != self.suffix):
+                os.remove(path)
+                self.logger.info(f"已删除过期的输出文件: {path}")
\ No newline at end of file
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import datetime
+import re
+from functools import lru_cache
+from decimal import Decimal, InvalidOperation
+import numpy as np
+import pandas as pd
+
+# 可按数值比较的文本：不含前导零（"007" 这类编码仍按文本比较）
+_NUMBER_TEXT = re.compile(r"^[+-]?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?$")
+# 可按日期比较的文本：年-月-日（或年/月/日），可带时间
+_DATE_TEXT = re.compile(r"^(\d{4})[-/](\d{1,2})[-/](\d{1,2})(?:[ T](\d{1,2}):(\d{2})(?::(\d{2}))?)?$")
+
+
+def _number_key(number) -> str:
+    """
+    数值的匹配键：整数值不带小数部分，其余为不含多余零的十进制表示
+
+    2024、2024.0 与 "2024.0" 得到同一个键 "2024"；浮点数按最短可还原的表示转换，
+    0.1 得到 "0.1" 而不是二进制误差展开后的长串。
+    """
+    if isinstance(number, (int, np.integer)):
+        return str(int(number))
+    decimal = Decimal(repr(float(number))) if not isinstance(number, Decimal) else number
+    decimal = decimal.normalize()
+    if decimal.is_zero():
+        return "0"
+    return format(decimal, "f")
+
+
+def _datetime_key(year, month, day, hour=0, minute=0, second=0) -> str:
+    """日期时间的匹配键：零点只保留日期部分"""
+    if hour == minute == second == 0:
+        return f"{year:04d}-{month:02d}-{day:02d}"
+    return f"{year:04d}-{month:02d}-{day:02d} {hour:02d}:{minute:02d}:{second:02d}"
+
+
+@lru_cache(maxsize=65536)
+def _text_key(text: str):
+    """文本的匹配键：去除首尾空白，数值与日期文本按数值与日期规范化（同一列中的重复文本只解析一次）"""
+    text = text.strip()
+    if not text:
+        return None
+    if _NUMBER_TEXT.match(text):
+        try:
+            return _number_key(Decimal(text))
+        except InvalidOperation:
+            return text
+    match = _DATE_TEXT.match(text)
+    if match:
+        parts = [int(part) if part else 0 for part in match.groups()]
+        try:
+            datetime.datetime(*parts)
+        except ValueError:
+            return text
+        return _datetime_key(*parts)
+    return text
+
+
+def normalize_key(value):
+    """
+    将单元格值规范化为匹配键（字符串），数据总表与筛选条件使用同一规则，
+    数据读取时的类型差异（如 2024 与 "2024.0"）不影响匹配结果：
+
+    - 空值（None、NaN、NaT、空白字符串）返回 None；
+    - 数值：整数值不带小数部分，其余为不含多余零的十进制表示；
+    - 日期时间：YYYY-MM-DD，非零点时追加 HH:MM:SS；
+    - 文本：去除首尾空白，内容为数值或日期时按上述规则规范化；
+    - 其他类型（如布尔值）按 str() 转换。
+
+    规范化是幂等的：匹配键再次规范化得到它本身。
+
+    Args:
+        value: 单元格值
+
+    Returns:
+        str | None: 匹配键，空值返回 None
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return _text_key(value)
+    if isinstance(value, (bool, np.bool_)):
+        return str(bool(value))
+    if isinstance(value, (int, float, np.integer, np.floating, Decimal)):
+        if pd.isna(value) or not np.isfinite(float(value)):
+            return None if pd.isna(value) else str(value)
+        return _number_key(value)
+    if isinstance(value, (datetime.datetime, np.datetime64)):
+        timestamp = pd.Timestamp(value)
+        if pd.isna(timestamp):
+            return None
+        return _datetime_key(timestamp.year, timestamp.month, timestamp.day,
+                             timestamp.hour, timestamp.minute, timestamp.second)
+    if isinstance(value, datetime.date):
+        return _datetime_key(value.year, value.month, value.day)
+    if pd.isna(value):
+        return None
+    return _text_key(str(value))
+
+
+def key_number(key):
+    """
+    将匹配键解析为数值
+
+    Args:
+        key: normalize_key 得到的匹配键
+
+    Returns:
+        Decimal | None: 数值匹配键对应的数值，其他匹配键返回 None
+    """
+    if key is None or not _NUMBER_TEXT.match(key):
+        return None
+    return Decimal(key)
+
+
+def is_date_key(key) -> bool:
+    """匹配键是否为日期（时间）"""
+    return key is not None and _DATE_TEXT.match(key) is not None
+
+
+def data_match_key(value):
+    """
+    将数据总表中的单元格值转换为匹配键
+
+    空值（None、NaN、空白字符串）不会匹配任何非空筛选值，因此返回 None。
+
+    Args:
+        value: 数据单元格的原始值
+
+    Returns:
+        str | None: 匹配键，空值返回 None
+    """
+    return normalize_key(value)
+
+
+def filter_match_key(value):
+    """
+    将筛选条件单元格的值转换为匹配键
+
+    Args:
+        value: 筛选条件单元格的值
+
+    Returns:
+        str | None: 匹配键，空值（通配符）返回 None
+    """
+    return normalize_key(value)
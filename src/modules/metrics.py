@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# 指标文件格式版本
+METRICS_VERSION = 1
+
+
+def peak_rss_mb():
+    """当前进程的峰值 RSS（MB），不支持的平台（如 Windows）返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class MetricsRecorder:
+    """
+    运行指标记录器
+
+    - 阶段指标：每个处理阶段的墙钟耗时、CPU 时间、处理行数与阶段结束时的峰值 RSS；
+    - 条件指标：每个筛选条件的筛选耗时、写出耗时与匹配行数；
+    - 字段指标：筛选条件涉及的字段的取值频率统计（不同值个数、空值数、最常见值的占比）。
+
+    未启用时所有记录操作均为空操作，调用方无需判断。
+    """
+
+    def __init__(self, enabled: bool = True, logger=None):
+        """
+        初始化记录器
+
+        Args:
+            enabled: 是否记录指标
+            logger: 日志记录器
+        """
+        self.enabled = enabled
+        self.logger = logger or logging.getLogger(__name__)
+        self.stages = []
+        self.conditions = {}
+        self.fields = {}
+        self.started = time.time()
+        # 并行模式下 CSV 由多个线程写出，条件指标的更新需要加锁
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # 不支持 fork 的平台上数据管理器随进程池初始化参数序列化，锁不能序列化，在子进程中重新创建
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        记录一个处理阶段
+
+        Args:
+            name: 阶段名称
+
+        Yields:
+            dict: 阶段指标，调用方可设置 rows（处理行数）
+        """
+        if not self.enabled:
+            yield {}
+            return
+
+        metrics = {"name": name, "rows": None}
+        started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            yield metrics
+        except BaseException:
+            metrics["failed"] = True
+            raise
+        finally:
+            metrics["wall_seconds"] = round(time.perf_counter() - started, 4)
+            metrics["cpu_seconds"] = round(time.process_time() - cpu_started, 4)
+            peak = peak_rss_mb()
+            metrics["peak_rss_mb"] = round(peak, 1) if peak is not None else None
+            self.stages.append(metrics)
+            status = "失败" if metrics.get("failed") else "完成"
+            self.logger.info(f"阶段 {name} {status}：耗时 {metrics['wall_seconds']}s，"
+                             f"CPU {metrics['cpu_seconds']}s，行数 {metrics['rows']}，"
+                             f"峰值内存 {metrics['peak_rss_mb']} MB")
+
+    @contextmanager
+    def measure(self, condition_name: str, key: str):
+        """
+        记录单个筛选条件某一步骤的耗时（秒），同一步骤多次调用时累加
+
+        Args:
+            condition_name: 条件名称
+            key: 指标名称，如 filter_seconds、write_seconds
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(condition_name, key, time.perf_counter() - started)
+
+    def add(self, condition_name: str, key: str, seconds: float) -> None:
+        """累加单个筛选条件某一步骤的耗时（秒），用于在其他进程中测得的耗时"""
+        if not self.enabled:
+            return
+        with self._lock:
+            condition = self.conditions.setdefault(condition_name, {"name": condition_name})
+            condition[key] = round(condition.get(key, 0) + seconds, 6)
+
+    def count(self, condition_name: str, **values) -> None:
+        """记录单个筛选条件的其他指标，如 rows（匹配行数）"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.conditions.setdefault(condition_name, {"name": condition_name}).update(values)
+
+    def field(self, field_name: str, **values) -> None:
+        """记录单个字段的统计指标，如 distinct（不同值个数）"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.fields.setdefault(field_name, {"name": field_name}).update(values)
+
+    def to_dict(self) -> dict:
+        """以可序列化为 JSON 的形式返回全部指标"""
+        return {
+            "version": METRICS_VERSION,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "total_wall_seconds": round(sum(stage["wall_seconds"] for stage in self.stages), 4),
+            "peak_rss_mb": max((stage["peak_rss_mb"] or 0 for stage in self.stages), default=None),
+            "stages": self.stages,
+            "conditions": list(self.conditions.values()),
+            "fields": list(self.fields.values()),
+        }
+
+    def write(self, path: str, **extra):
+        """
+        写出 JSON 指标文件
+
+        Args:
+            path: 输出路径
+            **extra: 附加到指标中的其他信息，如输入文件
+
+        Returns:
+            str | None: 输出路径，未启用时返回 None
+        """
+        if not self.enabled:
+            return None
+        metrics = dict(extra, **self.to_dict())
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, ensure_ascii=False, indent=2, default=str)
+        self.logger.info(f"已将运行指标保存到 {path}")
+        return path
+
+
+@contextmanager
+def profiling(mode: str, output_dir: str, logger=None):
+    """
+    按配置对包裹的代码进行性能分析
+
+    Args:
+        mode: none（默认，不分析）、cprofile（输出 profile.prof，可用 pstats/snakeviz 查看）
+              或 pyinstrument（输出 profile.html，需要安装 pyinstrument）
+        output_dir: 分析结果的输出目录
+        logger: 日志记录器
+
+    Raises:
+        ValueError: 如果配置了不支持的分析方式
+    """
+    logger = logger or logging.getLogger(__name__)
+    mode = (mode or "none").lower()
+
+    if mode == "none":
+        yield
+        return
+
+    if mode == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            output_path = os.path.join(output_dir, "profile.prof")
+            profiler.dump_stats(output_path)
+            logger.info(f"已将性能分析结果保存到 {output_path}")
+        return
+
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("metrics.profile 配置为 pyinstrument，但未安装 pyinstrument，跳过性能分析")
+            yield
+            return
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            output_path = os.path.join(output_dir, "profile.html")
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+            logger.info(f"已将性能分析结果保存到 {output_path}")
+        return
+
+    raise ValueError(f"不支持的性能分析方式: {mode}")
\ No newline at end of file
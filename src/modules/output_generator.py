@@ -2,78 +2,379 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import pandas as pd
+from .aggregator import full_rows_enabled
 from .data_manager import DataManager
 
+# Excel 工作表名称长度上限
+MAX_SHEET_NAME_LENGTH = 31
+# 条件汇总工作表名称
+SUMMARY_SHEET_NAME = "条件汇总"
+# 工作表名称中不允许出现的字符（谓词写法如 B*、~^A[0-9]$ 可能包含）
+INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def _condition_sheet_name(condition_name: str, filter_item: dict) -> str:
+    """
+    生成筛选结果工作表名称
+
+    简化工作表名称：只使用筛选值的序列作为标识。Excel 不允许的字符（[]:*?/\\）替换为 _，
+    不允许出现在结尾的单引号被去掉；名称以唯一的条件名称和分隔符开头，截断后仍不会重名
+
+    Args:
+        condition_name: 条件名称
+        filter_item: 筛选条件
+
+    Returns:
+        str: 不超过31个字符（Excel限制）的工作表名称
+    """
+    value_sequence = '_'.join([str(v) for v in filter_item.values() if v != ''])
+    if not value_sequence:
+        value_sequence = "空值"
+
+    sheet_name = f"{condition_name}_{INVALID_SHEET_CHARS.sub('_', value_sequence)}"
+    if len(sheet_name) > MAX_SHEET_NAME_LENGTH:
+        sheet_name = sheet_name[:MAX_SHEET_NAME_LENGTH]
+    return sheet_name.rstrip("'")
+
+
+def _cell_value(value):
+    """将单元格值转换为可直接写入的值：空值（NaN）写为空单元格，与 pandas 的 na_rep 一致"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return value
+
+
+def _iter_total_rows(data_mgr: DataManager, header_column: list):
+    """
+    逐行生成总表工作表：转置后每行一个字段，首列为原始第一列
+
+    Yields:
+        list: 单行的单元格值
+    """
+    for position, header in enumerate(header_column):
+        yield [header] + [_cell_value(v) for v in data_mgr.field_values(position)]
+
+
+def _iter_filter_rows(filter_store: list):
+    """
+    逐行生成总表筛选工作表：首行为列名，其后每行一个筛选条件
+
+    Yields:
+        list: 单行的单元格值
+    """
+    fields = list(filter_store[0].keys())
+    yield fields
+    for filter_item in filter_store:
+        # 空字符串（通配符）写为空单元格
+        yield [None if filter_item.get(field) == '' else _cell_value(filter_item.get(field))
+               for field in fields]
+
+
+def _iter_summary_rows(summary: list):
+    """
+    逐行生成条件汇总工作表：首行为列名，其后每行一个条件（见 aggregator）
+
+    Yields:
+        list: 单行的单元格值
+    """
+    yield list(summary[0])
+    for row in summary:
+        yield list(row.values())
+
+
+def _iter_condition_rows(data_mgr: DataManager, record_ids):
+    """
+    逐行生成单个筛选条件的结果工作表：转置后首行为结果序号，其后每行一个字段
+
+    每行只从数据总表中切出匹配记录在该字段上的值，不复制整条记录。
+
+    Yields:
+        list: 单行的单元格值
+    """
+    yield [None] + list(range(len(record_ids)))
+    for position, field in enumerate(data_mgr.data_fields()):
+        yield [field] + [_cell_value(v) for v in data_mgr.field_values(position, record_ids)]
+
+
+def _iter_condition_results(data_mgr: DataManager):
+    """
+    按条件顺序生成需要写入工作表的筛选结果（跳过没有匹配记录的条件）
+
+    配置 output.xlsx_sheets 为 false 时不生成任何条件结果工作表，大规模运行时只输出
+    总表与总表筛选，结果以 CSV 或数据集形式提供；只输出汇总（aggregate.full_rows 为 false）时同样不生成。
+
+    Yields:
+        tuple: (工作表名称, 匹配记录序号数组)
+    """
+    if not data_mgr.config.get('output', 'xlsx_sheets', True) or not full_rows_enabled(data_mgr.config):
+        return
+    for idx, filter_item in enumerate(data_mgr.filter_store):
+        condition_name = f"条件_{idx + 1}"
+        record_ids = data_mgr.filtered_data.get(condition_name)
+        if record_ids is not None and len(record_ids):
+            yield _condition_sheet_name(condition_name, filter_item), record_ids
+
+
+def _iter_sheets(data_mgr: DataManager, header_column: list):
+    """
+    按输出顺序生成 (工作表名称, 行迭代器)：总表、总表筛选、每个筛选条件的结果与条件汇总
+
+    行迭代器在写入时才逐行计算，任意时刻只需在内存中保留一行。
+    """
+    yield "总表", _iter_total_rows(data_mgr, header_column)
+    yield "总表筛选", _iter_filter_rows(data_mgr.filter_store)
+
+    for sheet_name, record_ids in _iter_condition_results(data_mgr):
+        yield sheet_name, _iter_condition_rows(data_mgr, record_ids)
+
+    if data_mgr.condition_summary:
+        yield SUMMARY_SHEET_NAME, _iter_summary_rows(data_mgr.condition_summary)
+
+
+def _write_with_pandas(output_path: str, data_mgr: DataManager, header_column: list) -> None:
+    """使用 pandas ExcelWriter 写入（每个工作表先构建完整的 DataFrame）"""
+    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+        # 写入总表
+        if data_mgr.has_data():
+            df_total = data_mgr.to_frame()
+            # 转置数据
+            df_total = df_total.T
+            # 插入原始的第一列数据作为新列
+            df_total.insert(0, "原始第一列", header_column)
+            df_total.to_excel(writer, sheet_name="总表", header=False, index=False)
+
+        # 写入总表筛选
+        if data_mgr.filter_store:
+            df_filters = pd.DataFrame(data_mgr.filter_store)
+            df_filters.to_excel(writer, sheet_name="总表筛选", index=False)
+
+        # 写入每个筛选条件的结果
+        for sheet_name, record_ids in _iter_condition_results(data_mgr):
+            df_filtered = data_mgr.select_frame(record_ids)
+            # 转置数据
+            df_filtered = df_filtered.T
+            df_filtered.to_excel(writer, sheet_name=sheet_name, index=True)
+
+        # 写入条件汇总
+        if data_mgr.condition_summary:
+            pd.DataFrame(data_mgr.condition_summary).to_excel(writer, sheet_name=SUMMARY_SHEET_NAME, index=False)
+
+
+class _OpenpyxlBook:
+    """openpyxl 只写模式的工作簿：逐个工作表、逐行流式写入"""
+
+    def __init__(self, output_path: str):
+        import openpyxl
+
+        self.output_path = output_path
+        self.workbook = openpyxl.Workbook(write_only=True)
+
+    def add_sheet(self, sheet_name: str, rows) -> None:
+        worksheet = self.workbook.create_sheet(sheet_name)
+        for row in rows:
+            worksheet.append(row)
+
+    def close(self) -> None:
+        self.workbook.save(self.output_path)
+
+
+class _XlsxwriterBook:
+    """xlsxwriter constant_memory 模式的工作簿（可选依赖）：逐个工作表、逐行流式写入"""
+
+    def __init__(self, output_path: str):
+        try:
+            import xlsxwriter
+        except ImportError as e:
+            raise ValueError("xlsx_engine 配置为 xlsxwriter，但未安装 xlsxwriter，请执行 pip install xlsxwriter") from e
+
+        # 关闭公式与链接的自动识别，与其他写入方式保持一致的单元格内容
+        self.workbook = xlsxwriter.Workbook(output_path, {
+            "constant_memory": True,
+            "strings_to_formulas": False,
+            "strings_to_urls": False,
+        })
+
+    def add_sheet(self, sheet_name: str, rows) -> None:
+        worksheet = self.workbook.add_worksheet(sheet_name)
+        for row_idx, row in enumerate(rows):
+            for col_idx, value in enumerate(row):
+                if value is not None:
+                    worksheet.write(row_idx, col_idx, value)
+
+    def close(self) -> None:
+        self.workbook.close()
+
+
+# 可逐个工作表流式写入的 XLSX 写入方式
+STREAMING_BOOKS = {
+    "openpyxl": _OpenpyxlBook,
+    "xlsxwriter": _XlsxwriterBook,
+}
+
+
+def _write_streaming(output_path: str, data_mgr: DataManager, header_column: list, book_class) -> None:
+    """按输出顺序逐个工作表流式写入"""
+    book = book_class(output_path)
+    for sheet_name, rows in _iter_sheets(data_mgr, header_column):
+        book.add_sheet(sheet_name, rows)
+    book.close()
+
+
+def _write_with_openpyxl(output_path: str, data_mgr: DataManager, header_column: list) -> None:
+    """使用 openpyxl 只写模式逐行流式写入"""
+    _write_streaming(output_path, data_mgr, header_column, _OpenpyxlBook)
+
+
+def _write_with_xlsxwriter(output_path: str, data_mgr: DataManager, header_column: list) -> None:
+    """使用 xlsxwriter constant_memory 模式逐行流式写入（可选依赖）"""
+    _write_streaming(output_path, data_mgr, header_column, _XlsxwriterBook)
+
+
+# 可选的 XLSX 写入方式
+XLSX_WRITERS = {
+    "pandas": _write_with_pandas,
+    "openpyxl": _write_with_openpyxl,
+    "xlsxwriter": _write_with_xlsxwriter,
+}
+
+
+def _xlsx_engine(data_mgr: DataManager) -> str:
+    """
+    检查数据已加载并返回配置的 XLSX 写入方式
+
+    Raises:
+        ValueError: 如果数据未加载或配置了不支持的写入方式
+    """
+    if not data_mgr.has_data() or not data_mgr.filter_store:
+        raise ValueError("数据未加载，请先提取数据和筛选条件")
+    xlsx_engine = data_mgr.config.get('output', 'xlsx_engine', 'openpyxl')
+    if xlsx_engine not in XLSX_WRITERS:
+        raise ValueError(f"不支持的 XLSX 写入方式: {xlsx_engine}")
+    return xlsx_engine
+
+
+def _xlsx_output_path(input_file: str, data_mgr: DataManager) -> str:
+    """输出文件路径：输出目录下的 <输入文件名>_筛选结果_<时间戳>.xlsx"""
+    input_filename = os.path.splitext(os.path.basename(input_file))[0]
+    timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(data_mgr.output_dir, f"{input_filename}_筛选结果_{timestamp}.xlsx")
+
+
+def _export_header_column(input_file: str, data_mgr: DataManager) -> list:
+    """复用提取数据时保留的源文件表头，仅在缺失时才重新读取"""
+    if data_mgr.header_column is not None:
+        return data_mgr.header_column
+    data_sheet = data_mgr.config.get('sheets', 'data_sheet', '总表')
+    source_df = pd.read_excel(input_file, sheet_name=data_sheet)
+    return source_df.iloc[:, 0].tolist()  # 转换为列表
+
+
+class XlsxResultSink:
+    """
+    随筛选过程写出 XLSX 的写出器（结果流的消费者，见 result_stream）
+
+    打开时先写出总表与总表筛选，此后每收到一个条件的结果即写出其结果工作表，筛选结束时
+    XLSX 随之完成，不再需要单独的导出阶段。增量模式下沿用的结果先于重新筛选的结果到达，
+    写出前按条件顺序重新排列（只暂存记录序号数组），工作表顺序与 export_to_xlsx 一致。
+    启用条件汇总时，汇总写出器先于本写出器关闭，关闭时写出条件汇总工作表。
+    """
+
+    # 工作表必须按顺序写出，只使用一个写出线程
+    threads = 1
+
+    def __init__(self, input_file: str, data_mgr: DataManager, book_class):
+        self.data_mgr = data_mgr
+        self.book_class = book_class
+        self.output_path = _xlsx_output_path(input_file, data_mgr)
+        self.header_column = _export_header_column(input_file, data_mgr)
+        self.condition_sheets = (data_mgr.config.get('output', 'xlsx_sheets', True)
+                                 and full_rows_enabled(data_mgr.config))
+        self._book = None
+        self._pending = {}
+        self._next = 0
+
+    def open(self) -> None:
+        self._book = self.book_class(self.output_path)
+        self._book.add_sheet("总表", _iter_total_rows(self.data_mgr, self.header_column))
+        self._book.add_sheet("总表筛选", _iter_filter_rows(self.data_mgr.filter_store))
+
+    def write(self, idx: int, record_ids, unchanged: bool = False) -> None:
+        self._pending[idx] = record_ids
+        while self._next in self._pending:
+            record_ids = self._pending.pop(self._next)
+            condition_name = f"条件_{self._next + 1}"
+            if self.condition_sheets and len(record_ids):
+                with self.data_mgr.metrics.measure(condition_name, "xlsx_seconds"):
+                    sheet_name = _condition_sheet_name(condition_name, self.data_mgr.filter_store[self._next])
+                    self._book.add_sheet(sheet_name, _iter_condition_rows(self.data_mgr, record_ids))
+            self._next += 1
+
+    def close(self) -> None:
+        """
+        保存 XLSX
+
+        Raises:
+            ValueError: 如果部分条件的结果没有写出
+        """
+        if self._next < len(self.data_mgr.filter_store):
+            raise ValueError(f"生成XLSX文件时缺少条件_{self._next + 1} 的筛选结果")
+        if self.data_mgr.condition_summary:
+            self._book.add_sheet(SUMMARY_SHEET_NAME, _iter_summary_rows(self.data_mgr.condition_summary))
+        self._book.close()
+        self.data_mgr.logger.info(f"成功生成XLSX文件: {self.output_path}")
+
+
+def create_xlsx_sink(input_file: str, data_mgr: DataManager):
+    """
+    创建随筛选过程写出 XLSX 的写出器，作为 apply_filters 的 sinks 参数使用
+
+    需要在提取数据与筛选条件之后、应用筛选之前调用。
+
+    Args:
+        input_file (str): 输入文件路径，用于确定输出文件的保存位置
+        data_mgr (DataManager): 数据管理器实例
+
+    Returns:
+        XlsxResultSink | None: 写出器；pandas 写入方式需要全部结果构建 DataFrame，返回 None，
+        此时在筛选完成后调用 export_to_xlsx
+
+    Raises:
+        ValueError: 如果数据未加载或配置了不支持的写入方式
+    """
+    xlsx_engine = _xlsx_engine(data_mgr)
+    if xlsx_engine not in STREAMING_BOOKS:
+        return None
+    return XlsxResultSink(input_file, data_mgr, STREAMING_BOOKS[xlsx_engine])
+
+
 def export_to_xlsx(input_file: str, data_mgr: DataManager) -> str:
     """
-    生成新的 XLSX 文件，包含总表、总表筛选和每个筛选条件的结果。
-    
+    生成新的 XLSX 文件，包含总表、总表筛选和每个筛选条件的结果（output.xlsx_sheets 为 false 时不含条件结果），
+    启用条件汇总时另有条件汇总工作表。
+
+    写入方式由配置项 output.xlsx_engine 决定：openpyxl（只写模式流式写入，默认）、
+    xlsxwriter（constant_memory 模式，需要安装 xlsxwriter）或 pandas（构建 DataFrame 后写入）。
+    处理流程中通常使用 create_xlsx_sink 在筛选过程中写出，此函数用于筛选完成后单独导出。
+
     Args:
         input_file (str): 输入文件路径，用于确定输出文件的保存位置
         data_mgr (DataManager): 数据管理器实例
-        
+
     Returns:
         str: 生成的XLSX文件路径
-    
+
     Raises:
-        ValueError: 如果数据未加载。
+        ValueError: 如果数据未加载或配置了不支持的写入方式。
     """
     try:
-        # 检查数据是否已加载
-        if not data_mgr.data_store or not data_mgr.filter_store:
-            raise ValueError("数据未加载，请先提取数据和筛选条件")
-        
-        # 生成输出文件名
-        input_filename = os.path.splitext(os.path.basename(input_file))[0]
-        timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"{input_filename}_筛选结果_{timestamp}.xlsx"
-        
-        # 确保输出路径存在
-        output_path = os.path.join(data_mgr.output_dir, output_filename)
-        
-        # 读取源文件表头
-        source_df = pd.read_excel(input_file, sheet_name="总表")
-        export_column_header = source_df.iloc[:, 0].tolist()  # 转换为列表
-        
-        # 使用 ExcelWriter 写入多个Sheet
-        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-            # 写入总表
-            if data_mgr.data_store:
-                df_total = pd.DataFrame(data_mgr.data_store)
-                # 转置数据
-                df_total = df_total.T
-                # 插入原始的第一列数据作为新列
-                df_total.insert(0, "原始第一列", export_column_header)
-                df_total.to_excel(writer, sheet_name="总表", header=False, index=False)
-            
-            # 写入总表筛选
-            if data_mgr.filter_store:
-                df_filters = pd.DataFrame(data_mgr.filter_store)
-                df_filters.to_excel(writer, sheet_name="总表筛选", index=False)
-            
-            # 写入每个筛选条件的结果
-            for idx, filter_item in enumerate(data_mgr.filter_store):
-                condition_name = f"条件_{idx + 1}"
-                if condition_name in data_mgr.filtered_data and data_mgr.filtered_data[condition_name]:
-                    df_filtered = pd.DataFrame(data_mgr.filtered_data[condition_name])
-                    # 转置数据
-                    df_filtered = df_filtered.T
-                    
-                    # 简化工作表名称：只使用筛选值的序列作为标识
-                    value_sequence = '_'.join([str(v) for v in filter_item.values() if v != ''])
-                    if not value_sequence:
-                        value_sequence = "空值"
-                    
-                    # 确保工作表名称不超过31个字符（Excel限制）
-                    sheet_name = f"{condition_name}_{value_sequence}"
-                    if len(sheet_name) > 31:
-                        sheet_name = sheet_name[:31]
-                    
-                    df_filtered.to_excel(writer, sheet_name=sheet_name, index=True)
-        
+        xlsx_engine = _xlsx_engine(data_mgr)
+        output_path = _xlsx_output_path(input_file, data_mgr)
+        XLSX_WRITERS[xlsx_engine](output_path, data_mgr, _export_header_column(input_file, data_mgr))
+
         data_mgr.logger.info(f"成功生成XLSX文件: {output_path}")
         return output_path
     except Exception as e:
         data_mgr.logger.error(f"生成XLSX文件时发生错误: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import multiprocessing
+import os
+import time
+
+# 子进程中使用的选择函数。fork 模式下在创建进程池之前由主进程设置，
+# 子进程直接继承数据总表与已建好的索引，无需按任务序列化传输
+_WORKER_SELECTOR = None
+
+
+def resolve_worker_count(workers) -> int:
+    """
+    解析配置的工作进程数
+
+    Args:
+        workers: 配置值，小于等于 0 表示使用全部 CPU 核心
+
+    Returns:
+        int: 实际工作进程数，至少为 1
+    """
+    workers = int(workers or 1)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(workers, 1)
+
+
+def _init_worker(selector_factory, data_mgr) -> None:
+    """不支持 fork 的平台：每个子进程启动时接收一次数据总表并构建选择函数"""
+    global _WORKER_SELECTOR
+    _WORKER_SELECTOR = selector_factory(data_mgr)
+
+
+def _select_chunk(chunk: list) -> list:
+    """
+    在子进程中处理一批筛选条件
+
+    Args:
+        chunk: 条件序号列表
+
+    Returns:
+        list: [(条件序号, 匹配记录序号数组, 筛选耗时), ...]，耗时随结果返回主进程写入运行指标
+    """
+    results = []
+    for idx in chunk:
+        started = time.perf_counter()
+        record_ids = _WORKER_SELECTOR(idx)
+        results.append((idx, record_ids, time.perf_counter() - started))
+    return results
+
+
+def _split_chunks(items: list, workers: int) -> list:
+    """将筛选条件切分为若干批次，每个进程约分得 4 批以平衡负载"""
+    chunk_size = max(1, math.ceil(len(items) / (workers * 4)))
+    return [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+
+def iter_parallel_selections(selector, selector_factory, data_mgr, workers: int, indices=None):
+    """
+    使用进程池并行执行筛选，按条件顺序逐个返回结果
+
+    优先使用 fork 启动子进程，数据总表与索引以写时复制方式共享；
+    不支持 fork 的平台退化为每个子进程初始化时接收一次数据总表。
+
+    Args:
+        selector: 主进程中已创建的选择函数：条件序号 -> 匹配记录序号数组
+        selector_factory: 创建选择函数的模块级函数（不支持 fork 时在子进程中调用）
+        data_mgr: 数据管理器
+        workers (int): 工作进程数
+        indices: 需要筛选的条件序号，为 None 时筛选全部条件
+
+    Yields:
+        tuple: (条件序号, 匹配记录序号数组, 筛选耗时（秒）)，顺序与 indices 一致
+    """
+    global _WORKER_SELECTOR
+
+    items = list(range(len(data_mgr.filter_store)) if indices is None else indices)
+    if "fork" in multiprocessing.get_all_start_methods():
+        _WORKER_SELECTOR = selector
+        context = multiprocessing.get_context("fork")
+        pool = context.Pool(workers)
+    else:
+        context = multiprocessing.get_context("spawn")
+        pool = context.Pool(workers, initializer=_init_worker,
+                            initargs=(selector_factory, data_mgr))
+
+    try:
+        # imap 按提交顺序返回结果，保证输出确定
+        for chunk_result in pool.imap(_select_chunk, _split_chunks(items, workers)):
+            yield from chunk_result
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        _WORKER_SELECTOR = None
\ No newline at end of file
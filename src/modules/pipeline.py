@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import time
+from .config import Config
+from .data_manager import DataManager
+from .data_extractor import extract_schema, extract_data, extract_filters
+from .filter_processor import apply_filters
+from .chunked_filter import apply_filters_chunked
+from .output_generator import create_xlsx_sink, export_to_xlsx
+from .metrics import profiling
+
+
+def process_workbook(input_file: str, config: Config, base_path: str,
+                     output_dir: str = None, verbose: bool = True) -> dict:
+    """
+    处理单个工作簿：提取数据总表与筛选条件、应用筛选并导出结果
+
+    单文件入口（main.py）与批量入口（batch.py）共用此流程。每个阶段记录运行指标，
+    可按配置进行性能分析，指标文件写入输出目录。XLSX 在筛选过程中随结果流写出
+    （pandas 写入方式除外），导出阶段只在需要时单独生成。配置 chunked.enabled 时按记录块
+    分块筛选，只输出各条件的 CSV，输出路径为输出目录。
+
+    Args:
+        input_file (str): 输入文件路径
+        config (Config): 配置
+        base_path (str): 项目根目录，数据总表缓存保存在其下
+        output_dir (str): 输出目录，为 None 时使用 base_path 下的 outputs 目录
+        verbose (bool): 是否打印阶段提示
+
+    Returns:
+        dict: 处理摘要（输出文件、记录数、条件数、匹配行数、耗时等）
+
+    Raises:
+        FileNotFoundError: 如果输入文件不存在
+        ValueError: 如果输入文件缺少必要的 Sheet 或数据无效
+    """
+    def echo(message):
+        if verbose:
+            print(message)
+
+    started = time.perf_counter()
+    data_mgr = DataManager(config)
+    data_mgr.set_output_dir(base_path, output_dir)
+    metrics = data_mgr.metrics
+
+    if config.get('chunked', 'enabled', False):
+        return _process_chunked(input_file, data_mgr, echo, started)
+    
+    # 执行流程（每个阶段记录耗时、行数与内存，可按配置进行性能分析）
+    with profiling(config.get('metrics', 'profile', 'none'), data_mgr.output_dir, data_mgr.logger):
+        echo("1. 提取表结构...")
+        with metrics.stage("extract_schema"):
+            extract_schema(input_file, data_mgr)
+
+        echo("2. 提取数据总表...")
+        with metrics.stage("extract_data") as stage:
+            extract_data(input_file, data_mgr)
+            stage["rows"] = data_mgr.record_count()
+
+        echo("3. 提取筛选条件...")
+        with metrics.stage("extract_filters") as stage:
+            extract_filters(input_file, data_mgr)
+            stage["rows"] = len(data_mgr.filter_store)
+
+        echo("4. 应用筛选条件...")
+        with metrics.stage("apply_filters") as stage:
+            # XLSX 与各条件的 CSV 消费同一个结果流，在筛选过程中由后台线程写出
+            xlsx_sink = create_xlsx_sink(input_file, data_mgr)
+            apply_filters(data_mgr, [xlsx_sink] if xlsx_sink else ())
+            stage["rows"] = sum(len(ids) for ids in data_mgr.filtered_data.values())
+
+        echo("5. 导出结果到 XLSX...")
+        with metrics.stage("export_to_xlsx"):
+            output_path = xlsx_sink.output_path if xlsx_sink else export_to_xlsx(input_file, data_mgr)
+
+    metrics_file = config.get('metrics', 'file', 'metrics.json')
+    metrics.write(os.path.join(data_mgr.output_dir, metrics_file), input_file=input_file)
+
+    return {
+        "input_file": input_file,
+        "output_path": output_path,
+        "output_dir": data_mgr.output_dir,
+        "records": data_mgr.record_count(),
+        "conditions": len(data_mgr.filter_store),
+        "matched_rows": sum(len(ids) for ids in data_mgr.filtered_data.values()),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+def _process_chunked(input_file: str, data_mgr: DataManager, echo, started: float) -> dict:
+    """分块模式：提取筛选条件后按记录块筛选数据总表，不在内存中保留完整的总表与结果"""
+    config, metrics = data_mgr.config, data_mgr.metrics
+    with profiling(config.get('metrics', 'profile', 'none'), data_mgr.output_dir, data_mgr.logger):
+        echo("1. 提取筛选条件...")
+        with metrics.stage("extract_filters") as stage:
+            extract_filters(input_file, data_mgr)
+            stage["rows"] = len(data_mgr.filter_store)
+
+        echo("2. 分块筛选数据总表...")
+        with metrics.stage("apply_filters_chunked") as stage:
+            summary = apply_filters_chunked(input_file, data_mgr)
+            stage["rows"] = summary["records"]
+
+    metrics_file = config.get('metrics', 'file', 'metrics.json')
+    metrics.write(os.path.join(data_mgr.output_dir, metrics_file), input_file=input_file,
+                  blocks=summary["blocks"])
+
+    return {
+        "input_file": input_file,
+        "output_path": data_mgr.output_dir,
+        "output_dir": data_mgr.output_dir,
+        "records": summary["records"],
+        "conditions": len(data_mgr.filter_store),
+        "matched_rows": sum(summary["matched"].values()),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import logging
+import operator
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from .match_keys import is_date_key, key_number, normalize_key
+
+# 比较运算符（按匹配顺序，长的在前）
+_COMPARISONS = (
+    (">=", operator.ge),
+    ("<=", operator.le),
+    ("!=", operator.ne),
+    (">", operator.gt),
+    ("<", operator.lt),
+)
+_COMPARISON_FUNCTIONS = dict(_COMPARISONS)
+
+# 谓词类型的说明，用于提示按谓词解析的筛选值
+_PATTERN_NAMES = {"in": "集合", "range": "范围", "prefix": "前缀", "regex": "正则"}
+
+# 按写法缓存的谓词与按谓词缓存的计算结果最多保留的项数：常驻服务接受任意筛选值，
+# 缓存不设上限时内存会随请求中出现过的写法持续增长
+PREDICATE_CACHE_SIZE = 4096
+
+logger = logging.getLogger(__name__)
+
+
+class PredicateCache(OrderedDict):
+    """
+    按谓词缓存的计算结果（如满足谓词的倒排表、代码集合）
+
+    最多保留 maxsize 项，超出时淘汰最久未使用的项。
+    """
+
+    def __init__(self, maxsize: int = PREDICATE_CACHE_SIZE):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class PredicateText(str):
+    """
+    按谓词写法解析的筛选值
+
+    谓词写法需在配置中启用（filter.predicates），启用时 enable_predicates 将筛选条件中的
+    文本值包装为本类型；普通字符串始终按普通值精确匹配，已有的筛选值（如包含 | 或 .. 的
+    文本）含义不变。本类型即字符串，写出 CSV、工作表名称与日志时与原值相同。
+    """
+
+    __slots__ = ()
+
+
+class Predicate:
+    """
+    单个字段上的筛选谓词
+
+    由筛选条件单元格编译得到，判断数据单元格的匹配键是否满足条件。启用谓词写法
+    （filter.predicates）时支持以下写法，否则所有值均按普通值精确匹配：
+
+    - 普通值：精确匹配（与规范化后的匹配键相等），空单元格为通配符；
+    - 集合：A|B|C，匹配其中任意一个值；
+    - 范围：2020..2024、2024-01-01..2024-03-31，包含两端，可省略一端（如 2020..）；
+    - 比较：>5、>=5、<5、<=5、!=A；
+    - 前缀：ABC*，匹配以 ABC 开头的值；
+    - 正则：~^A\\d+$，在匹配键上执行 re.search；
+    - 以 = 开头时其余内容按普通值精确匹配（如 =A|B 匹配文本 "A|B"）。
+
+    数值与日期的范围、比较按数值与日期进行，文本按字符串顺序比较；空值不满足任何谓词。
+    谓词可哈希、可排序，相同写法的谓词相等，规划器以其作为规范化条件键的一部分。
+    """
+
+    def __init__(self, op: str, operand, test):
+        """
+        初始化谓词
+
+        Args:
+            op: 谓词类型（eq、in、range、比较运算符、prefix、regex）
+            operand: 可哈希的操作数
+            test: 判断函数：匹配键 -> 是否满足
+        """
+        self.op = op
+        self.operand = operand
+        self._test = test
+
+    @property
+    def exact(self):
+        """精确匹配时的匹配键，其他谓词返回 None"""
+        return self.operand if self.op == "eq" else None
+
+    def accepts(self, key) -> bool:
+        """
+        判断匹配键是否满足谓词
+
+        Args:
+            key: 数据单元格的匹配键
+
+        Returns:
+            bool: 是否满足，空值（None）始终不满足
+        """
+        return key is not None and self._test(key)
+
+    def _source(self) -> str:
+        if self.op == "in":
+            return "|".join(self.operand)
+        if self.op == "range":
+            return f"{self.operand[0] or ''}..{self.operand[1] or ''}"
+        if self.op == "prefix":
+            return f"{self.operand}*"
+        if self.op == "regex":
+            return f"~{self.operand}"
+        if self.op == "eq":
+            return self.operand
+        return f"{self.op}{self.operand}"
+
+    def __str__(self) -> str:
+        """谓词的规范写法，重新编译后得到相同的谓词"""
+        source = self._source()
+        if self.op == "eq" and _parse_text(source) != self:
+            return f"={source}"
+        return source
+
+    def __repr__(self) -> str:
+        return f"Predicate({str(self)!r})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Predicate) and (self.op, self.operand) == (other.op, other.operand)
+
+    def __hash__(self) -> int:
+        return hash((self.op, self.operand))
+
+    def __lt__(self, other) -> bool:
+        return (self.op, str(self)) < (other.op, str(other))
+
+
+def _ordered(key, kind: str):
+    """按操作数类型取出可比较的值：数值为 Decimal，日期与文本为匹配键本身，类型不符时返回 None"""
+    if kind == "number":
+        return key_number(key)
+    if kind == "date":
+        return key if is_date_key(key) else None
+    return key
+
+
+def _operand_kind(key) -> str:
+    """操作数类型：number、date 或 text"""
+    if key_number(key) is not None:
+        return "number"
+    if is_date_key(key):
+        return "date"
+    return "text"
+
+
+def _comparison(op: str, key: str) -> Predicate:
+    """比较谓词：数值与日期按各自的顺序比较，类型不符的单元格不满足"""
+    if op == "!=":
+        return Predicate(op, key, lambda data_key: data_key != key)
+    kind = _operand_kind(key)
+    bound = _ordered(key, kind)
+    compare = _COMPARISON_FUNCTIONS[op]
+
+    def test(data_key):
+        value = _ordered(data_key, kind)
+        return value is not None and compare(value, bound)
+    return Predicate(op, key, test)
+
+
+def _range(low, high) -> Predicate:
+    """范围谓词（包含两端），两端类型不一致时按文本比较"""
+    kinds = {_operand_kind(bound) for bound in (low, high) if bound is not None}
+    kind = kinds.pop() if len(kinds) == 1 else "text"
+    lower = _ordered(low, kind) if low is not None else None
+    upper = _ordered(high, kind) if high is not None else None
+
+    def test(data_key):
+        value = _ordered(data_key, kind)
+        return (value is not None
+                and (lower is None or value >= lower)
+                and (upper is None or value <= upper))
+    return Predicate("range", (low, high), test)
+
+
+def _equal(key) -> Predicate:
+    return Predicate("eq", key, lambda data_key: data_key == key)
+
+
+@lru_cache(maxsize=PREDICATE_CACHE_SIZE)
+def _literal_text(text: str):
+    """未启用谓词写法时的文本：按普通值精确匹配"""
+    key = normalize_key(text)
+    return _equal(key) if key is not None else None
+
+
+@lru_cache(maxsize=PREDICATE_CACHE_SIZE)
+def _parse_text(text: str):
+    """解析筛选条件单元格中的文本（同一写法只解析一次）"""
+    text = text.strip()
+    if not text:
+        return None
+    if text.startswith("="):
+        key = normalize_key(text[1:])
+        return _equal(key) if key is not None else None
+    if text.startswith("~") and len(text) > 1:
+        try:
+            pattern = re.compile(text[1:])
+        except re.error as e:
+            raise ValueError(f"筛选条件中的正则表达式无效: {text}") from e
+        return Predicate("regex", text[1:], lambda data_key: pattern.search(data_key) is not None)
+    for op, _ in _COMPARISONS:
+        if text.startswith(op) and text[len(op):].strip():
+            return _comparison(op, normalize_key(text[len(op):]))
+    if ".." in text:
+        low, _, high = text.partition("..")
+        low, high = normalize_key(low), normalize_key(high)
+        if low is not None or high is not None:
+            return _range(low, high)
+    if "|" in text:
+        keys = tuple(sorted({key for key in map(normalize_key, text.split("|")) if key is not None}))
+        if len(keys) > 1:
+            keys_set = frozenset(keys)
+            return Predicate("in", keys, lambda data_key: data_key in keys_set)
+        if keys:
+            return _equal(keys[0])
+        return None
+    if text.endswith("*") and len(text) > 1 and "*" not in text[:-1]:
+        prefix = text[:-1].strip()
+        return Predicate("prefix", prefix, lambda data_key: data_key.startswith(prefix))
+    return _equal(normalize_key(text))
+
+
+def _compile_text(text: str):
+    """
+    编译筛选条件单元格中的文本
+
+    含有 |、..、结尾的 * 或以 >、<、!=、~ 开头的值按谓词解析，而不是作为普通值精确匹配。
+    这类值第一次出现时记录一条警告，提示以 = 开头可按普通值匹配。
+    """
+    predicate = _parse_text(text)
+    if predicate is not None and predicate.op != "eq":
+        _report_pattern(text.strip(), _PATTERN_NAMES.get(predicate.op, "比较"))
+    return predicate
+
+
+@lru_cache(maxsize=PREDICATE_CACHE_SIZE)
+def _report_pattern(text: str, kind: str) -> None:
+    """提示按谓词解析的筛选值（同一写法只提示一次）"""
+    logger.warning(f"筛选值 {text} 按{kind}谓词解析；如需按普通值精确匹配，请写为 ={text}")
+
+
+def enable_predicates(filter_store: list, enabled: bool = True) -> list:
+    """
+    按配置启用谓词写法：将筛选条件中的文本值包装为 PredicateText
+
+    Args:
+        filter_store: 筛选条件列表
+        enabled: 是否启用（filter.predicates），未启用时原样返回
+
+    Returns:
+        list: 筛选条件列表
+    """
+    if not enabled:
+        return filter_store
+    return [{field: PredicateText(value) if isinstance(value, str) else value
+             for field, value in filter_item.items()}
+            for filter_item in filter_store]
+
+
+def compile_predicate(value):
+    """
+    将筛选条件单元格的值编译为谓词
+
+    只有 PredicateText 按谓词写法解析，其他文本按普通值精确匹配。
+
+    Args:
+        value: 筛选条件单元格的值，或已编译的谓词
+
+    Returns:
+        Predicate | None: 谓词，空值（通配符）返回 None
+
+    Raises:
+        ValueError: 如果正则表达式无效
+    """
+    if value is None or isinstance(value, Predicate):
+        return value
+    if isinstance(value, PredicateText):
+        return _compile_text(value)
+    if isinstance(value, str):
+        return _literal_text(value)
+    key = normalize_key(value)
+    return _equal(key) if key is not None else None
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import queue
+import threading
+import time
+
+# 通知写出线程退出的标记
+_STOP = object()
+
+
+class _Consumer:
+    """单个写出器的有界队列与后台写出线程"""
+
+    def __init__(self, sink, queue_size: int):
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.cancelled = False
+        self._opened = False
+        self._open_lock = threading.Lock()
+        self.threads = [threading.Thread(target=self._run, name=f"{type(sink).__name__}-{i}", daemon=True)
+                        for i in range(max(int(getattr(sink, "threads", 1)), 1))]
+
+    def _call(self, method, *args) -> None:
+        # 出错或取消后丢弃剩余结果，但继续从队列中取出，生产者不会因队列已满而阻塞
+        if self.error is not None or self.cancelled:
+            return
+        try:
+            method(*args)
+        except BaseException as e:
+            self.error = e
+
+    def _run(self) -> None:
+        # 第一个启动的线程负责打开写出器，其余线程等待打开完成后再取结果
+        with self._open_lock:
+            if not self._opened:
+                self._opened = True
+                self._call(self.sink.open)
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            self._call(self.sink.write, *item)
+
+
+class ResultStream:
+    """
+    筛选结果流：筛选（生产者）按条件发布结果，写出器（消费者）在后台线程中写出
+
+    每个写出器有独立的有界队列（output.queue_size）与写出线程，筛选下一个条件的同时写出
+    已完成的条件；队列已满时筛选等待写出，内存中最多积压 queue_size 个条件的结果。同一个
+    结果（匹配记录序号数组）发布一次即由全部写出器消费，各写出器只在写出时从数据总表切片。
+
+    写出器需要提供：
+
+    - threads：并发写出线程数，需要按发布顺序接收结果的写出器为 1（默认）；
+    - open()：在写出线程中、接收第一个结果之前调用一次；
+    - write(idx, record_ids, unchanged)：写出第 idx 个条件的结果，unchanged 表示增量模式下
+      该条件的结果文件与上次运行一致；
+    - close()：全部结果写出后在调用线程中调用一次。
+
+    asynchronous 为 False 时在调用线程中依次调用各写出器，便于调试与对比。
+    """
+
+    def __init__(self, sinks, logger, queue_size: int = 8, asynchronous: bool = True):
+        """
+        初始化结果流（写出线程在 start 时才启动）
+
+        Args:
+            sinks: 写出器列表
+            logger: 日志记录器
+            queue_size: 每个写出器队列中等待写出的结果数上限
+            asynchronous: 是否在后台线程中写出
+        """
+        self.sinks = list(sinks)
+        self.logger = logger
+        self.queue_size = max(int(queue_size), 1)
+        self.asynchronous = asynchronous
+        self.stats = {"published": 0, "blocked_seconds": 0.0}
+        self._consumers = None
+        self._backlog = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def start(self) -> None:
+        """
+        启动写出线程（重复调用无效），启动前发布的结果在此时交给写出器
+
+        并行筛选使用 fork 创建进程池，调用方应在进程池创建之后再启动写出线程。
+        """
+        if self._consumers is not None:
+            return
+        if self.asynchronous:
+            self._consumers = [_Consumer(sink, self.queue_size) for sink in self.sinks]
+            for consumer in self._consumers:
+                for thread in consumer.threads:
+                    thread.start()
+        else:
+            self._consumers = []
+            for sink in self.sinks:
+                sink.open()
+        backlog, self._backlog = self._backlog, []
+        for item in backlog:
+            self._dispatch(item)
+
+    def publish(self, idx: int, record_ids, unchanged: bool = False) -> None:
+        """
+        发布第 idx 个条件的结果
+
+        Raises:
+            Exception: 如果某个写出器在后台写出时出错（尽早停止筛选）
+        """
+        self.stats["published"] += 1
+        item = (idx, record_ids, unchanged)
+        if self._consumers is None:
+            self._backlog.append(item)
+        else:
+            self._dispatch(item)
+
+    def _dispatch(self, item: tuple) -> None:
+        if not self.asynchronous:
+            for sink in self.sinks:
+                sink.write(*item)
+            return
+        self._raise_errors()
+        started = time.perf_counter()
+        for consumer in self._consumers:
+            # 队列已满时阻塞，筛选等待写出
+            consumer.queue.put(item)
+        self.stats["blocked_seconds"] += time.perf_counter() - started
+
+    def _raise_errors(self) -> None:
+        for consumer in self._consumers or []:
+            if consumer.error is not None:
+                raise consumer.error
+
+    def _join(self) -> None:
+        for consumer in self._consumers:
+            for _ in consumer.threads:
+                consumer.queue.put(_STOP)
+        for consumer in self._consumers:
+            for thread in consumer.threads:
+                thread.join()
+
+    def close(self) -> None:
+        """
+        等待全部结果写出后关闭各写出器
+
+        Raises:
+            Exception: 后台写出时发生的第一个异常
+        """
+        self.start()
+        if self.asynchronous:
+            self._join()
+            self._raise_errors()
+        for sink in self.sinks:
+            sink.close()
+        if self.asynchronous and self.sinks:
+            self.logger.info(f"结果写出完成：共 {self.stats['published']} 个条件，"
+                             f"筛选等待写出 {self.stats['blocked_seconds']:.3f}s")
+
+    def abort(self) -> None:
+        """筛选失败时丢弃尚未写出的结果并停止写出线程，不关闭写出器"""
+        if not self.asynchronous or not self._consumers:
+            return
+        for consumer in self._consumers:
+            consumer.cancelled = True
+        self._join()
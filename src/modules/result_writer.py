@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import os
+import pandas as pd
+
+# 每个条件单独写出的 CSV 格式：格式名称 -> 文件后缀
+CSV_FORMATS = {"csv": ".csv", "csv.gz": ".csv.gz", "csv.zst": ".csv.zst"}
+# 全部条件写入同一个数据集的列式格式：格式名称 -> 文件后缀（Feather v2 即 Arrow IPC 文件）
+DATASET_FORMATS = {"parquet": ".parquet", "feather": ".arrow"}
+
+# 数据集文件名（不含后缀）与条件分组列名
+DATASET_NAME = "筛选结果"
+CONDITION_COLUMN = "condition_group"
+
+
+def result_suffix(output_format: str):
+    """
+    获取按条件写出的结果文件后缀
+
+    Args:
+        output_format: 输出格式（配置项 output.format）
+
+    Returns:
+        str | None: CSV 格式的文件后缀，数据集格式返回 None
+
+    Raises:
+        ValueError: 如果配置了不支持的输出格式
+    """
+    if output_format in CSV_FORMATS:
+        return CSV_FORMATS[output_format]
+    if output_format in DATASET_FORMATS:
+        return None
+    raise ValueError(f"不支持的输出格式: {output_format}")
+
+
+def open_csv(output_path: str):
+    """
+    按文件后缀以文本方式打开 CSV 结果文件，.gz 使用 gzip 压缩，.zst 使用 zstd 压缩
+
+    Raises:
+        ValueError: 如果需要 zstd 压缩但未安装 zstandard
+    """
+    # 增量模式下的结果文件可能与上次运行共享硬链接（见 clean_output.OutputRotation），
+    # 先删除再写入新文件，不修改上次运行的结果
+    if os.path.lexists(output_path):
+        os.remove(output_path)
+    if output_path.endswith(".gz"):
+        return gzip.open(output_path, "wt", newline="", encoding="utf-8-sig")
+    if output_path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ValueError("output.format 配置为 csv.zst，但未安装 zstandard，请执行 pip install zstandard") from e
+        return zstandard.open(output_path, "wt", newline="", encoding="utf-8-sig")
+    return open(output_path, "w", newline="", encoding="utf-8-sig")
+
+
+def _import_pyarrow(output_format: str):
+    """导入 pyarrow（可选依赖）"""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ValueError(f"output.format 配置为 {output_format}，但未安装 pyarrow，请执行 pip install pyarrow") from e
+    return pyarrow
+
+
+class DatasetWriter:
+    """
+    将全部条件的筛选结果写入同一个 Parquet 或 Arrow（Feather）数据集
+
+    每个条件的结果作为一个行组（Arrow 为一个记录批次）按条件顺序写出，首列
+    condition_group 为条件名称，下游可按该列过滤而无需逐个解析 CSV；各条件的
+    筛选谓词以 JSON 形式保存在数据集的元数据 conditions 中。
+    """
+
+    def __init__(self, data_mgr, output_format: str):
+        """
+        初始化写出器
+
+        Args:
+            data_mgr: 数据管理器
+            output_format: parquet 或 feather
+
+        Raises:
+            ValueError: 如果未安装 pyarrow（在筛选开始前即检查）
+        """
+        self._pa = _import_pyarrow(output_format)
+        self.data_mgr = data_mgr
+        self.output_format = output_format
+        self.output_path = os.path.join(data_mgr.output_dir, DATASET_NAME + DATASET_FORMATS[output_format])
+        self._results = {}
+
+    def add(self, idx: int, filter_item: dict, record_ids) -> None:
+        """加入第 idx 个条件的筛选结果（在 write 时才按条件顺序写出）"""
+        self._results[idx] = (filter_item, record_ids)
+
+    def _field_types(self, pa) -> list:
+        """
+        按数据总表的整列推断每个字段的类型，保证各条件的结果使用同一个表结构
+
+        类型混杂或全部为空的列按字符串写出。
+        """
+        types = []
+        for position in range(len(self.data_mgr.data_fields())):
+            values = self.data_mgr.field_values(position)
+            try:
+                field_type = pa.array(values, from_pandas=True).type
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                field_type = None
+            types.append(field_type if field_type is not None and not pa.types.is_null(field_type)
+                         else pa.string())
+        return types
+
+    def _column(self, pa, position: int, field_type, record_ids):
+        """取出匹配记录在某个字段上的值并转换为指定类型的 Arrow 数组"""
+        values = self.data_mgr.field_values(position, record_ids)
+        if pa.types.is_string(field_type):
+            values = [None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v)
+                      for v in values]
+        return pa.array(values, type=field_type, from_pandas=True)
+
+    def write(self) -> str:
+        """
+        写出数据集（先写临时文件再替换，中途失败不会留下不完整的结果）
+
+        Returns:
+            str: 数据集文件路径
+        """
+        pa = self._pa
+        field_types = self._field_types(pa)
+        results = sorted(self._results.items())
+        conditions = [{"name": f"条件_{idx + 1}", "filter": filter_item, "rows": len(record_ids)}
+                      for idx, (filter_item, record_ids) in results]
+        schema = pa.schema(
+            [pa.field(CONDITION_COLUMN, pa.string())]
+            + [pa.field(str(field), field_type)
+               for field, field_type in zip(self.data_mgr.data_fields(), field_types)],
+            metadata={"conditions": json.dumps(conditions, ensure_ascii=False, default=str)})
+
+        temp_path = f"{self.output_path}.{os.getpid()}.tmp"
+        try:
+            with self._open_writer(temp_path, schema) as writer:
+                for idx, (_, record_ids) in results:
+                    if not len(record_ids):
+                        continue
+                    columns = [pa.array([f"条件_{idx + 1}"] * len(record_ids), type=pa.string())]
+                    columns += [self._column(pa, position, field_type, record_ids)
+                                for position, field_type in enumerate(field_types)]
+                    writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            os.replace(temp_path, self.output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.data_mgr.logger.info(f"已将 {len(conditions)} 个条件的筛选结果写入数据集 {self.output_path}")
+        return self.output_path
+
+    def _open_writer(self, path: str, schema):
+        """创建 Parquet 或 Arrow IPC 文件写出器，每次 write_table 写出一个行组/记录批次"""
+        if self.output_format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(path, schema)
+        import pyarrow.ipc
+        return pyarrow.ipc.new_file(path, schema)
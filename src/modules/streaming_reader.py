@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import pandas as pd
+
+
+def _normalize_cell(value):
+    """与 pandas.read_excel 保持一致：整数值的浮点数转换为 int"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def iter_sheet_rows(input_file: str, sheet_name: str):
+    """
+    以 openpyxl 只读模式逐行读取 Sheet
+
+    与 pandas.read_excel 的行为保持一致：每行末尾的空单元格被裁剪，
+    Sheet 末尾的空行被丢弃。
+
+    Args:
+        input_file (str): 输入文件路径
+        sheet_name (str): Sheet 名称
+
+    Yields:
+        list: 单行的单元格值
+
+    Raises:
+        ValueError: 如果 XLSX 文件中不存在该 Sheet
+    """
+    # 仅在流式读取时才导入 openpyxl，避免拖慢程序启动
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(input_file, read_only=True, data_only=True)
+    try:
+        if sheet_name not in workbook.sheetnames:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+        pending_empty_rows = 0
+        for row in workbook[sheet_name].iter_rows(values_only=True):
+            values = [_normalize_cell(value) for value in row]
+            while values and values[-1] is None:
+                values.pop()
+
+            # 空行暂不输出，只有其后还有数据时才补回，从而丢弃末尾空行
+            if not values:
+                pending_empty_rows += 1
+                continue
+            for _ in range(pending_empty_rows):
+                yield []
+            pending_empty_rows = 0
+            yield values
+    finally:
+        workbook.close()
+
+
+def read_data_sheet(input_file: str, sheet_name: str, csv_path: str = None,
+                    as_frame: bool = False) -> tuple:
+    """
+    流式读取数据总表并直接转换为逐条记录的结构
+
+    总表每行是一个字段、每列是一条记录。读取时每一行的值被立即追加到对应记录的
+    值列表中，不再保留整张 Sheet 及其转置副本，峰值内存与输出规模成正比。
+
+    Args:
+        input_file (str): 输入文件路径
+        sheet_name (str): 数据总表 Sheet 名称
+        csv_path (str): 如果指定，读取过程中同步将原始 Sheet 写入该 CSV 文件
+        as_frame (bool): 为 True 时返回转置后的 DataFrame（列式模式），否则返回字典列表
+
+    Returns:
+        tuple: (原始第一列, 记录字典列表或 DataFrame)
+    """
+    rows = iter_sheet_rows(input_file, sheet_name)
+    csv_file = open(csv_path, "w", newline="", encoding="utf-8") if csv_path else None
+    try:
+        writer = csv.writer(csv_file) if csv_file else None
+        title_row = next(rows, None)
+        if title_row is None:
+            return [], (pd.DataFrame() if as_frame else [])
+        if writer:
+            writer.writerow(title_row)
+
+        # 首行首列为序号列标题，其余每个单元格对应一条记录
+        fields = []
+        record_values = [[] for _ in range(len(title_row) - 1)]
+        for row in rows:
+            if writer:
+                writer.writerow(row)
+            fields.append(row[0] if row else None)
+            values = row[1:]
+
+            # 数据行比标题行更宽时，为新出现的记录补齐此前字段的空值
+            while len(record_values) < len(values):
+                record_values.append([None] * (len(fields) - 1))
+            for record_id, record in enumerate(record_values):
+                record.append(values[record_id] if record_id < len(values) else None)
+    finally:
+        if csv_file:
+            csv_file.close()
+
+    if as_frame:
+        # 保持 object 类型，避免含空值的整数列被转换为浮点数
+        data_frame = pd.DataFrame(record_values, columns=range(len(fields)), dtype=object)
+        data_frame.columns = fields
+        return fields, data_frame
+
+    # 逐条转换为字典并立即释放对应的值列表，避免同时持有两份完整数据
+    for record_id, values in enumerate(record_values):
+        record_values[record_id] = dict(zip(fields, values))
+    return fields, record_values
\ No newline at end of file
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import datetime
+import hashlib
+import json
+import logging
+import numbers
+import os
+import posixpath
+import shutil
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+
+# 缓存格式版本，格式变化时递增以使旧缓存失效
+CACHE_VERSION = 1
+
+# 单元格类型编码
+KIND_NONE, KIND_INT, KIND_FLOAT, KIND_STR, KIND_BOOL, KIND_TIMESTAMP = range(6)
+
+_INDEX_FILE = "index.json"
+_TABLE_FILE = "table.npz"
+_CSV_FILE = "总表.csv"
+_META_FILE = "meta.json"
+# 索引中最多记录的源文件哈希数，超出时删除最早写入的记录
+MAX_INDEX_ENTRIES = 256
+
+# XLSX 包内 XML 命名空间
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+# 除 Sheet 本身外，单元格取值还依赖共享字符串与样式（数字格式决定日期解析）
+_SHARED_PARTS = ("xl/sharedStrings.xml", "xl/styles.xml")
+
+
+class UnsupportedValueError(Exception):
+    """单元格值类型无法写入缓存"""
+
+
+def _update_digest(digest, stream) -> None:
+    for block in iter(lambda: stream.read(1024 * 1024), b""):
+        digest.update(block)
+
+
+def _sheet_part(archive: zipfile.ZipFile, sheet_name: str):
+    """在 XLSX 包中查找 Sheet 对应的 XML 部件路径，找不到时返回 None"""
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    rel_id = None
+    for sheet in workbook.iter(f"{{{_MAIN_NS}}}sheet"):
+        if sheet.get("name") == sheet_name:
+            rel_id = sheet.get(f"{{{_REL_NS}}}id")
+            break
+    if rel_id is None:
+        return None
+
+    relationships = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for relationship in relationships.iter(f"{{{_PKG_REL_NS}}}Relationship"):
+        if relationship.get("Id") == rel_id:
+            target = relationship.get("Target")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+    return None
+
+
+def sheet_digest(input_file: str, sheet_name: str) -> str:
+    """
+    计算单个 Sheet 的内容哈希
+
+    只对该 Sheet 的 XML 部件及其依赖的共享字符串、样式部件求哈希，
+    修改工作簿中的其他 Sheet（如筛选条件）通常不会改变结果。
+    无法按 XLSX 结构定位该 Sheet 时退化为整个文件的哈希。
+
+    Args:
+        input_file: 工作簿路径
+        sheet_name: Sheet 名称
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    digest = hashlib.sha256()
+    try:
+        with zipfile.ZipFile(input_file) as archive:
+            part = _sheet_part(archive, sheet_name)
+            if part is not None:
+                names = set(archive.namelist())
+                for name in (part, *_SHARED_PARTS):
+                    if name in names:
+                        digest.update(name.encode("utf-8"))
+                        with archive.open(name) as stream:
+                            _update_digest(digest, stream)
+                return digest.hexdigest()
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        pass
+
+    digest = hashlib.sha256()
+    with open(input_file, "rb") as f:
+        _update_digest(digest, f)
+    return digest.hexdigest()
+
+
+def encode_values(values: list, prefix: str) -> dict:
+    """
+    将单元格值序列编码为不依赖 pickle 的 NumPy 数组
+
+    每个值的类型记录在 kinds 中，整数、浮点数、字符串分别顺序存放在各自的数组里，
+    字符串以 UTF-8 字节拼接并记录偏移量。
+
+    Args:
+        values: 单元格值序列
+        prefix: 数组名前缀
+
+    Returns:
+        dict: 数组名 -> np.ndarray
+
+    Raises:
+        UnsupportedValueError: 如果存在无法编码的值类型
+    """
+    kinds = np.empty(len(values), dtype=np.uint8)
+    ints, floats, strings = [], [], []
+    for position, value in enumerate(values):
+        if value is None:
+            kinds[position] = KIND_NONE
+        elif isinstance(value, (bool, np.bool_)):
+            kinds[position] = KIND_BOOL
+            ints.append(int(value))
+        elif isinstance(value, numbers.Integral):
+            kinds[position] = KIND_INT
+            ints.append(int(value))
+        elif isinstance(value, numbers.Real):
+            kinds[position] = KIND_FLOAT
+            floats.append(float(value))
+        elif isinstance(value, str):
+            kinds[position] = KIND_STR
+            strings.append(value)
+        elif isinstance(value, datetime.datetime):
+            kinds[position] = KIND_TIMESTAMP
+            strings.append(value.isoformat())
+        else:
+            raise UnsupportedValueError(f"不支持缓存的单元格类型: {type(value).__name__}")
+
+    try:
+        int_array = np.asarray(ints, dtype=np.int64)
+    except OverflowError as e:
+        raise UnsupportedValueError("整数超出 int64 范围") from e
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return {
+        f"{prefix}_kinds": kinds,
+        f"{prefix}_ints": int_array,
+        f"{prefix}_floats": np.asarray(floats, dtype=np.float64),
+        f"{prefix}_str_bytes": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        f"{prefix}_str_offsets": offsets,
+    }
+
+
+def decode_values(arrays, prefix: str) -> list:
+    """
+    还原 encode_values 编码的单元格值序列
+
+    Args:
+        arrays: 数组名 -> np.ndarray（可以是 np.load 返回的对象）
+        prefix: 数组名前缀
+
+    Returns:
+        list: 单元格值
+    """
+    ints = iter(arrays[f"{prefix}_ints"].tolist())
+    floats = iter(arrays[f"{prefix}_floats"].tolist())
+    str_bytes = arrays[f"{prefix}_str_bytes"].tobytes()
+    offsets = arrays[f"{prefix}_str_offsets"].tolist()
+    strings = iter(str_bytes[offsets[i]:offsets[i + 1]].decode("utf-8")
+                   for i in range(len(offsets) - 1))
+
+    values = []
+    for kind in arrays[f"{prefix}_kinds"].tolist():
+        if kind == KIND_NONE:
+            values.append(None)
+        elif kind == KIND_INT:
+            values.append(next(ints))
+        elif kind == KIND_FLOAT:
+            values.append(next(floats))
+        elif kind == KIND_STR:
+            values.append(next(strings))
+        elif kind == KIND_BOOL:
+            values.append(bool(next(ints)))
+        else:
+            values.append(pd.Timestamp(next(strings)))
+    return values
+
+
+class TableCache:
+    """
+    解析后数据总表的磁盘缓存
+
+    缓存键由数据总表 Sheet 的内容哈希、读取方式与缓存格式版本共同决定，只修改筛选条件时
+    仍可命中；源文件的修改时间与大小记录在索引中，未变化时无需重新计算哈希。每个缓存项包含转置后的数据表
+    （NumPy .npz，不使用 pickle）与原始总表 CSV。同一源文件（及 Sheet、读取方式）写入新缓存项时删除其旧版本，
+    总大小或缓存项数超过上限时按最近使用时间淘汰。
+    """
+
+    def __init__(self, directory: str, max_size_mb: float = 1024, logger=None, max_entries: int = 16):
+        """
+        初始化缓存
+
+        Args:
+            directory: 缓存目录
+            max_size_mb: 缓存总大小上限（MB）
+            logger: 日志记录器
+            max_entries: 缓存项数上限
+        """
+        self.directory = directory
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_entries = max(int(max_entries), 1)
+        self.logger = logger or logging.getLogger(__name__)
+        # 缓存键 -> 来源（源文件、Sheet 与读取方式），写入时据此删除同一来源的旧缓存项
+        self._sources = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _read_index(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, _INDEX_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index: dict) -> None:
+        path = os.path.join(self.directory, _INDEX_FILE)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def sheet_digest(self, input_file: str, sheet_name: str) -> str:
+        """
+        获取 Sheet 的内容哈希
+
+        源文件的修改时间与大小未变化时直接使用索引中记录的哈希，无需重新读取文件。
+
+        Args:
+            input_file: 源文件路径
+            sheet_name: Sheet 名称
+
+        Returns:
+            str: 十六进制哈希值
+        """
+        path = os.path.realpath(input_file)
+        stat = os.stat(path)
+        index = self._read_index()
+        index_key = f"{path}|{sheet_name}"
+        entry = index.get(index_key)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["digest"]
+
+        digest = sheet_digest(path, sheet_name)
+        # 重新插入使记录按写入先后排列；源文件已不存在的记录与超出数量的最早记录一并删除
+        index.pop(index_key, None)
+        index = {name: item for name, item in index.items() if os.path.exists(item.get("path", path))}
+        index[index_key] = {"path": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "digest": digest}
+        self._write_index(dict(list(index.items())[-MAX_INDEX_ENTRIES:]))
+        return digest
+
+    def key_for(self, input_file: str, sheet_name: str, *parts) -> str:
+        """
+        计算缓存键
+
+        Args:
+            input_file: 源文件路径
+            sheet_name: 数据总表 Sheet 名称
+            *parts: 影响解析结果的其他参数（如读取方式）
+
+        Returns:
+            str: 缓存键
+        """
+        digest = self.sheet_digest(input_file, sheet_name)
+        key_source = ":".join([digest, sheet_name, *map(str, parts), str(CACHE_VERSION)])
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:32]
+        self._sources[key] = "|".join([os.path.realpath(input_file), sheet_name, *map(str, parts)])
+        return key
+
+    def load(self, key: str):
+        """
+        读取缓存项
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            tuple | None: (原始第一列, 字段列表, 各字段的值列表)，未命中时返回 None
+        """
+        entry_dir = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(entry_dir, _META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with np.load(os.path.join(entry_dir, _TABLE_FILE), allow_pickle=False) as arrays:
+                header_column = decode_values(arrays, "header")
+                fields = decode_values(arrays, "fields")
+                cells = decode_values(arrays, "cells")
+        except (OSError, ValueError, KeyError, StopIteration) as e:
+            if os.path.isdir(entry_dir):
+                self.logger.warning(f"缓存项 {key} 无法读取，将重新解析: {e}")
+            return None
+
+        # 记录访问时间，用于按最近使用时间淘汰
+        os.utime(os.path.join(entry_dir, _META_FILE))
+        record_count = meta["records"]
+        columns = [cells[start:start + record_count]
+                   for start in range(0, len(fields) * record_count, record_count)]
+        return header_column, fields, columns
+
+    def store(self, key: str, header_column: list, fields: list, columns: list,
+              csv_path: str = None, source: str = None) -> bool:
+        """
+        写入缓存项并按需淘汰旧缓存
+
+        Args:
+            key: 缓存键
+            header_column: 原始第一列
+            fields: 字段列表
+            columns: 各字段的值列表，长度均为记录数
+            csv_path: 原始总表 CSV，命中时直接复制到输出目录
+            source: 源文件路径（仅记录在元数据中）
+
+        Returns:
+            bool: 是否写入成功
+        """
+        record_count = len(columns[0]) if columns else 0
+        try:
+            arrays = {}
+            arrays.update(encode_values(header_column, "header"))
+            arrays.update(encode_values(fields, "fields"))
+            arrays.update(encode_values([v for column in columns for v in column], "cells"))
+        except UnsupportedValueError as e:
+            self.logger.info(f"数据总表包含无法缓存的值，跳过缓存: {e}")
+            return False
+
+        # 先写入临时目录再整体重命名，读取方不会看到写了一半的缓存项
+        entry_dir = os.path.join(self.directory, key)
+        temp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        os.makedirs(temp_dir)
+        try:
+            np.savez(os.path.join(temp_dir, _TABLE_FILE), **arrays)
+            if csv_path and os.path.exists(csv_path):
+                shutil.copyfile(csv_path, os.path.join(temp_dir, _CSV_FILE))
+            with open(os.path.join(temp_dir, _META_FILE), "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "source": source, "origin": self._sources.get(key),
+                           "records": record_count, "fields": len(fields), "created": time.time()},
+                          f, ensure_ascii=False)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(temp_dir, entry_dir)
+        except OSError as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            self.logger.warning(f"写入缓存失败: {e}")
+            return False
+
+        self._remove_superseded(key)
+        self.evict()
+        return True
+
+    def _remove_superseded(self, key: str) -> None:
+        """删除与新缓存项来源相同的旧缓存项：源文件内容变化后旧版本不会再命中"""
+        origin = self._sources.get(key)
+        if origin is None:
+            return
+        for name in os.listdir(self.directory):
+            entry_dir = os.path.join(self.directory, name)
+            if name == key or not os.path.isdir(entry_dir):
+                continue
+            try:
+                with open(os.path.join(entry_dir, _META_FILE), "r", encoding="utf-8") as f:
+                    if json.load(f).get("origin") != origin:
+                        continue
+            except (OSError, ValueError, AttributeError):
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            self.logger.info(f"已删除源文件的旧缓存项: {name}")
+
+    def restore_csv(self, key: str, output_path: str) -> bool:
+        """将缓存的原始总表 CSV 复制到输出目录，缓存中没有时返回 False"""
+        csv_path = os.path.join(self.directory, key, _CSV_FILE)
+        if not os.path.exists(csv_path):
+            return False
+        shutil.copyfile(csv_path, output_path)
+        return True
+
+    def _entries(self) -> list:
+        """所有缓存项：[(最近访问时间, 大小, 路径), ...]"""
+        entries = []
+        for name in os.listdir(self.directory):
+            entry_dir = os.path.join(self.directory, name)
+            meta_path = os.path.join(entry_dir, _META_FILE)
+            if not os.path.isdir(entry_dir) or not os.path.exists(meta_path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file())
+            entries.append((os.path.getmtime(meta_path), size, entry_dir))
+        return entries
+
+    def evict(self) -> None:
+        """总大小或缓存项数超过上限时，按最近使用时间从旧到新删除缓存项"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        # 至少保留最新的一项，即使它本身超过上限
+        for _, size, entry_dir in entries[:-1]:
+            if total <= self.max_size_bytes and count <= self.max_entries:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            count -= 1
+            self.logger.info(f"已淘汰缓存项: {os.path.basename(entry_dir)}")
\ No newline at end of file
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+常驻筛选服务（本地 HTTP）
+
+工作簿只解析一次（沿用 extract_data / extract_filters），数据总表、匹配键与筛选引擎常驻
+内存；分析人员通过本地 HTTP 接口提交筛选条件，无需每次启动解释器、导入 pandas 并解析
+XLSX。工作簿的修改时间或大小变化时自动重新加载。
+
+接口（请求与响应均为 JSON）:
+    GET  /status   已加载的工作簿、记录数、字段与加载时间
+    POST /filter   {"filters": [{"年份": "2024", "品类": "A|B"}, ...], "limit": 10, "write": false}
+                   filters 省略时使用工作簿中的总表筛选（谓词写法如 A|B 需启用 filter.predicates）；
+                   limit 为每个条件返回的记录数上限；
+                   write 为 true 时将各条件的结果写入输出根目录下本次请求的子目录
+    POST /reload   立即重新加载工作簿
+
+用法（在 src 目录下执行）:
+    python service.py ../templates/全维度筛选.xlsx --port 8765
+    curl -s localhost:8765/filter -d '{"filters": [{"年份": "2024"}], "limit": 5}'
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from modules.config import Config
+from modules.predicates import enable_predicates
+
+# 项目根目录（数据总表缓存与默认输出目录位于其下）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
+
+# 请求体大小上限（字节）
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+logger = logging.getLogger("service")
+
+
+def _json_value(value):
+    """将单元格值转换为可序列化为 JSON 的值：空值（NaN、NaT）为 null，NumPy 标量转为 Python 值"""
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return None if value != value else value
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return None if value != value else value.isoformat()
+    item = getattr(value, "item", None)
+    if callable(item):
+        return _json_value(item())
+    return str(value)
+
+
+def _validate_filters(filters) -> list:
+    """
+    检查请求中的筛选条件
+
+    Raises:
+        ValueError: 如果不是以字段名为键的对象列表
+    """
+    if not isinstance(filters, list) or not all(isinstance(item, dict) for item in filters):
+        raise ValueError("filters 应为筛选条件对象的列表，如 [{\"年份\": \"2024\"}]")
+    if not filters:
+        raise ValueError("filters 不能为空")
+    return [{str(field): value for field, value in item.items()} for item in filters]
+
+
+class FilterService:
+    """
+    常驻内存的筛选服务
+
+    保存已加载的数据管理器与筛选引擎（选择函数），多次请求之间复用倒排表、匹配键等
+    已计算的结构。每次请求前检查工作簿的修改时间与大小，发生变化时重新加载；重新加载
+    失败（如文件正在保存）时继续使用上次加载的数据，下次请求再重试。请求与重新加载
+    串行执行。
+    """
+
+    def __init__(self, input_file: str, config: Config, output_root: str):
+        """
+        初始化服务（调用 load 后才可处理请求）
+
+        Args:
+            input_file: 工作簿路径
+            config: 配置
+            output_root: 输出根目录，总表.csv 与各请求写出的结果保存在其下
+        """
+        self.input_file = os.path.abspath(input_file)
+        self.config = config
+        self.output_root = output_root
+        self.data_mgr = None
+        self.selector = None
+        self.signature = None
+        self.loaded_at = None
+        self.reloads = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _file_signature(self) -> tuple:
+        stat = os.stat(self.input_file)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> None:
+        from modules.data_manager import DataManager
+        from modules.data_extractor import extract_data, extract_filters
+        from modules.filter_processor import _create_selector
+
+        signature = self._file_signature()
+        started = time.perf_counter()
+        data_mgr = DataManager(self.config)
+        data_mgr.set_output_dir(PROJECT_ROOT, os.path.join(self.output_root, "workbook"))
+        extract_data(self.input_file, data_mgr)
+        extract_filters(self.input_file, data_mgr)
+        selector = _create_selector(data_mgr)
+
+        if self.data_mgr is not None:
+            self.reloads += 1
+        self.data_mgr, self.selector, self.signature = data_mgr, selector, signature
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        logger.info(f"已加载工作簿 {self.input_file}：{data_mgr.record_count()} 条记录，"
+                    f"{len(data_mgr.filter_store)} 个筛选条件，耗时 {time.perf_counter() - started:.3f}s")
+
+    def load(self) -> None:
+        """
+        加载（或重新加载）工作簿
+
+        Raises:
+            FileNotFoundError: 如果工作簿不存在
+            ValueError: 如果工作簿缺少必要的 Sheet 或数据无效
+        """
+        with self._lock:
+            self._load()
+
+    def _ensure_fresh(self) -> None:
+        """工作簿的修改时间或大小变化时重新加载（调用方持有锁）"""
+        try:
+            if self._file_signature() == self.signature:
+                return
+            logger.info(f"工作簿已修改，重新加载: {self.input_file}")
+            self._load()
+        except Exception as e:
+            if self.data_mgr is None:
+                raise
+            logger.error(f"重新加载工作簿失败，继续使用上次加载的数据: {str(e)}")
+
+    def refresh(self) -> None:
+        """检查工作簿是否已修改（后台轮询调用）"""
+        with self._lock:
+            self._ensure_fresh()
+
+    def status(self) -> dict:
+        """服务状态"""
+        with self._lock:
+            self._ensure_fresh()
+            data_mgr = self.data_mgr
+            return {
+                "input_file": self.input_file,
+                "loaded_at": self.loaded_at,
+                "reloads": self.reloads,
+                "requests": self.requests,
+                "engine": self.config.get('filter', 'engine', 'index'),
+                "records": data_mgr.record_count(),
+                "fields": [str(field) for field in data_mgr.data_fields()],
+                "conditions": len(data_mgr.filter_store),
+            }
+
+    def run(self, filters=None, limit: int = None, write: bool = False) -> dict:
+        """
+        执行一组筛选条件
+
+        Args:
+            filters: 筛选条件列表，为 None 时使用工作簿中的总表筛选
+            limit: 每个条件返回的记录数上限，为 None 时使用 service.max_records
+            write: 是否将各条件的结果写入本次请求的输出子目录
+
+        Returns:
+            dict: 每个条件的匹配行数与前 limit 条记录，以及耗时与输出目录
+
+        Raises:
+            ValueError: 如果筛选条件无效（如正则表达式错误）
+        """
+        from modules.filter_processor import _create_planner, _save_filtered_data_to_csv
+        from modules.result_writer import result_suffix
+
+        limit = self.config.get('service', 'max_records', 100) if limit is None else int(limit)
+        with self._lock:
+            self._ensure_fresh()
+            data_mgr = self.data_mgr
+            if filters is None:
+                filters = data_mgr.filter_store
+            else:
+                filters = enable_predicates(_validate_filters(filters),
+                                            self.config.get('filter', 'predicates', False))
+            self.requests += 1
+            started = time.perf_counter()
+
+            fields = set(data_mgr.data_fields())
+            unknown = sorted({str(field) for item in filters for field in item if field not in fields})
+            planner = _create_planner(data_mgr, filters, self.selector)
+            results = [planner.select(idx) for idx in range(len(filters))]
+            filter_seconds = time.perf_counter() - started
+
+            output_dir = None
+            if write:
+                suffix = result_suffix(self.config.get('output', 'format', 'csv'))
+                if suffix is None:
+                    raise ValueError("服务模式只支持写出 CSV 格式的结果（output.format: csv、csv.gz 或 csv.zst）")
+                output_dir = os.path.join(self.output_root, "requests",
+                                          datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f"))
+                os.makedirs(output_dir, exist_ok=True)
+                for idx, (filter_item, record_ids) in enumerate(zip(filters, results)):
+                    condition_name = f"条件_{idx + 1}"
+                    _save_filtered_data_to_csv(record_ids, filter_item, condition_name,
+                                               os.path.join(output_dir, f"{condition_name}{suffix}"), data_mgr)
+
+            conditions = []
+            for idx, (filter_item, record_ids) in enumerate(zip(filters, results)):
+                records = data_mgr.get_records(record_ids[:limit]) if limit > 0 else []
+                conditions.append({
+                    "name": f"条件_{idx + 1}",
+                    "filter": {str(field): _json_value(value) for field, value in filter_item.items()},
+                    "rows": len(record_ids),
+                    "records": [{str(field): _json_value(value) for field, value in record.items()}
+                                for record in records],
+                })
+
+        seconds = time.perf_counter() - started
+        logger.info(f"处理请求：{len(filters)} 个条件，筛选 {filter_seconds * 1000:.1f}ms，共 {seconds * 1000:.1f}ms")
+        return {
+            "conditions": conditions,
+            "unknown_fields": unknown,
+            "filter_ms": round(filter_seconds * 1000, 3),
+            "total_ms": round(seconds * 1000, 3),
+            "output_dir": output_dir,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP 请求处理：JSON 请求与响应，服务实例保存在 server.service 中"""
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            raise ValueError(f"请求体超过 {MAX_REQUEST_BYTES} 字节")
+        body = self.rfile.read(length) if length else b""
+        try:
+            payload = json.loads(body.decode("utf-8")) if body.strip() else {}
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"请求体不是有效的 JSON: {str(e)}") from e
+        if not isinstance(payload, dict):
+            raise ValueError("请求体应为 JSON 对象")
+        return payload
+
+    def _handle(self, action) -> None:
+        try:
+            self._reply(200, action())
+        except (ValueError, FileNotFoundError) as e:
+            self._reply(400, {"error": str(e)})
+        except Exception as e:
+            logger.error(f"处理请求 {self.path} 时发生错误: {str(e)}", exc_info=True)
+            self._reply(500, {"error": str(e)})
+
+    def do_GET(self):
+        service = self.server.service
+        path = urlparse(self.path).path
+        if path == "/status":
+            self._handle(service.status)
+        else:
+            self._reply(404, {"error": f"未知的接口: {path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        path = urlparse(self.path).path
+        if path == "/filter":
+            def action():
+                payload = self._read_json()
+                return service.run(payload.get("filters"), payload.get("limit"), bool(payload.get("write")))
+            self._handle(action)
+        elif path == "/reload":
+            def action():
+                service.load()
+                return service.status()
+            self._handle(action)
+        else:
+            self._reply(404, {"error": f"未知的接口: {path}"})
+
+    def log_message(self, format, *args):
+        # 访问日志写入日志系统而不是标准错误
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def create_server(service: FilterService, host: str, port: int) -> ThreadingHTTPServer:
+    """
+    创建 HTTP 服务（port 为 0 时由系统分配端口）
+
+    Returns:
+        ThreadingHTTPServer: 调用 serve_forever 开始处理请求
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def watch_workbook(service: FilterService, interval: float, stop: threading.Event) -> threading.Thread:
+    """
+    启动后台线程，每隔 interval 秒检查工作簿是否已修改，修改后提前重新加载
+
+    Returns:
+        threading.Thread: 轮询线程，设置 stop 后退出
+    """
+    def run():
+        while not stop.wait(interval):
+            service.refresh()
+
+    thread = threading.Thread(target=run, name="workbook-watcher", daemon=True)
+    thread.start()
+    return thread
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="常驻筛选服务：工作簿只加载一次，通过本地 HTTP 接口提交筛选条件")
+    parser.add_argument("input", help="输入工作簿")
+    parser.add_argument("--host", help="监听地址（默认只监听本机）")
+    parser.add_argument("--port", type=int, help="监听端口")
+    parser.add_argument("--output-root", help="输出根目录")
+    parser.add_argument("--config", default=CONFIG_PATH, help="配置文件路径")
+    args = parser.parse_args()
+
+    config = Config(args.config)
+    output_root = os.path.abspath(args.output_root or os.path.join(
+        PROJECT_ROOT, config.get('service', 'output_root', 'service_outputs')))
+    os.makedirs(output_root, exist_ok=True)
+
+    logging.basicConfig(
+        level=getattr(logging, config.get('logging', 'level', 'INFO')),
+        format=config.get('logging', 'format'),
+        handlers=[logging.FileHandler(os.path.join(output_root, "service.log"), encoding="utf-8"),
+                  logging.StreamHandler()],
+    )
+
+    service = FilterService(args.input, config, output_root)
+    try:
+        service.load()
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"加载工作簿失败: {str(e)}")
+        return 1
+
+    host = args.host or config.get('service', 'host', '127.0.0.1')
+    port = args.port if args.port is not None else config.get('service', 'port', 8765)
+    server = create_server(service, host, port)
+    stop = threading.Event()
+    poll_seconds = config.get('service', 'poll_seconds', 2)
+    if poll_seconds and poll_seconds > 0:
+        watch_workbook(service, poll_seconds, stop)
+
+    logger.info(f"筛选服务已启动: http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("筛选服务已停止")
+    finally:
+        stop.set()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""测试用的逐条比较参考实现"""
+
+from modules.match_keys import data_match_key
+from modules.predicates import compile_predicate
+
+
+def match_data_item(data_item: dict, filter_item: dict) -> tuple[bool, list]:
+    """
+    逐条比较数据项是否匹配筛选条件，作为各筛选引擎结果的对照
+
+    筛选值编译为谓词，在规范化后的匹配键上判断（见 predicates）；筛选引擎不再逐条比较，
+    不匹配原因由诊断模式统计（见 diagnostics）。
+    
+    Args:
+        data_item: 单个数据项
+        filter_item: 筛选条件
+        
+    Returns:
+        tuple: (是否匹配, 不匹配字段列表)
+    """
+    match = True
+    mismatch_fields = []
+    
+    for field, value in filter_item.items():
+        # 如果筛选条件值为空，视为通配符（匹配任何值）
+        predicate = compile_predicate(value)
+        if predicate is None:
+            continue  # 跳过这个条件，匹配任何值
+        
+        # 获取数据项中的字段值
+        data_value = data_item.get(field)
+        data_key = data_match_key(data_value)
+        
+        # 如果数据项中的字段值为空，但筛选条件值不为空，则不匹配
+        if data_key is None:
+            match = False
+            mismatch_fields.append(f"{field}(期望:{value},实际:空值)")
+            break
+        
+        # 判断匹配键是否满足谓词
+        if not predicate.accepts(data_key):
+            match = False
+            mismatch_fields.append(f"{field}(期望:{value},实际:{data_value})")
+            break
+            
+    return match, mismatch_fields
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import os
+import tempfile
+import unittest
+from modules.aggregator import ConditionAggregator
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules.filter_processor import apply_filters
+
+class TestConditionAggregator(unittest.TestCase):
+    """条件汇总测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config = Config()
+        self.config.set("aggregate", "enabled", True)
+        self.data_mgr = DataManager(self.config)
+        self.data_mgr.set_output_dir(self.temp_dir.name)
+        self.data_mgr.data_store = [
+            {"序号": 1, "品类": "A", "Value1": 10, "Value2": 1.5},
+            {"序号": 2, "品类": "A", "Value1": 20, "Value2": None},
+            {"序号": 3, "品类": "B", "Value1": 20, "Value2": 2.5},
+            {"序号": 4, "品类": "B", "Value1": None, "Value2": 4},
+        ]
+        self.data_mgr.filter_store = [
+            {"品类": "A"},
+            {"品类": ""},
+            {"品类": "C"},
+        ]
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def _read_summary(self):
+        with open(os.path.join(self.data_mgr.output_dir, "条件汇总.csv"), encoding="utf-8-sig") as f:
+            return list(csv.DictReader(f))
+
+    def test_aggregate_values(self):
+        """测试汇总值只计入非空数值，未配置字段时汇总全部数值字段（序号除外）"""
+        aggregator = ConditionAggregator(self.data_mgr)
+        aggregator.open()
+        self.assertEqual(aggregator.fields, ["Value1", "Value2"])
+        row = aggregator.aggregate([0, 1, 2, 3])
+        self.assertEqual(row["记录数"], 4)
+        self.assertEqual((row["Value1_count"], row["Value1_sum"], row["Value1_min"], row["Value1_max"]),
+                         (3, 50, 10, 20))
+        self.assertEqual((row["Value1_mean"], row["Value1_distinct"]), (16.666667, 2))
+        self.assertEqual((row["Value2_sum"], row["Value2_mean"]), (8, 2.666667))
+        empty = aggregator.aggregate([])
+        self.assertEqual((empty["记录数"], empty["Value1_sum"], empty["Value1_min"], empty["Value1_mean"]),
+                         (0, 0, None, None))
+
+    def test_configured_fields_and_functions(self):
+        """测试按配置的字段与函数汇总，不支持的函数报错"""
+        self.config.set("aggregate", "fields", ["品类", "Value1"])
+        self.config.set("aggregate", "functions", ["count", "distinct"])
+        aggregator = ConditionAggregator(self.data_mgr)
+        aggregator.open()
+        self.assertEqual(aggregator.aggregate([0, 2, 3]),
+                         {"记录数": 3, "品类_count": 0, "品类_distinct": 2,
+                          "Value1_count": 2, "Value1_distinct": 2})
+
+        self.config.set("aggregate", "functions", ["median"])
+        with self.assertRaises(ValueError):
+            ConditionAggregator(self.data_mgr)
+
+    def test_summary_without_full_rows(self):
+        """测试关闭完整记录输出时只写出汇总 CSV，筛选结果不变"""
+        self.config.set("aggregate", "full_rows", False)
+        apply_filters(self.data_mgr)
+
+        self.assertEqual(self.data_mgr.filtered_data["条件_1"].tolist(), [0, 1])
+        self.assertFalse([name for name in os.listdir(self.data_mgr.output_dir) if name.startswith("条件_")])
+        summary = self._read_summary()
+        self.assertEqual([row["条件"] for row in summary], ["条件_1", "条件_2", "条件_3"])
+        self.assertEqual([row["Value1_sum"] for row in summary], ["30", "50", "0"])
+        self.assertEqual(summary[2]["Value1_max"], "")
+        self.assertEqual(self.data_mgr.condition_summary[0]["筛选条件"], "品类=A")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import os
+import tempfile
+import unittest
+from unittest import mock
+from modules.config import Config
+from batch import assign_output_dirs, expand_inputs, run_batch, OutputRotation, WORKBOOK_LOG_FILE
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+
+def _exit_worker(input_file, output_dir):
+    """模拟工作进程异常退出"""
+    os._exit(1)
+
+class TestBatch(unittest.TestCase):
+    """批量处理测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+    
+    def test_expand_inputs(self):
+        """测试通配符展开并按出现顺序去重"""
+        pattern = os.path.join(TEMPLATE_DIR, "*.xlsx")
+        self.assertEqual(expand_inputs([pattern, TEMPLATES[0]]), TEMPLATES)
+        self.assertEqual(expand_inputs(["missing.xlsx"]), ["missing.xlsx"])
+    
+    def test_assign_output_dirs(self):
+        """测试同名工作簿分配不同的输出子目录"""
+        output_dirs = assign_output_dirs(["a/数据.xlsx", "b/数据.xlsx", "c/其他.xlsx"], "out")
+        self.assertEqual(output_dirs, [os.path.join("out", "数据"), os.path.join("out", "数据_2"),
+                                       os.path.join("out", "其他")])
+    
+    def test_run_batch(self):
+        """测试每个工作簿使用独立的输出子目录与日志，失败的文件记录在汇总中"""
+        broken = os.path.join(self.temp_dir.name, "broken.xlsx")
+        with open(broken, "w", encoding="utf-8") as f:
+            f.write("不是工作簿")
+        input_files = TEMPLATES + [broken]
+        
+        config = Config()
+        config.set("cache", "enabled", False)
+        output_root = os.path.join(self.temp_dir.name, "outputs")
+        summary = run_batch(input_files, config, output_root, workers=2)
+        
+        self.assertEqual(summary["succeeded"], len(TEMPLATES))
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual([result["input_file"] for result in summary["files"]], input_files)
+        for result in summary["files"][:-1]:
+            self.assertEqual(result["status"], "success")
+            self.assertTrue(os.path.exists(result["output_path"]))
+            self.assertTrue(os.path.exists(os.path.join(result["output_dir"], WORKBOOK_LOG_FILE)))
+            self.assertEqual(len(glob.glob(os.path.join(result["output_dir"], "条件_*.csv"))),
+                             result["conditions"])
+        self.assertEqual(summary["files"][-1]["status"], "failed")
+    
+    def test_worker_errors_recorded(self):
+        """测试准备输出目录失败或工作进程异常退出时，文件记为失败，汇总报告照常生成"""
+        config = Config()
+        config.set("cache", "enabled", False)
+        output_root = os.path.join(self.temp_dir.name, "outputs")
+        with mock.patch.object(OutputRotation, "stage", side_effect=OSError("磁盘已满")):
+            summary = run_batch(TEMPLATES[:1], config, output_root, workers=1)
+        self.assertEqual((summary["succeeded"], summary["failed"]), (0, 1))
+        self.assertEqual(summary["files"][0]["error"], "磁盘已满")
+        
+        with mock.patch("batch._process_one", _exit_worker):
+            summary = run_batch(TEMPLATES, config, output_root, workers=2)
+        self.assertEqual(summary["failed"], len(TEMPLATES))
+        self.assertEqual([result["input_file"] for result in summary["files"]], TEMPLATES)
+        self.assertTrue(all(result["status"] == "failed" for result in summary["files"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import copy
+import os
+import tempfile
+import unittest
+from benchmarks.bench_pipeline import (REPORT_VERSION, STAGES, compare_with_baseline,
+                                       parse_overrides, run_pipeline)
+from benchmarks.synthetic import generate_workbook
+
+class TestPipelineBenchmark(unittest.TestCase):
+    """流程基准测试类：各阶段均被计时，基线比较能识别退化"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+    
+    def _report(self, seconds=1.0, rss=100.0):
+        """构造只包含单个规模的基准报告"""
+        stage = {"seconds": seconds, "cpu_seconds": seconds, "peak_rss_mb": rss}
+        return {"version": REPORT_VERSION, "overrides": {}, "results": {"small": {
+            "params": {"records": 10}, "stages": {name: dict(stage) for name in STAGES}}}}
+    
+    def test_run_pipeline(self):
+        """测试在合成工作簿上执行完整流程并记录每个阶段"""
+        input_file = generate_workbook(os.path.join(self.temp_dir.name, "bench.xlsx"),
+                                       records=30, fields=5, conditions=4)
+        result = run_pipeline(input_file, {"filter.engine": "scan"})
+        
+        self.assertEqual(result["records"], 30)
+        self.assertEqual(result["conditions"], 4)
+        self.assertEqual(list(result["stages"]), list(STAGES))
+        for metrics in result["stages"].values():
+            self.assertGreaterEqual(metrics["seconds"], 0)
+    
+    def test_compare_with_baseline(self):
+        """测试超过容差的耗时与内存增长被判定为退化，低于噪声下限的耗时增量不计"""
+        baseline = self._report()
+        self.assertEqual(compare_with_baseline(self._report(1.1, 110), baseline), [])
+        self.assertEqual(compare_with_baseline(self._report(0.05, 100), self._report(0.01, 100)), [])
+        
+        slower = self._report(2.0, 100)
+        self.assertEqual(len(compare_with_baseline(slower, baseline)), len(STAGES))
+        
+        # 配置覆盖不同的结果不可比较
+        other = copy.deepcopy(slower)
+        other["overrides"] = {"filter.engine": "scan"}
+        self.assertEqual(compare_with_baseline(other, baseline), [])
+        
+        # 旧格式的基线不可比较
+        older = copy.deepcopy(baseline)
+        older["version"] = REPORT_VERSION - 1
+        self.assertEqual(compare_with_baseline(slower, older), [])
+    
+    def test_parse_overrides(self):
+        """测试 --set 参数按 YAML 解析取值"""
+        self.assertEqual(parse_overrides(["parallel.workers=4", "filter.engine=scan"]),
+                         {"parallel.workers": 4, "filter.engine": "scan"})
+        with self.assertRaises(ValueError):
+            parse_overrides(["workers"])
+
+if __name__ == "__main__":
+    unittest.main()
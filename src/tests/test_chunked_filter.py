@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import gzip
+import os
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+import pandas as pd
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules.data_extractor import extract_data, extract_filters
+from modules.filter_processor import apply_filters
+from modules.chunked_filter import apply_filters_chunked
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+class TestChunkedFilter(unittest.TestCase):
+    """分块筛选测试类：逐块写出的条件结果与一次性筛选完全一致"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # 模板文件缺少默认样式，openpyxl 会给出无关的警告
+        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def _data_mgr(self, input_file, name, engine):
+        """创建数据管理器并提取筛选条件，追加一个没有匹配记录的条件"""
+        config = Config()
+        config.set("cache", "enabled", False)
+        config.set("filter", "engine", engine)
+        config.set("chunked", "block_size", 7)
+        config.set("chunked", "progress", False)
+        data_mgr = DataManager(config)
+        data_mgr.set_output_dir(self.temp_dir.name, os.path.join(self.temp_dir.name, name))
+        extract_filters(input_file, data_mgr)
+        field = next(iter(data_mgr.filter_store[0]))
+        data_mgr.filter_store.append(dict.fromkeys(data_mgr.filter_store[0], '') | {field: "不存在的值"})
+        return data_mgr
+
+    def _read_outputs(self, data_mgr):
+        outputs = {}
+        for path in sorted(glob.glob(os.path.join(data_mgr.output_dir, "条件_*.csv"))):
+            with open(path, "rb") as f:
+                outputs[os.path.basename(path)] = f.read()
+        return outputs
+
+    def test_matches_in_memory_filtering(self):
+        """测试各引擎分块筛选写出的 CSV 与一次性筛选逐字节一致"""
+        for input_file in TEMPLATES:
+            for engine in ("scan", "index", "vectorized"):
+                with self.subTest(template=os.path.basename(input_file), engine=engine):
+                    expected = self._data_mgr(input_file, f"full_{engine}", engine)
+                    extract_data(input_file, expected)
+                    apply_filters(expected)
+
+                    chunked = self._data_mgr(input_file, f"chunked_{engine}", engine)
+                    summary = apply_filters_chunked(input_file, chunked)
+
+                    self.assertEqual(summary["records"], expected.record_count())
+                    self.assertEqual(summary["blocks"], -(-expected.record_count() // 7))
+                    self.assertEqual(summary["matched"],
+                                     {name: len(ids) for name, ids in expected.filtered_data.items()})
+                    self.assertEqual(self._read_outputs(chunked), self._read_outputs(expected))
+
+    def test_data_sheet_not_parsed(self):
+        """测试分块模式提取筛选条件时不解析、不保留数据总表"""
+        data_mgr = self._data_mgr(TEMPLATES[0], "sheets", "index")
+        data_mgr.config.set("chunked", "enabled", True)
+        data_mgr.source_file = None
+        parse = pd.ExcelFile.parse
+        with mock.patch.object(pd.ExcelFile, "parse", autospec=True, side_effect=parse) as parsed:
+            extract_filters(TEMPLATES[0], data_mgr)
+        data_sheet = data_mgr.config.get("sheets", "data_sheet")
+        self.assertNotIn(data_sheet, [call.args[1] for call in parsed.call_args_list])
+        self.assertNotIn(data_sheet, data_mgr.sheets)
+        self.assertFalse(data_mgr.has_data())
+
+    def test_aggregate_not_supported(self):
+        """测试分块模式启用条件汇总时给出警告，仍输出各条件的完整记录"""
+        data_mgr = self._data_mgr(TEMPLATES[0], "aggregate", "index")
+        data_mgr.config.set("aggregate", "enabled", True)
+        data_mgr.config.set("aggregate", "full_rows", False)
+        with self.assertLogs(data_mgr.logger, level="WARNING") as logs:
+            apply_filters_chunked(TEMPLATES[0], data_mgr)
+        self.assertTrue(any("条件汇总" in line for line in logs.output))
+        self.assertEqual(len(self._read_outputs(data_mgr)), len(data_mgr.filter_store))
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "需要 /proc 统计已打开的文件数")
+    def test_open_files_independent_of_conditions(self):
+        """测试条件数超过打开文件数上限时仍能写出全部结果，压缩格式与 CSV 内容一致"""
+        import resource
+
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        limit = len(os.listdir("/proc/self/fd")) + 32
+        outputs = {}
+        for output_format in ("csv", "csv.gz"):
+            data_mgr = self._data_mgr(TEMPLATES[0], output_format, "index")
+            data_mgr.config.set("output", "format", output_format)
+            data_mgr.filter_store = (data_mgr.filter_store * (limit // len(data_mgr.filter_store) + 2))[:limit + 20]
+            resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+            try:
+                apply_filters_chunked(TEMPLATES[0], data_mgr)
+            finally:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+            paths = glob.glob(os.path.join(data_mgr.output_dir, "条件_*.csv*"))
+            self.assertEqual(len(paths), len(data_mgr.filter_store))
+            outputs[output_format] = {}
+            for path in paths:
+                with (gzip.open if path.endswith(".gz") else open)(path, "rb") as f:
+                    outputs[output_format][os.path.basename(path).split(".")[0]] = f.read()
+        self.assertEqual(outputs["csv.gz"], outputs["csv"])
+
+    def test_rejects_dataset_format(self):
+        """测试分块模式不支持数据集格式的输出"""
+        data_mgr = self._data_mgr(TEMPLATES[0], "dataset", "index")
+        data_mgr.config.set("output", "format", "parquet")
+        with self.assertRaises(ValueError):
+            apply_filters_chunked(TEMPLATES[0], data_mgr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+import numpy as np
+from modules.data_manager import DataManager
+from modules.decision_trie import DecisionTrie
+from modules.predicates import enable_predicates
+from tests.reference import match_data_item
+
+class TestDecisionTrie(unittest.TestCase):
+    """决策树筛选引擎测试类"""
+
+    def setUp(self):
+        """测试前准备：随机生成数据总表与包含各类谓词、通配符的筛选条件"""
+        rng = random.Random(0)
+        self.data_store = [
+            {"年份": rng.choice([2022, 2023, 2024, None]),
+             "品类": rng.choice(["A", "B", "C", ""]),
+             "渠道": rng.choice(["线上", "线下"])}
+            for _ in range(200)
+        ]
+        values = {
+            "年份": ["", "2024", "2023|2024", ">=2023", "2020..2022"],
+            "品类": ["", "A", "B", "A|C", "C*"],
+            "渠道": ["", "线上", "!=线上"],
+        }
+        self.filter_store = enable_predicates([{field: rng.choice(choices) for field, choices in values.items()}
+                                               for _ in range(60)])
+        self.data_mgr = DataManager()
+        self.data_mgr.data_store = self.data_store
+
+    def _scan(self, filter_item, candidates=None):
+        """逐条比较得到的匹配序号，作为对照结果"""
+        record_ids = range(len(self.data_store)) if candidates is None else candidates
+        return [i for i in record_ids if match_data_item(self.data_store[i], filter_item)[0]]
+
+    def test_results_match_scan(self):
+        """测试一次遍历得到的每个条件的结果与逐条比较一致"""
+        trie = DecisionTrie(self.data_mgr)
+        trie.prepare(self.filter_store)
+        for filter_item in self.filter_store:
+            with self.subTest(filter_item=filter_item):
+                self.assertEqual(trie.match(filter_item).tolist(), self._scan(filter_item))
+
+    def test_shared_prefixes(self):
+        """测试相同的谓词前缀只建立一个分支"""
+        trie = DecisionTrie(self.data_mgr)
+        trie.prepare([{"年份": "2024", "品类": "A"}, {"年份": "2024", "品类": "B"}, {"年份": "2024", "品类": ""}])
+        # 根节点、年份=2024、品类=A、品类=B
+        self.assertEqual(trie.stats["nodes"], 4)
+
+    def test_candidates(self):
+        """测试指定候选记录时只在其中查找，未预先编译的条件单独求值"""
+        trie = DecisionTrie(self.data_mgr)
+        trie.prepare(self.filter_store)
+        candidates = np.arange(0, len(self.data_store), 3, dtype=np.uint32)
+        for filter_item in (self.filter_store[0], {"品类": "B", "渠道": "线下"}):
+            self.assertEqual(trie.match(filter_item, candidates).tolist(),
+                             self._scan(filter_item, candidates.tolist()))
+
+if __name__ == '__main__':
+    unittest.main()
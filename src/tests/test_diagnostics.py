@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import tempfile
+import unittest
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules.diagnostics import FilterDiagnostics
+from modules.filter_processor import apply_filters
+
+class TestFilterDiagnostics(unittest.TestCase):
+    """筛选诊断测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config = Config()
+        self.config.set("diagnostics", "enabled", True)
+        self.config.set("diagnostics", "samples", 2)
+        self.data_mgr = DataManager(self.config)
+        self.data_mgr.set_output_dir(self.temp_dir.name)
+        self.data_mgr.data_store = [
+            {"序号": 1, "年份": 2024, "品类": "A"},
+            {"序号": 2, "年份": 2023, "品类": "A"},
+            {"序号": 3, "年份": 2024, "品类": "B"},
+            {"序号": 4, "年份": 2024, "品类": None},
+            {"序号": 5, "年份": 2022, "品类": "B"},
+        ]
+        self.data_mgr.filter_store = [
+            {"年份": "2024", "品类": "A"},
+            {"年份": "", "品类": ""},
+        ]
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def test_mismatches_counted_by_first_failing_field(self):
+        """测试不匹配记录计入第一个不满足的字段，样例说明期望值与实际值"""
+        report = FilterDiagnostics(self.data_mgr).explain(0, [0])
+        self.assertEqual(report["matched"], 1)
+        self.assertEqual(report["mismatched"], 4)
+        self.assertEqual(report["mismatches"], {"年份": 2, "品类": 2})
+        self.assertEqual(report["samples"], ["第 2 条记录 年份(期望:2024,实际:2023)",
+                                             "第 5 条记录 年份(期望:2024,实际:2022)"])
+
+    def test_inconsistent_engine_result(self):
+        """测试满足全部谓词却未被匹配的记录单独计数并输出警告，不误报为某个字段不匹配"""
+        diagnostics = FilterDiagnostics(self.data_mgr)
+        with self.assertLogs(self.data_mgr.logger, level="WARNING") as logs:
+            report = diagnostics.explain(0, [])
+        self.assertEqual((report["mismatched"], report["inconsistent"]), (5, 1))
+        self.assertEqual(report["mismatches"], {"年份": 2, "品类": 2})
+        self.assertEqual(report["samples"][0],
+                         "第 1 条记录 满足全部谓词但未被筛选引擎匹配（筛选引擎结果不一致）")
+        self.assertIn("筛选引擎结果不一致", logs.output[0])
+        self.assertEqual(diagnostics.explain(0, [0])["inconsistent"], 0)
+
+    def test_apply_filters_records_metrics(self):
+        """测试诊断模式不改变筛选结果，不匹配统计写入条件指标"""
+        apply_filters(self.data_mgr)
+        self.assertEqual(self.data_mgr.filtered_data["条件_1"].tolist(), [0])
+        conditions = {condition["name"]: condition for condition in self.data_mgr.metrics.conditions.values()}
+        self.assertEqual(conditions["条件_1"]["mismatches"], {"年份": 2, "品类": 2})
+        self.assertEqual(conditions["条件_2"]["mismatches"], {})
+        self.assertIn("diagnostics_seconds", conditions["条件_1"])
+
+if __name__ == '__main__':
+    unittest.main()
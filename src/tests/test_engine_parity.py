@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import os
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules.data_extractor import extract_data, extract_filters
+from modules.filter_processor import apply_filters
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+class TestEngineParity(unittest.TestCase):
+    """筛选引擎一致性测试类：各引擎在模板文件上的结果应与逐条扫描完全一致"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # 模板文件缺少默认样式，openpyxl 会给出无关的警告
+        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+    
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+    
+    def _run(self, input_file, engine, workers=1):
+        """使用指定引擎执行提取与筛选，返回按记录序号取出的筛选结果"""
+        config = Config()
+        config.set("filter", "engine", engine)
+        config.set("parallel", "workers", workers)
+        data_mgr = DataManager(config)
+        data_mgr.set_output_dir(self.temp_dir.name)
+        extract_data(input_file, data_mgr)
+        extract_filters(input_file, data_mgr)
+        apply_filters(data_mgr)
+        return {name: data_mgr.get_records(record_ids)
+                for name, record_ids in data_mgr.filtered_data.items()}
+    
+    def test_templates_available(self):
+        """测试模板文件存在"""
+        self.assertTrue(TEMPLATES)
+    
+    def test_engines_match_scan(self):
+        """测试 index、vectorized 与 trie 引擎与逐条扫描结果一致"""
+        for input_file in TEMPLATES:
+            expected = self._run(input_file, "scan")
+            for engine in ("index", "vectorized", "trie"):
+                with self.subTest(template=os.path.basename(input_file), engine=engine):
+                    self.assertEqual(self._run(input_file, engine), expected)
+    
+    def test_parallel_matches_sequential(self):
+        """测试并行筛选的结果与输出文件与顺序执行一致"""
+        for input_file in TEMPLATES:
+            expected = self._run(input_file, "scan")
+            for engine in ("scan", "index"):
+                with self.subTest(template=os.path.basename(input_file), engine=engine):
+                    self.assertEqual(self._run(input_file, engine, workers=2), expected)
+                    csv_files = sorted(f for f in os.listdir(os.path.join(self.temp_dir.name, "outputs"))
+                                       if f.startswith("条件_"))
+                    self.assertEqual(csv_files, sorted(f"{name}.csv" for name in expected))
+    
+    def test_parallel_spawn_matches_sequential(self):
+        """测试不支持 fork 的平台（spawn 启动子进程，数据管理器序列化后传给子进程）结果与顺序执行一致"""
+        input_file = TEMPLATES[0]
+        expected = self._run(input_file, "scan")
+        with mock.patch("modules.parallel_filter.multiprocessing.get_all_start_methods",
+                        return_value=["spawn"]):
+            for engine in ("scan", "index"):
+                with self.subTest(engine=engine):
+                    self.assertEqual(self._run(input_file, engine, workers=2), expected)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
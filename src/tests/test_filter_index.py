@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+from modules.filter_index import FilterIndex
+from tests.reference import match_data_item
+
+class TestFilterIndex(unittest.TestCase):
+    """倒排索引筛选引擎测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.data_store = [
+            {"年份": 2024, "品类": "A", "Value1": 100},
+            {"年份": 2024, "品类": "B", "Value1": 200},
+            {"年份": 2025, "品类": "A", "Value1": 300},
+            {"年份": 2025, "品类": "", "Value1": 400},
+            {"年份": np.nan, "品类": "A", "Value1": 500},
+            {"年份": 2024, "品类": "A", "Value1": None},
+        ]
+        self.index = FilterIndex(self.data_store)
+
+    def _scan(self, filter_item):
+        """逐条扫描得到的匹配序号，作为对照结果"""
+        return [i for i, item in enumerate(self.data_store)
+                if match_data_item(item, filter_item)[0]]
+
+    def test_exact_match(self):
+        """测试精确匹配与逐条扫描结果一致"""
+        filter_item = {"年份": "2024", "品类": "A"}
+        self.assertEqual(self.index.match(filter_item).tolist(), self._scan(filter_item))
+        self.assertEqual(self.index.match(filter_item).tolist(), [0, 5])
+
+    def test_wildcard(self):
+        """测试空筛选条件（通配符）"""
+        filter_item = {"年份": "2025", "品类": ""}
+        self.assertEqual(self.index.match(filter_item).tolist(), [2, 3])
+
+    def test_all_wildcard(self):
+        """测试全部为通配符时匹配所有记录"""
+        filter_item = {"年份": "", "品类": ""}
+        self.assertEqual(self.index.match(filter_item).tolist(), self._scan(filter_item))
+
+    def test_empty_data_never_matches(self):
+        """测试数据为空值时不匹配非空筛选值"""
+        for filter_item in ({"品类": "A"}, {"Value1": "None"}, {"年份": "nan"}):
+            self.assertEqual(self.index.match(filter_item).tolist(), self._scan(filter_item))
+
+    def test_unknown_value_and_field(self):
+        """测试不存在的值或字段返回空结果"""
+        self.assertEqual(len(self.index.match({"年份": "1999"})), 0)
+        self.assertEqual(len(self.index.match({"不存在": "A"})), 0)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+from modules.filter_index import FilterIndex
+from modules.filter_planner import FilterPlanner, canonical_key
+from modules.predicates import compile_predicate
+from tests.reference import match_data_item
+
+class TestFilterPlanner(unittest.TestCase):
+    """筛选条件规划器测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.data_store = [
+            {"年份": 2024, "品类": "A", "渠道": "线上"},
+            {"年份": 2024, "品类": "B", "渠道": "线下"},
+            {"年份": 2025, "品类": "A", "渠道": "线上"},
+            {"年份": 2024, "品类": "A", "渠道": "线下"},
+            {"年份": 2024, "品类": "", "渠道": "线上"},
+        ]
+        self.filter_store = [
+            {"年份": "2024", "品类": "A", "渠道": ""},
+            {"年份": "2024", "品类": "", "渠道": ""},
+            {"品类": "A", "年份": "2024", "渠道": ""},
+            {"年份": "2024", "品类": "A", "渠道": "线上"},
+            {"年份": "", "品类": "", "渠道": ""},
+        ]
+        index = FilterIndex(self.data_store)
+        self.calls = []
+        
+        def selector(filter_item, candidates=None):
+            self.calls.append((filter_item, candidates))
+            return index.match(filter_item, candidates)
+        
+        self.selector = selector
+    
+    def _scan(self, filter_item):
+        """逐条扫描得到的匹配序号，作为对照结果"""
+        return [i for i, item in enumerate(self.data_store)
+                if match_data_item(item, filter_item)[0]]
+    
+    def test_canonical_key(self):
+        """测试规范化键与字段顺序、通配符无关"""
+        self.assertEqual(canonical_key(self.filter_store[0]), canonical_key(self.filter_store[2]))
+        self.assertEqual(canonical_key(self.filter_store[4]), ())
+    
+    def test_results_match_scan(self):
+        """测试规划后的结果与逐条扫描一致"""
+        planner = FilterPlanner(self.filter_store, self.selector)
+        for idx, filter_item in enumerate(self.filter_store):
+            self.assertEqual(planner.select(idx).tolist(), self._scan(filter_item))
+    
+    def test_duplicates_evaluated_once(self):
+        """测试重复条件只计算一次"""
+        planner = FilterPlanner(self.filter_store, self.selector)
+        for idx in range(len(self.filter_store)):
+            planner.select(idx)
+        self.assertEqual(planner.stats["evaluated"], 4)
+        # 条件_2 已作为条件_1 的父条件计算过，条件_3 与条件_1 相同，二者都直接复用结果
+        self.assertEqual(planner.stats["shared"], 2)
+    
+    def test_refined_condition_uses_parent(self):
+        """测试更具体的条件只在父条件结果上比较多出的谓词"""
+        planner = FilterPlanner(self.filter_store, self.selector)
+        planner.select(3)
+        filter_item, candidates = self.calls[-1]
+        self.assertEqual(filter_item, {"渠道": compile_predicate("线上")})
+        self.assertEqual(candidates.tolist(), [0, 3])
+    
+    def test_reuse_disabled(self):
+        """测试关闭复用时每个条件独立计算"""
+        planner = FilterPlanner(self.filter_store, self.selector, reuse_results=False)
+        for idx in range(len(self.filter_store)):
+            planner.select(idx)
+        self.assertEqual(planner.stats["evaluated"], len(self.filter_store))
+        self.assertTrue(all(candidates is None for _, candidates in self.calls))
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import tempfile
 import unittest
+from modules.config import Config
 from modules.data_manager import DataManager
-from modules.filter_processor import _match_data_item
+from modules.filter_processor import (_create_selector, _engine_value_counts, _ordered_predicates, _scan_record_ids,
+                                      apply_filters)
+from modules.predicates import enable_predicates
+from tests.reference import match_data_item
 
 class TestFilterProcessor(unittest.TestCase):
     """筛选处理器测试类"""
@@ -13,7 +18,7 @@ class TestFilterProcessor(unittest.TestCase):
         data_item = {"年份": 2024, "品类": "A", "Value1": 100}
         filter_item = {"年份": 2024, "品类": "A"}
         
-        match, _ = _match_data_item(data_item, filter_item)
+        match, _ = match_data_item(data_item, filter_item)
         self.assertTrue(match)
     
     def test_match_data_item_no_match(self):
@@ -21,7 +26,7 @@ class TestFilterProcessor(unittest.TestCase):
         data_item = {"年份": 2024, "品类": "A", "Value1": 100}
         filter_item = {"年份": 2024, "品类": "B"}
         
-        match, mismatch_fields = _match_data_item(data_item, filter_item)
+        match, mismatch_fields = match_data_item(data_item, filter_item)
         self.assertFalse(match)
         self.assertEqual(len(mismatch_fields), 1)
     
@@ -30,7 +35,7 @@ class TestFilterProcessor(unittest.TestCase):
         data_item = {"年份": 2024, "品类": "A", "Value1": 100}
         filter_item = {"年份": 2024, "品类": ""}
         
-        match, _ = _match_data_item(data_item, filter_item)
+        match, _ = match_data_item(data_item, filter_item)
         self.assertTrue(match)
     
     def test_match_data_item_empty_data(self):
@@ -38,9 +43,73 @@ class TestFilterProcessor(unittest.TestCase):
         data_item = {"年份": 2024, "品类": "", "Value1": 100}
         filter_item = {"年份": 2024, "品类": "A"}
         
-        match, mismatch_fields = _match_data_item(data_item, filter_item)
+        match, mismatch_fields = match_data_item(data_item, filter_item)
         self.assertFalse(match)
         self.assertEqual(len(mismatch_fields), 1)
+    
+    def _selectivity_data_mgr(self, config=None):
+        """年份几乎不排除记录、品类排除大部分记录的数据总表"""
+        data_mgr = DataManager(config or Config())
+        data_mgr.data_store = [{"年份": 2024 if i % 10 else 2023, "品类": "A" if i % 5 == 0 else "B"}
+                               for i in range(100)]
+        data_mgr.filter_store = enable_predicates([{"年份": "2024", "品类": "A"}, {"年份": "", "品类": "B|C"}])
+        return data_mgr
+    
+    def test_predicates_ordered_by_selectivity(self):
+        """测试逐条扫描时选择度最低的谓词最先判断，结果与字段顺序无关"""
+        data_mgr = self._selectivity_data_mgr()
+        order = [(field, selectivity) for field, selectivity, _, _ in
+                 _ordered_predicates(data_mgr, data_mgr.filter_store[0])]
+        self.assertEqual(order, [("品类", 0.2), ("年份", 0.9)])
+        
+        config = Config()
+        config.set("filter", "order_by_selectivity", False)
+        unordered = self._selectivity_data_mgr(config)
+        self.assertEqual([field for field, _, _, _ in _ordered_predicates(unordered, unordered.filter_store[0])],
+                         ["年份", "品类"])
+        self.assertEqual(_scan_record_ids(data_mgr, data_mgr.filter_store[0]),
+                         _scan_record_ids(unordered, unordered.filter_store[0]))
+    
+    def test_field_statistics_in_metrics(self):
+        """测试逐条扫描引擎将字段取值频率与谓词顺序写入运行指标"""
+        config = Config()
+        config.set("filter", "engine", "scan")
+        data_mgr = self._selectivity_data_mgr(config)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_mgr.set_output_dir(temp_dir)
+            apply_filters(data_mgr)
+        
+        self.assertEqual(data_mgr.metrics.fields["品类"],
+                         {"name": "品类", "distinct": 2, "nulls": 0, "top_value": "B", "top_share": 0.8})
+        self.assertEqual(data_mgr.metrics.fields["年份"]["distinct"], 2)
+        condition = data_mgr.metrics.conditions["条件_1"]
+        self.assertEqual(condition["predicate_order"], ["品类", "年份"])
+        self.assertEqual(condition["rows"], 10)
+        self.assertEqual(data_mgr.metrics.conditions["条件_2"]["selectivity"], {"品类": 0.8})
+    
+    def test_field_statistics_for_all_engines(self):
+        """测试其他引擎由自身的倒排表或编码得到相同的字段取值频率，不计算匹配键列，谓词顺序只在逐条扫描引擎下记录"""
+        scan = self._selectivity_data_mgr()
+        expected = {field: dict(scan.value_counts(field)) for field in ("年份", "品类")}
+        for engine in ("index", "vectorized", "trie"):
+            with self.subTest(engine=engine):
+                config = Config()
+                config.set("filter", "engine", engine)
+                data_mgr = self._selectivity_data_mgr(config)
+                if engine == "vectorized":
+                    data_mgr.data_frame = data_mgr.to_frame()
+                    data_mgr.data_store = []
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    data_mgr.set_output_dir(temp_dir)
+                    apply_filters(data_mgr)
+                self.assertEqual(data_mgr.metrics.fields["品类"]["top_share"], 0.8)
+                self.assertEqual(data_mgr.metrics.fields["年份"]["distinct"], 2)
+                self.assertNotIn("predicate_order", data_mgr.metrics.conditions["条件_1"])
+                selector = _create_selector(data_mgr)
+                self.assertEqual({field: _engine_value_counts(data_mgr, selector)(field) for field in expected},
+                                 expected)
+                if engine != "trie":
+                    self.assertFalse(data_mgr._key_columns)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import os
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+import numpy as np
+import openpyxl
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules import filter_processor
+from modules.data_extractor import extract_data, extract_filters
+from modules.filter_processor import apply_filters
+from modules.output_generator import export_to_xlsx
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+class TestIncremental(unittest.TestCase):
+    """增量模式测试类：只重新计算变化的条件，结果与完整运行一致"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # 模板文件缺少默认样式，openpyxl 会给出无关的警告
+        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+        # 先用 openpyxl 另存一次，之后修改筛选条件时数据总表 Sheet 的内容保持不变
+        self.input_file = os.path.join(self.temp_dir.name, "input.xlsx")
+        openpyxl.load_workbook(TEMPLATES[0]).save(self.input_file)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def _run(self, incremental=True, base="incremental"):
+        """执行提取与筛选，返回数据管理器与写出 CSV 的条件名称"""
+        config = Config()
+        config.set("output", "incremental", incremental)
+        data_mgr = DataManager(config)
+        data_mgr.set_output_dir(os.path.join(self.temp_dir.name, base))
+        extract_data(self.input_file, data_mgr)
+        extract_filters(self.input_file, data_mgr)
+
+        with mock.patch.object(filter_processor, "_save_filtered_data_to_csv",
+                               wraps=filter_processor._save_filtered_data_to_csv) as save:
+            apply_filters(data_mgr)
+        written = [call.args[2] for call in save.call_args_list]
+        return data_mgr, written
+
+    def _edit_filters(self, edit):
+        """修改输入文件的筛选条件 Sheet"""
+        workbook = openpyxl.load_workbook(self.input_file)
+        edit(workbook[Config().get("sheets", "filter_sheet")])
+        workbook.save(self.input_file)
+
+    def _assert_same_results(self, actual, expected):
+        self.assertEqual(actual.filtered_data.keys(), expected.filtered_data.keys())
+        for condition_name, record_ids in expected.filtered_data.items():
+            np.testing.assert_array_equal(actual.filtered_data[condition_name], record_ids)
+
+    def _read_outputs(self, data_mgr):
+        outputs = {}
+        for path in glob.glob(os.path.join(data_mgr.output_dir, "条件_*.csv")):
+            with open(path, "rb") as f:
+                outputs[os.path.basename(path)] = f.read()
+        return outputs
+
+    def test_unchanged_rerun_skips_all(self):
+        """测试输入未变化时不重新写出任何条件"""
+        first, written = self._run()
+        self.assertEqual(len(written), len(first.filter_store))
+
+        second, written = self._run()
+        self.assertEqual(written, [])
+        self._assert_same_results(second, first)
+        self.assertTrue(export_to_xlsx(self.input_file, second))
+
+    def test_changed_rows_only(self):
+        """测试只重写变化的条件，并删除已移除条件的输出"""
+        first, _ = self._run()
+        count = len(first.filter_store)
+        self.assertGreater(count, 2)
+
+        def edit(sheet):
+            sheet.cell(2, 1).value = None
+            sheet.delete_rows(sheet.max_row)
+        self._edit_filters(edit)
+
+        second, written = self._run()
+        self.assertEqual(written, ["条件_1"])
+        self.assertFalse(os.path.exists(os.path.join(second.output_dir, f"条件_{count}.csv")))
+
+        # 与完整运行的结果及输出文件一致
+        full, _ = self._run(incremental=False, base="full")
+        self._assert_same_results(second, full)
+        self.assertEqual(self._read_outputs(second), self._read_outputs(full))
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
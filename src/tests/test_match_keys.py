@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import datetime
+import unittest
+import numpy as np
+import pandas as pd
+from modules.columnar_engine import ColumnarMatcher
+from modules.data_manager import DataManager
+from modules.filter_index import FilterIndex
+from modules.filter_processor import _scan_record_ids
+from modules.match_keys import normalize_key
+from tests.reference import match_data_item
+
+class TestMatchKeys(unittest.TestCase):
+    """匹配键规范化测试类"""
+
+    def test_numbers(self):
+        """测试数值与数值文本得到相同的匹配键"""
+        for value in (2024, 2024.0, "2024", "2024.0", " 2024 ", np.int64(2024), np.float64(2024.0)):
+            self.assertEqual(normalize_key(value), "2024")
+        self.assertEqual(normalize_key(0.1), "0.1")
+        self.assertEqual(normalize_key("1.50"), "1.5")
+        self.assertEqual(normalize_key("-0.0"), "0")
+
+    def test_codes_with_leading_zeros_stay_text(self):
+        """测试带前导零的编码仍按文本比较"""
+        self.assertEqual(normalize_key("007"), "007")
+        self.assertNotEqual(normalize_key("007"), normalize_key(7))
+
+    def test_dates(self):
+        """测试日期、时间戳与日期文本得到相同的匹配键"""
+        for value in (datetime.date(2024, 1, 5), datetime.datetime(2024, 1, 5),
+                      pd.Timestamp("2024-01-05"), "2024-01-05", "2024-01-05 00:00:00", "2024/1/5"):
+            self.assertEqual(normalize_key(value), "2024-01-05")
+        self.assertEqual(normalize_key(pd.Timestamp("2024-01-05 12:30")), "2024-01-05 12:30:00")
+        self.assertEqual(normalize_key("2024-13-45"), "2024-13-45")
+
+    def test_empty_values(self):
+        """测试空值没有匹配键"""
+        for value in (None, np.nan, pd.NaT, "", "   "):
+            self.assertIsNone(normalize_key(value))
+
+    def test_idempotent(self):
+        """测试匹配键再次规范化得到它本身（规划器以规范化后的条件作为筛选条件）"""
+        for value in (2024.0, " A ", 0.1, "1e3", pd.Timestamp("2024-01-05 08:00"), "007", True):
+            key = normalize_key(value)
+            self.assertEqual(normalize_key(key), key)
+
+    def test_engines_match_typed_values(self):
+        """测试各筛选引擎都能用文本筛选值匹配数值、日期与带空白的单元格"""
+        data_store = [
+            {"年份": 2024, "日期": pd.Timestamp("2024-01-05"), "品类": "A "},
+            {"年份": 2024.0, "日期": "2024-01-05", "品类": "A"},
+            {"年份": 2025, "日期": pd.Timestamp("2024-01-06"), "品类": "A"},
+            {"年份": np.nan, "日期": None, "品类": ""},
+        ]
+        filter_item = {"年份": "2024.0", "日期": "2024-01-05 00:00:00", "品类": "A"}
+        expected = [0, 1]
+
+        self.assertEqual([i for i, item in enumerate(data_store)
+                          if match_data_item(item, filter_item)[0]], expected)
+        self.assertEqual(FilterIndex(data_store).match(filter_item).tolist(), expected)
+        self.assertEqual(ColumnarMatcher(pd.DataFrame(data_store)).match(filter_item).tolist(), expected)
+
+        data_mgr = DataManager()
+        data_mgr.data_store = data_store
+        self.assertEqual(_scan_record_ids(data_mgr, filter_item), expected)
+
+    def test_columnar_codes(self):
+        """测试向量化引擎先按原始值编码后得到的代码与逐个单元格规范化一致，相等但类型不同的值（1 与 True）不合并"""
+        columns = {
+            "混合": [1, True, "1", 1.0, None, np.nan, "", " A", "A", False, 0, pd.NaT, True],
+            "文本": ["B", None, "b", " B", "", "B"],
+            "整数": [3, np.int64(3), 10 ** 20, None, 7],
+            "空": [None, None],
+        }
+        for field, values in columns.items():
+            with self.subTest(field=field):
+                codes, code_of = ColumnarMatcher(pd.DataFrame({field: pd.Series(values, dtype=object)})).column(field)
+                keys = [normalize_key(value) for value in values]
+                self.assertEqual(list(code_of), list(dict.fromkeys(key for key in keys if key is not None)))
+                self.assertEqual(codes.tolist(), [-1 if key is None else code_of[key] for key in keys])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import json
+import os
+import pickle
+import tempfile
+import unittest
+import warnings
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules.data_extractor import extract_data, extract_filters
+from modules.filter_processor import apply_filters
+from modules.metrics import MetricsRecorder, profiling
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+class TestMetrics(unittest.TestCase):
+    """运行指标测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # 模板文件缺少默认样式，openpyxl 会给出无关的警告
+        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+    
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+    
+    def test_stage(self):
+        """测试阶段指标记录耗时与行数，异常时标记失败"""
+        metrics = MetricsRecorder()
+        with metrics.stage("extract") as stage:
+            stage["rows"] = 10
+        with self.assertRaises(RuntimeError):
+            with metrics.stage("broken"):
+                raise RuntimeError("失败")
+        
+        extract, broken = metrics.stages
+        self.assertEqual(extract["rows"], 10)
+        self.assertGreaterEqual(extract["wall_seconds"], 0)
+        self.assertNotIn("failed", extract)
+        self.assertTrue(broken["failed"])
+    
+    def test_disabled(self):
+        """测试未启用时不记录任何指标，也不写出文件"""
+        metrics = MetricsRecorder(enabled=False)
+        with metrics.stage("extract"):
+            pass
+        with metrics.measure("条件_1", "filter_seconds"):
+            pass
+        metrics.count("条件_1", rows=1)
+        
+        self.assertEqual(metrics.stages, [])
+        self.assertEqual(metrics.conditions, {})
+        self.assertIsNone(metrics.write(os.path.join(self.temp_dir.name, "metrics.json")))
+    
+    def test_pickle(self):
+        """测试记录器可以序列化（不支持 fork 的平台随数据管理器传给工作进程），反序列化后可继续记录"""
+        metrics = MetricsRecorder()
+        metrics.count("条件_1", rows=1)
+        restored = pickle.loads(pickle.dumps(metrics))
+        with restored.measure("条件_1", "filter_seconds"):
+            pass
+        self.assertEqual(restored.conditions["条件_1"]["rows"], 1)
+        self.assertIn("filter_seconds", restored.conditions["条件_1"])
+    
+    def test_condition_metrics(self):
+        """测试筛选时为每个条件记录匹配行数、筛选与写出耗时"""
+        data_mgr = DataManager()
+        data_mgr.set_output_dir(self.temp_dir.name)
+        extract_data(TEMPLATES[0], data_mgr)
+        extract_filters(TEMPLATES[0], data_mgr)
+        apply_filters(data_mgr)
+        
+        path = data_mgr.metrics.write(os.path.join(self.temp_dir.name, "metrics.json"))
+        with open(path, "r", encoding="utf-8") as f:
+            conditions = json.load(f)["conditions"]
+        self.assertEqual(len(conditions), len(data_mgr.filter_store))
+        for condition in conditions:
+            self.assertEqual(condition["rows"], len(data_mgr.filtered_data[condition["name"]]))
+            self.assertIn("filter_seconds", condition)
+            self.assertIn("write_seconds", condition)
+    
+    def test_parallel_condition_metrics(self):
+        """测试并行筛选时工作进程中测得的筛选耗时写回主进程的指标"""
+        config = Config()
+        config.set("parallel", "workers", 2)
+        data_mgr = DataManager(config)
+        data_mgr.set_output_dir(self.temp_dir.name)
+        extract_data(TEMPLATES[0], data_mgr)
+        extract_filters(TEMPLATES[0], data_mgr)
+        apply_filters(data_mgr)
+        
+        conditions = data_mgr.metrics.to_dict()["conditions"]
+        self.assertEqual(len(conditions), len(data_mgr.filter_store))
+        for condition in conditions:
+            self.assertGreaterEqual(condition["filter_seconds"], 0)
+    
+    def test_profiling(self):
+        """测试 cProfile 分析结果写入输出目录，不支持的方式报错"""
+        with profiling("cprofile", self.temp_dir.name):
+            sum(range(1000))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "profile.prof")))
+        
+        with self.assertRaises(ValueError):
+            with profiling("unknown", self.temp_dir.name):
+                pass
+
+if __name__ == "__main__":
+    unittest.main()
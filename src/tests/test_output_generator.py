@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import importlib.util
+import os
+import tempfile
+import unittest
+import warnings
+import openpyxl
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules.data_extractor import extract_data, extract_filters
+from modules.filter_processor import apply_filters
+from modules.output_generator import create_xlsx_sink, export_to_xlsx
+from modules.predicates import enable_predicates
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+class TestOutputGenerator(unittest.TestCase):
+    """结果输出测试类：各 XLSX 写入方式生成的工作簿内容应完全一致"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # 模板文件缺少默认样式，openpyxl 会给出无关的警告
+        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+    
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+    
+    def _export(self, input_file, xlsx_engine, engine="index"):
+        """使用指定写入方式执行完整流程，返回工作簿内容"""
+        config = Config()
+        config.set("output", "xlsx_engine", xlsx_engine)
+        config.set("filter", "engine", engine)
+        data_mgr = DataManager(config)
+        data_mgr.set_output_dir(os.path.join(self.temp_dir.name, xlsx_engine + engine))
+        extract_data(input_file, data_mgr)
+        extract_filters(input_file, data_mgr)
+        apply_filters(data_mgr)
+        output_path = export_to_xlsx(input_file, data_mgr)
+        
+        # 非只读模式读取，各行按工作表的最大列数补齐，比较结果与空单元格的写法无关
+        workbook = openpyxl.load_workbook(output_path)
+        return {ws.title: list(ws.iter_rows(values_only=True)) for ws in workbook.worksheets}
+    
+    def _engines(self):
+        """可用的写入方式（xlsxwriter 为可选依赖）"""
+        engines = ["openpyxl"]
+        if importlib.util.find_spec("xlsxwriter"):
+            engines.append("xlsxwriter")
+        return engines
+    
+    def test_streaming_writers_match_pandas(self):
+        """测试流式写入与 pandas 写入的内容一致"""
+        for input_file in TEMPLATES:
+            expected = self._export(input_file, "pandas")
+            for xlsx_engine in self._engines():
+                with self.subTest(template=os.path.basename(input_file), xlsx_engine=xlsx_engine):
+                    self.assertEqual(self._export(input_file, xlsx_engine), expected)
+    
+    def test_columnar_mode(self):
+        """测试列式模式下流式写入的内容一致"""
+        for input_file in TEMPLATES:
+            with self.subTest(template=os.path.basename(input_file)):
+                self.assertEqual(self._export(input_file, "openpyxl", engine="vectorized"),
+                                 self._export(input_file, "pandas"))
+
+    def test_predicate_sheet_names(self):
+        """测试前缀与正则条件的工作表名称去掉 Excel 不允许的字符，截断后仍不重名"""
+        filter_store = [{"年份": "2025", "品类": "B*"}, {"年份": "2024..2025", "品类": "A|B"},
+                        {"年份": "2026", "品类": ""}, {"年份": "", "品类": "~^[AB][:/\\\\]?.*$"}]
+        for xlsx_engine in self._engines() + ["pandas"]:
+            with self.subTest(xlsx_engine=xlsx_engine):
+                config = Config()
+                config.set("output", "xlsx_engine", xlsx_engine)
+                data_mgr = DataManager(config)
+                data_mgr.set_output_dir(os.path.join(self.temp_dir.name, "predicates_" + xlsx_engine))
+                extract_data(TEMPLATES[0], data_mgr)
+                extract_filters(TEMPLATES[0], data_mgr)
+                data_mgr.filter_store = enable_predicates(filter_store)
+                sink = create_xlsx_sink(TEMPLATES[0], data_mgr)
+                apply_filters(data_mgr, [sink] if sink else ())
+                output_path = sink.output_path if sink else export_to_xlsx(TEMPLATES[0], data_mgr)
+                
+                sheet_names = openpyxl.load_workbook(output_path, read_only=True).sheetnames
+                condition_sheets = [name for name in sheet_names if name.startswith("条件_")]
+                self.assertEqual(condition_sheets, ["条件_1_2025_B_", "条件_2_2024..2025_A|B", "条件_3_2026",
+                                                    "条件_4_~^_AB________._$"])
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from clean_output import OutputRotation
+
+class TestOutputRotation(unittest.TestCase):
+    """输出目录轮换测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.temp_dir.name, "outputs")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def _run(self, files: dict, keep_runs: int = 3, keep=None) -> OutputRotation:
+        """模拟一次运行：在运行目录中写出文件后发布"""
+        rotation = OutputRotation(self.output_dir, keep_runs, keep)
+        staging_dir = rotation.stage()
+        for name, content in files.items():
+            with open(os.path.join(staging_dir, name), "w", encoding="utf-8") as f:
+                f.write(content)
+        rotation.publish()
+        collector = rotation.collect()
+        if collector:
+            collector.join()
+        return rotation
+
+    def _runs(self) -> list:
+        """运行目录列表（不含锁文件）"""
+        runs_dir = f"{self.output_dir}.runs"
+        return sorted(run for run in os.listdir(runs_dir) if os.path.isdir(os.path.join(runs_dir, run)))
+
+    def _read(self, name: str) -> str:
+        with open(os.path.join(self.output_dir, name), encoding="utf-8") as f:
+            return f.read()
+
+    def test_publish_replaces_previous_run(self):
+        """测试发布后输出目录只包含本次运行的文件，发布前仍为上一次的完整结果"""
+        self._run({"条件_1.csv": "第一次", "条件_2.csv": "第一次"})
+        rotation = OutputRotation(self.output_dir)
+        staging_dir = rotation.stage()
+        with open(os.path.join(staging_dir, "条件_1.csv"), "w", encoding="utf-8") as f:
+            f.write("第二次")
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["条件_1.csv", "条件_2.csv"])
+        self.assertEqual(self._read("条件_1.csv"), "第一次")
+
+        rotation.publish()
+        self.assertEqual(os.listdir(self.output_dir), ["条件_1.csv"])
+        self.assertEqual(self._read("条件_1.csv"), "第二次")
+        self.assertEqual(rotation.published_path(os.path.join(staging_dir, "条件_1.csv")),
+                         os.path.join(self.output_dir, "条件_1.csv"))
+
+    def test_old_runs_collected(self):
+        """测试超出保留数量的运行目录在发布后被删除，中途失败的运行不会被发布"""
+        for i in range(4):
+            self._run({"条件_1.csv": str(i)}, keep_runs=2)
+        failed = OutputRotation(self.output_dir, keep_runs=2)
+        failed.stage()
+        failed.release()
+        self.assertEqual(self._read("条件_1.csv"), "3")
+        self.assertEqual(len(self._runs()), 3)
+
+        self._run({"条件_1.csv": "4"}, keep_runs=2)
+        self.assertEqual(len(self._runs()), 2)
+        self.assertTrue(os.path.exists(failed.staging_dir))
+        self._run({"条件_1.csv": "5"}, keep_runs=2)
+        self.assertEqual(len(self._runs()), 2)
+        self.assertFalse(os.path.exists(failed.staging_dir))
+        self.assertEqual(sorted(os.listdir(failed.runs_dir)), self._runs())
+        self.assertEqual(self._read("条件_1.csv"), "5")
+
+    def test_concurrent_runs_not_collected(self):
+        """测试其他进程仍在写入的运行与晚于当前发布的运行不会被删除，锁释放后才被删除"""
+        self._run({"条件_1.csv": "第一次"}, keep_runs=1)
+        running = OutputRotation(self.output_dir, keep_runs=1)
+        running.stage()
+        rotation = OutputRotation(self.output_dir, keep_runs=1)
+        rotation.stage()
+        newer = OutputRotation(self.output_dir, keep_runs=1)
+        newer.stage()
+        newer.release()
+
+        rotation.publish()
+        rotation.collect(background=False)
+        self.assertEqual(self._runs(), sorted(os.path.basename(r.staging_dir) for r in (running, rotation, newer)))
+
+        # 先启动的运行结束（释放锁）后，早于当前发布的目录被删除，晚于当前发布的目录仍保留
+        running.release()
+        rotation.collect(background=False)
+        self.assertEqual(self._runs(), sorted(os.path.basename(r.staging_dir) for r in (rotation, newer)))
+
+    def test_keep_patterns_and_legacy_directory(self):
+        """测试旧版本的普通输出目录被移入运行目录，需要保留的文件带入新运行且改写时不影响上一次的结果"""
+        os.makedirs(self.output_dir)
+        with open(os.path.join(self.output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            f.write("{}")
+        rotation = self._run({}, keep=["manifest.json"])
+        self.assertTrue(os.path.islink(self.output_dir))
+        self.assertEqual(self._read("manifest.json"), "{}")
+
+        rotation = OutputRotation(self.output_dir, keep=["manifest.json"])
+        staging_dir = rotation.stage()
+        previous = os.path.realpath(self.output_dir)
+        with open(os.path.join(staging_dir, "manifest.json.tmp"), "w", encoding="utf-8") as f:
+            f.write('{"version": 2}')
+        os.replace(os.path.join(staging_dir, "manifest.json.tmp"), os.path.join(staging_dir, "manifest.json"))
+        rotation.publish()
+        self.assertEqual(self._read("manifest.json"), '{"version": 2}')
+        with open(os.path.join(previous, "manifest.json"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "{}")
+
+    def test_rename_without_symlinks(self):
+        """测试不支持符号链接时以重命名方式发布"""
+        with mock.patch("os.symlink", side_effect=OSError("不支持符号链接")):
+            self._run({"条件_1.csv": "第一次"})
+            self._run({"条件_1.csv": "第二次"})
+        self.assertFalse(os.path.islink(self.output_dir))
+        self.assertEqual(os.listdir(self.output_dir), ["条件_1.csv"])
+        self.assertEqual(self._read("条件_1.csv"), "第二次")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import pandas as pd
+from modules.columnar_engine import ColumnarMatcher
+from modules.data_manager import DataManager
+from modules.decision_trie import DecisionTrie
+from modules.filter_index import FilterIndex
+from modules.filter_planner import canonical_key
+from modules.filter_processor import _scan_record_ids
+from modules.predicates import (PREDICATE_CACHE_SIZE, PredicateCache, PredicateText, _parse_text,
+                               compile_predicate, enable_predicates)
+from tests.reference import match_data_item
+
+class TestPredicates(unittest.TestCase):
+    """筛选谓词测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.data_store = [
+            {"年份": 2019, "品类": "A1", "日期": pd.Timestamp("2024-01-05")},
+            {"年份": 2020, "品类": "A2", "日期": pd.Timestamp("2024-02-10")},
+            {"年份": 2022.0, "品类": "B1", "日期": "2024-03-31"},
+            {"年份": "2024", "品类": "C", "日期": pd.Timestamp("2024-04-01")},
+            {"年份": 2025, "品类": "A|B", "日期": None},
+            {"年份": np.nan, "品类": "", "日期": pd.Timestamp("2023-12-31")},
+        ]
+
+    def _engines(self, filter_item):
+        """各筛选引擎的结果"""
+        data_mgr = DataManager()
+        data_mgr.data_store = self.data_store
+        return {
+            "reference": [i for i, item in enumerate(self.data_store)
+                          if match_data_item(item, filter_item)[0]],
+            "scan": _scan_record_ids(data_mgr, filter_item),
+            "index": FilterIndex(self.data_store).match(filter_item).tolist(),
+            "vectorized": ColumnarMatcher(pd.DataFrame(self.data_store)).match(filter_item).tolist(),
+            "trie": DecisionTrie(data_mgr).match(filter_item).tolist(),
+        }
+
+    def test_syntax(self):
+        """测试各种谓词写法在所有引擎上的结果"""
+        cases = [
+            ({"年份": "2020..2024"}, [1, 2, 3]),
+            ({"年份": "2022.."}, [2, 3, 4]),
+            ({"年份": "..2020"}, [0, 1]),
+            ({"年份": ">2022"}, [3, 4]),
+            ({"年份": ">=2022"}, [2, 3, 4]),
+            ({"年份": "<2020"}, [0]),
+            ({"年份": "!=2024"}, [0, 1, 2, 4]),
+            ({"年份": "2019|2024|2030"}, [0, 3]),
+            ({"品类": "A*"}, [0, 1, 4]),
+            ({"品类": "~^[AB]\\d$"}, [0, 1, 2]),
+            ({"品类": "=A|B"}, [4]),
+            ({"日期": "2024-02-01..2024-03-31"}, [1, 2]),
+            ({"日期": "<2024-01-01"}, [5]),
+            ({"年份": "2020..2024", "品类": "A2|B1"}, [1, 2]),
+            ({"年份": "2022", "品类": ""}, [2]),
+        ]
+        for filter_item, expected in cases:
+            with self.subTest(filter_item=filter_item):
+                for engine, result in self._engines(enable_predicates([filter_item])[0]).items():
+                    self.assertEqual(result, expected, engine)
+
+    def test_plain_values_unchanged(self):
+        """测试普通值仍为精确匹配，空值为通配符"""
+        self.assertEqual(compile_predicate("A1").exact, "A1")
+        self.assertEqual(compile_predicate(2024).exact, "2024")
+        self.assertIsNone(compile_predicate(""))
+        self.assertIsNone(compile_predicate("  "))
+
+    def test_syntax_disabled_by_default(self):
+        """测试未启用谓词写法时，形似谓词的已有筛选值仍按普通值精确匹配"""
+        for text in ("A|B", "2020..2024", "A*", ">2022", "<2020", "!=2024", "~^A", "=A|B"):
+            self.assertEqual(compile_predicate(text).exact, text)
+        for engine, result in self._engines({"品类": "A|B"}).items():
+            self.assertEqual(result, [4], engine)
+        for engine, result in self._engines({"年份": "2020..2024"}).items():
+            self.assertEqual(result, [], engine)
+        self.assertEqual(enable_predicates([{"品类": "A|B"}], False), [{"品类": "A|B"}])
+
+    def test_escape_and_warning(self):
+        """测试按谓词解析的值记录警告（每种写法一次），以 = 开头的值按普通值精确匹配且不提示"""
+        with self.assertLogs("modules.predicates", level="WARNING") as logs:
+            self.assertEqual(compile_predicate(PredicateText("甲|乙")).op, "in")
+            compile_predicate(PredicateText("甲|乙"))
+            self.assertEqual(compile_predicate(PredicateText("=甲|乙")).exact, "甲|乙")
+            compile_predicate(PredicateText("甲"))
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("=甲|乙", logs.output[0])
+
+        for engine, result in self._engines(enable_predicates([{"品类": "=A|B"}])[0]).items():
+            self.assertEqual(result, [4], engine)
+
+    def test_round_trip(self):
+        """测试谓词的规范写法重新编译后得到相同的谓词"""
+        for text in ("2020..2024", "..5", ">=2024-01-01", "!=A", "B|A", "A*", "~x+", "=A|B", "=A*", "plain"):
+            predicate = compile_predicate(PredicateText(text))
+            self.assertEqual(compile_predicate(PredicateText(str(predicate))), predicate)
+
+    def test_canonical_key(self):
+        """测试写法不同但语义相同的谓词得到相同的规范化条件键"""
+        first, second = enable_predicates([{"品类": "A|B", "年份": "2020 .. 2024.0"},
+                                           {"年份": "2020..2024", "品类": "B | A"}])
+        self.assertEqual(canonical_key(first), canonical_key(second))
+
+    def test_caches_bounded(self):
+        """测试按写法与按谓词的缓存项数有上限，最久未使用的项先淘汰"""
+        cache = PredicateCache(maxsize=2)
+        cache["a"], cache["b"] = 1, 2
+        self.assertEqual(cache["a"], 1)
+        cache["c"] = 3
+        self.assertEqual(list(cache), ["a", "c"])
+
+        index = FilterIndex(self.data_store)
+        with self.assertLogs("modules.predicates", level="WARNING"):
+            for low in range(PREDICATE_CACHE_SIZE + 10):
+                index.match({"年份": PredicateText(f"{low}..")})
+        self.assertEqual(len(index._predicate_postings), PREDICATE_CACHE_SIZE)
+        self.assertLessEqual(_parse_text.cache_info().currsize, PREDICATE_CACHE_SIZE)
+
+    def test_invalid_regex(self):
+        """测试无效的正则表达式"""
+        with self.assertRaises(ValueError):
+            compile_predicate(PredicateText("~["))
+
+if __name__ == '__main__':
+    unittest.main()
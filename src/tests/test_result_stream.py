@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import logging
+import os
+import tempfile
+import threading
+import unittest
+import warnings
+import openpyxl
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules.data_extractor import extract_data, extract_filters
+from modules.filter_processor import apply_filters
+from modules.output_generator import create_xlsx_sink, export_to_xlsx
+from modules.result_stream import ResultStream
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+class _RecordingSink:
+    """记录收到的结果与调用线程的写出器"""
+
+    def __init__(self, fail_on=None):
+        self.events = []
+        self.fail_on = fail_on
+        self.threads = 1
+        self.write_threads = set()
+
+    def open(self):
+        self.events.append("open")
+
+    def write(self, idx, record_ids, unchanged=False):
+        if idx == self.fail_on:
+            raise IOError("磁盘已满")
+        self.write_threads.add(threading.current_thread().name)
+        self.events.append(idx)
+
+    def close(self):
+        self.events.append("close")
+
+class TestResultStream(unittest.TestCase):
+    """结果流与随筛选写出 XLSX 的测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.logger = logging.getLogger(__name__)
+        # 模板文件缺少默认样式，openpyxl 会给出无关的警告
+        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def test_results_written_in_background(self):
+        """测试结果按发布顺序在后台线程写出，启动前发布的结果在启动后交给写出器"""
+        sink = _RecordingSink()
+        with ResultStream([sink], self.logger, queue_size=1) as stream:
+            stream.publish(2, [])
+            stream.start()
+            for idx in range(2):
+                stream.publish(idx, [])
+        self.assertEqual(sink.events, ["open", 2, 0, 1, "close"])
+        self.assertNotIn(threading.current_thread().name, sink.write_threads)
+
+    def test_write_error_raised(self):
+        """测试后台写出的异常在关闭时抛出，写出器不会被关闭"""
+        sink = _RecordingSink(fail_on=0)
+        with self.assertRaises(IOError):
+            with ResultStream([sink], self.logger) as stream:
+                stream.publish(0, [])
+                stream.publish(1, [])
+        self.assertNotIn("close", sink.events)
+
+    def test_xlsx_written_during_filtering(self):
+        """测试随筛选写出的 XLSX 与筛选完成后单独导出的内容一致"""
+        for input_file in TEMPLATES:
+            with self.subTest(template=os.path.basename(input_file)):
+                data_mgr = DataManager(Config())
+                data_mgr.set_output_dir(self.temp_dir.name, os.path.join(self.temp_dir.name, "stream"))
+                extract_data(input_file, data_mgr)
+                extract_filters(input_file, data_mgr)
+                sink = create_xlsx_sink(input_file, data_mgr)
+                apply_filters(data_mgr, [sink])
+                # 输出文件名只精确到秒，单独导出时写入另一个目录，避免覆盖随筛选写出的文件
+                data_mgr.set_output_dir(self.temp_dir.name, os.path.join(self.temp_dir.name, "export"))
+                streamed = openpyxl.load_workbook(sink.output_path, read_only=True)
+                exported = openpyxl.load_workbook(export_to_xlsx(input_file, data_mgr), read_only=True)
+
+                self.assertEqual(streamed.sheetnames, exported.sheetnames)
+                for sheet_name in exported.sheetnames:
+                    self.assertEqual(list(streamed[sheet_name].values), list(exported[sheet_name].values))
+                streamed.close()
+                exported.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import gzip
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+import warnings
+import openpyxl
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules.data_extractor import extract_data, extract_filters
+from modules.filter_processor import apply_filters
+from modules.output_generator import export_to_xlsx
+from modules.result_writer import CONDITION_COLUMN, DATASET_NAME
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+class TestResultWriter(unittest.TestCase):
+    """筛选结果输出格式测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # 模板文件缺少默认样式，openpyxl 会给出无关的警告
+        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def _run(self, input_file, name, **output):
+        """使用指定的输出配置执行提取与筛选，返回数据管理器"""
+        config = Config()
+        for key, value in output.items():
+            config.set("output", key, value)
+        data_mgr = DataManager(config)
+        data_mgr.set_output_dir(self.temp_dir.name, os.path.join(self.temp_dir.name, name))
+        extract_data(input_file, data_mgr)
+        extract_filters(input_file, data_mgr)
+        apply_filters(data_mgr)
+        return data_mgr
+
+    def test_compressed_csv_matches_plain_csv(self):
+        """测试 csv.gz 格式解压后与普通 CSV 内容一致"""
+        for input_file in TEMPLATES:
+            with self.subTest(template=os.path.basename(input_file)):
+                plain = self._run(input_file, "plain")
+                compressed = self._run(input_file, "gzip", format="csv.gz")
+                for condition_name in plain.filtered_data:
+                    with open(os.path.join(plain.output_dir, f"{condition_name}.csv"), "rb") as f:
+                        expected = f.read()
+                    with gzip.open(os.path.join(compressed.output_dir, f"{condition_name}.csv.gz"), "rb") as f:
+                        self.assertEqual(f.read(), expected)
+                self.assertEqual(glob.glob(os.path.join(compressed.output_dir, "条件_*.csv")), [])
+
+    def test_unsupported_format(self):
+        """测试不支持的输出格式"""
+        with self.assertRaises(ValueError):
+            self._run(TEMPLATES[0], "unknown", format="xml")
+
+    def test_xlsx_without_condition_sheets(self):
+        """测试关闭条件结果工作表时 XLSX 只包含总表与总表筛选"""
+        input_file = TEMPLATES[0]
+        data_mgr = self._run(input_file, "sheets", xlsx_sheets=False)
+        workbook = openpyxl.load_workbook(export_to_xlsx(input_file, data_mgr), read_only=True)
+        self.assertEqual(workbook.sheetnames, ["总表", "总表筛选"])
+        workbook.close()
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "未安装 pyarrow")
+    def test_parquet_dataset(self):
+        """测试 Parquet 数据集按 condition_group 分组的内容与各条件的结果一致，谓词保存在元数据中"""
+        import pyarrow.parquet as pq
+
+        input_file = TEMPLATES[0]
+        data_mgr = self._run(input_file, "parquet", format="parquet")
+        table = pq.read_table(os.path.join(data_mgr.output_dir, f"{DATASET_NAME}.parquet"))
+        groups = table.column(CONDITION_COLUMN).to_pylist()
+        for condition_name, record_ids in data_mgr.filtered_data.items():
+            self.assertEqual(groups.count(condition_name), len(record_ids))
+
+        conditions = json.loads(table.schema.metadata[b"conditions"])
+        self.assertEqual([condition["filter"] for condition in conditions],
+                         json.loads(json.dumps(data_mgr.filter_store, default=str)))
+        self.assertEqual(glob.glob(os.path.join(data_mgr.output_dir, "条件_*")), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+import warnings
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules.data_extractor import extract_data, extract_filters
+from modules.filter_processor import apply_filters
+from service import FilterService, create_server
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+class TestService(unittest.TestCase):
+    """常驻筛选服务测试类"""
+
+    def setUp(self):
+        """测试前准备：复制模板并在随机端口启动服务"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # 模板文件缺少默认样式，openpyxl 会给出无关的警告
+        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+        self.input_file = os.path.join(self.temp_dir.name, "input.xlsx")
+        shutil.copy(TEMPLATES[0], self.input_file)
+
+        self.config = Config()
+        self.config.set("cache", "enabled", False)
+        self.config.set("filter", "predicates", True)
+        self.service = FilterService(self.input_file, self.config, os.path.join(self.temp_dir.name, "service"))
+        self.service.load()
+        self.server = create_server(self.service, "127.0.0.1", 0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        """测试后清理"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def _request(self, path, payload=None):
+        """发送请求，返回 (状态码, 响应 JSON)"""
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        try:
+            with urllib.request.urlopen(self.url + path, data=data) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_filter_matches_apply_filters(self):
+        """测试使用工作簿中的筛选条件时，各条件的匹配行数与 apply_filters 一致"""
+        data_mgr = DataManager(self.config)
+        data_mgr.set_output_dir(self.temp_dir.name, os.path.join(self.temp_dir.name, "reference"))
+        extract_data(self.input_file, data_mgr)
+        extract_filters(self.input_file, data_mgr)
+        apply_filters(data_mgr)
+
+        status, result = self._request("/filter", {"limit": 1, "write": True})
+        self.assertEqual(status, 200)
+        self.assertEqual({condition["name"]: condition["rows"] for condition in result["conditions"]},
+                         {name: len(ids) for name, ids in data_mgr.filtered_data.items()})
+        self.assertTrue(all(len(condition["records"]) <= 1 for condition in result["conditions"]))
+        for condition in result["conditions"]:
+            with open(os.path.join(result["output_dir"], f"{condition['name']}.csv"), "rb") as f, \
+                    open(os.path.join(data_mgr.output_dir, f"{condition['name']}.csv"), "rb") as expected:
+                self.assertEqual(f.read(), expected.read())
+
+    def test_ad_hoc_filters(self):
+        """测试提交的筛选条件，未知字段在响应中列出，无效的条件返回 400"""
+        field = next(iter(self.service.data_mgr.filter_store[0]))
+        status, result = self._request("/filter", {"filters": [{field: ""}, {"不存在的字段": "A"}]})
+        self.assertEqual(status, 200)
+        self.assertEqual(result["conditions"][0]["rows"], self.service.data_mgr.record_count())
+        self.assertEqual(result["conditions"][1]["rows"], 0)
+        self.assertEqual(result["unknown_fields"], ["不存在的字段"])
+
+        self.assertEqual(self._request("/filter", {"filters": [{field: "~("}]})[0], 400)
+        self.assertEqual(self._request("/filter", {"filters": "年份=2024"})[0], 400)
+
+    def test_reload_when_modified(self):
+        """测试工作簿修改时间变化后，下一次请求前自动重新加载"""
+        status, result = self._request("/status")
+        self.assertEqual((status, result["reloads"]), (200, 0))
+
+        stat = os.stat(self.input_file)
+        os.utime(self.input_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        status, result = self._request("/status")
+        self.assertEqual(result["reloads"], 1)
+        self.assertEqual(result["records"], self.service.data_mgr.record_count())
+
+if __name__ == '__main__':
+    unittest.main()
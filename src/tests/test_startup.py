@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+class TestStartup(unittest.TestCase):
+    """启动导入测试类"""
+    
+    def test_main_defers_heavy_imports(self):
+        """测试导入入口模块时不会提前导入重量级依赖"""
+        code = ("import json, sys, main; "
+                "print(json.dumps(sorted(m for m in ('pandas', 'numpy', 'openpyxl', 'tkinter') "
+                "if m in sys.modules)))")
+        completed = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR,
+                                   capture_output=True, text=True, check=True)
+        self.assertEqual(json.loads(completed.stdout.strip().splitlines()[-1]), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import os
+import tempfile
+import unittest
+import warnings
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules.data_extractor import extract_data
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+class TestStreamingReader(unittest.TestCase):
+    """流式读取测试类：流式读取的结果应与 pandas 整表读取一致"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # 模板文件缺少默认样式，openpyxl 会给出无关的警告
+        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+    
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+    
+    def _extract(self, input_file, reader, engine="index"):
+        """使用指定读取方式提取数据总表"""
+        config = Config()
+        config.set("input", "reader", reader)
+        config.set("filter", "engine", engine)
+        data_mgr = DataManager(config)
+        data_mgr.set_output_dir(self.temp_dir.name)
+        extract_data(input_file, data_mgr)
+        return data_mgr
+    
+    def test_records_match_pandas(self):
+        """测试流式读取的记录与表头与 pandas 读取一致"""
+        for input_file in TEMPLATES:
+            with self.subTest(template=os.path.basename(input_file)):
+                expected = self._extract(input_file, "pandas")
+                actual = self._extract(input_file, "streaming")
+                self.assertEqual(actual.data_store, expected.data_store)
+                self.assertEqual(actual.header_column, expected.header_column)
+    
+    def test_frame_mode(self):
+        """测试列式模式下流式读取得到相同的记录"""
+        for input_file in TEMPLATES:
+            with self.subTest(template=os.path.basename(input_file)):
+                expected = self._extract(input_file, "pandas")
+                actual = self._extract(input_file, "streaming", engine="vectorized")
+                self.assertEqual(actual.get_records(range(actual.record_count())),
+                                 expected.data_store)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
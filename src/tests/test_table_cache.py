@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+import pandas as pd
+from modules.config import Config
+from modules.data_manager import DataManager
+from modules import data_extractor
+from modules.data_extractor import extract_data, extract_filters
+from modules.table_cache import TableCache, encode_values, decode_values
+
+# 项目自带的模板文件
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "templates")
+TEMPLATES = sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*.xlsx")))
+
+class TestTableCache(unittest.TestCase):
+    """数据总表缓存测试类：命中缓存时的结果应与重新解析一致"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # 模板文件缺少默认样式，openpyxl 会给出无关的警告
+        warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.temp_dir.cleanup()
+
+    def _extract(self, input_file, reader="pandas", engine="index", cache=True):
+        """提取数据总表，返回数据管理器与生成的 总表.csv 内容"""
+        config = Config()
+        config.set("input", "reader", reader)
+        config.set("filter", "engine", engine)
+        config.set("cache", "enabled", cache)
+        data_mgr = DataManager(config)
+        data_mgr.set_output_dir(self.temp_dir.name)
+        extract_data(input_file, data_mgr)
+        with open(os.path.join(data_mgr.output_dir, "总表.csv"), "rb") as f:
+            return data_mgr, f.read()
+
+    def test_value_roundtrip(self):
+        """测试各类单元格值编码后可原样还原"""
+        values = [None, 0, -7, 2024, 1.5, "", "文本", "aé", True, False,
+                  pd.Timestamp("2024-01-02 03:04:05")]
+        self.assertEqual(decode_values(encode_values(values, "v"), "v"), values)
+
+    def test_cached_extraction_matches(self):
+        """测试第二次提取命中缓存，记录、表头与 总表.csv 均与首次解析一致"""
+        for input_file in TEMPLATES:
+            for reader, engine in [("pandas", "index"), ("pandas", "vectorized"),
+                                   ("streaming", "index")]:
+                with self.subTest(template=os.path.basename(input_file), reader=reader, engine=engine):
+                    expected, expected_csv = self._extract(input_file, reader, engine)
+                    # 命中缓存时不应再解析数据总表
+                    with mock.patch.object(data_extractor, "load_workbook") as load_workbook:
+                        actual, actual_csv = self._extract(input_file, reader, engine)
+                        load_workbook.assert_not_called()
+                    self.assertEqual(actual.get_records(range(actual.record_count())),
+                                     expected.get_records(range(expected.record_count())))
+                    self.assertEqual(actual.data_fields(), expected.data_fields())
+                    self.assertEqual(actual.header_column, expected.header_column)
+                    self.assertEqual(actual_csv, expected_csv)
+
+    def test_filters_after_cache_hit(self):
+        """测试命中缓存后仍能提取筛选条件"""
+        input_file = TEMPLATES[0]
+        self._extract(input_file)
+        data_mgr, _ = self._extract(input_file)
+        extract_filters(input_file, data_mgr)
+        self.assertTrue(data_mgr.filter_store)
+        self.assertNotIn(data_mgr.config.get("sheets", "data_sheet"), data_mgr.sheets)
+
+    def test_changed_file_invalidates(self):
+        """测试源文件内容变化后缓存键随之变化"""
+        input_file = os.path.join(self.temp_dir.name, "input.xlsx")
+        shutil.copyfile(TEMPLATES[0], input_file)
+        cache = TableCache(os.path.join(self.temp_dir.name, "cache"))
+        key = cache.key_for(input_file, "总表")
+
+        self.assertEqual(cache.key_for(input_file, "总表"), key)
+        self.assertNotEqual(cache.key_for(input_file, "其他"), key)
+        shutil.copyfile(TEMPLATES[-1], input_file)
+        os.utime(input_file, ns=(0, 0))
+        self.assertNotEqual(cache.key_for(input_file, "总表"), key)
+
+    def test_lru_eviction(self):
+        """测试超过大小上限时淘汰最久未使用的缓存项"""
+        cache = TableCache(os.path.join(self.temp_dir.name, "cache"), max_size_mb=0)
+        columns = [[1, 2, 3], ["a", "b", "c"]]
+        cache.store("old", ["序号", "x"], ["序号", "x"], columns)
+        cache.store("new", ["序号", "x"], ["序号", "x"], columns)
+
+        self.assertIsNone(cache.load("old"))
+        self.assertEqual(cache.load("new")[2], columns)
+
+    def test_superseded_entries_removed(self):
+        """测试源文件变化后写入新缓存项时删除其旧版本，缓存项数与索引记录数不超过上限"""
+        input_file = os.path.join(self.temp_dir.name, "input.xlsx")
+        cache_dir = os.path.join(self.temp_dir.name, "cache")
+        cache = TableCache(cache_dir, max_entries=2)
+        columns = [[1, 2, 3], ["a", "b", "c"]]
+        keys = []
+        for template in (TEMPLATES[0], TEMPLATES[-1], TEMPLATES[0]):
+            shutil.copyfile(template, input_file)
+            os.utime(input_file, ns=(len(keys), len(keys)))
+            keys.append(cache.key_for(input_file, "总表"))
+            cache.store(keys[-1], ["序号", "x"], ["序号", "x"], columns, source=input_file)
+            self.assertEqual([name for name in os.listdir(cache_dir) if name != "index.json"], [keys[-1]])
+
+        # 其他来源的缓存项按数量上限淘汰
+        for name in ("a", "b"):
+            cache.store(name, ["序号", "x"], ["序号", "x"], columns)
+        self.assertEqual(sorted(os.listdir(cache_dir)), sorted(["a", "b", "index.json"]))
+
+        # 索引中源文件已删除的记录与超出数量的最早记录被删除
+        path = os.path.realpath(input_file)
+        other = os.path.join(self.temp_dir.name, "other.xlsx")
+        shutil.copyfile(TEMPLATES[0], other)
+        cache.key_for(other, "总表")
+        os.remove(other)
+        cache.key_for(input_file, "其他")
+        self.assertEqual(list(cache._read_index()), [f"{path}|总表", f"{path}|其他"])
+        with mock.patch("modules.table_cache.MAX_INDEX_ENTRIES", 1):
+            cache.key_for(input_file, "第三")
+        self.assertEqual(list(cache._read_index()), [f"{path}|第三"])
+
+    def test_cache_disabled(self):
+        """测试关闭缓存后不创建缓存目录"""
+        data_mgr, _ = self._extract(TEMPLATES[0], cache=False)
+        self.assertFalse(os.path.exists(data_mgr.cache_dir))
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file